@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Batch-generate adapter variants from a manifest
+
+Each variant is a combination of connectors (CONNECTOR_INFO names, or
+connector-specs/*.md stems, see spec_loader.py) and resistor sets. For
+every variant a schematic and a symbol library are written to
+<output_dir>/<name>/ (atomically, and only when their content changed).
+Variants are generated in a process pool; a failing variant is reported
+without affecting the others.
+
+UUIDs are derived from references and labels (see
+kicad_utils.set_deterministic_uuids) and the title block date is the
+manifest's modification time (unless SOURCE_DATE_EPOCH is set), so an
+unchanged variant regenerates byte for byte and is not rewritten.
+--no-deterministic switches back to random UUIDs and today's date.
+
+Usage:
+    python3 batch_generate.py variants.json [-j JOBS] [-o OUTPUT_DIR]
+                              [--no-deterministic]
+
+Manifest (JSON, or YAML if PyYAML is installed):
+
+    {
+      "output_dir": "build/variants",
+      "resistor_sets": {
+        "jtag": [["10k", "TMS pullup"], ["10k", "TDI pullup"],
+                 ["33", "TMS series"], ["33", "TCK series"]]
+      },
+      "variants": [
+        {
+          "name": "arm-cortex",
+          "title": "Adapterama - ARM/Cortex",
+          "wire": true,
+          "sections": [
+            {"connector": "ARM_JTAG_20pin_1.27mm", "resistors": "jtag"},
+            {"connector": "Cortex_Debug_10pin_1.27mm",
+             "resistors": [["R9", "10k", "SWDIO pullup"]],
+             "capacitor": ["C9", "1uF"]}
+          ]
+        }
+      ]
+    }
+
+Resistors are [value, description] (numbered automatically) or
+[ref, value, description]; "resistors" may also name a resistor set.
+"capacitor" is [ref, value] or just a value (default "100nF").
+"wire": true adds input connectors and generates the section wiring.
+"auto_place": true places the sections with placement.py instead of in
+one fixed row.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Add scripts directory to path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+from connector_data import connector_info
+from create_connector_symbols import create_symbol_library
+from generate_schematic import generate_schematic
+from kicad_utils import set_deterministic_uuids, write_if_changed
+from symbol_cache import configure_symbol_cache
+
+
+# Horizontal distance between sections (conceptual units, see kicad_utils.py)
+SECTION_PITCH = 1.1
+SECTION_X0 = 0.5
+SECTION_Y0 = 0.7
+
+
+def load_manifest(path):
+    """
+    Load a variant manifest from JSON or YAML
+
+    Args:
+        path: Manifest file path (.json, .yaml or .yml)
+
+    Returns:
+        Manifest dict
+    """
+    with open(path, 'r') as f:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit(f"{path}: YAML manifests need PyYAML (pip install pyyaml)")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def check_variant_names(variants):
+    """
+    Make sure every variant name can serve as its output directory name
+
+    Args:
+        variants: Variant dicts from the manifest
+
+    Raises:
+        ValueError: On a missing, duplicate or path-like name
+    """
+    seen = set()
+    for i, variant in enumerate(variants):
+        name = variant.get('name')
+        if not isinstance(name, str) or not name:
+            raise ValueError(f"variant {i + 1} has no name")
+        if name in ('.', '..') or '/' in name or '\\' in name:
+            raise ValueError(f"variant name {name!r} is not a plain directory name")
+        if name in seen:
+            raise ValueError(f"duplicate variant name {name!r}")
+        seen.add(name)
+
+
+def build_sections(variant, resistor_sets=None):
+    """
+    Expand a variant's sections into generate_section() keyword dicts
+
+    Args:
+        variant: Variant dict from the manifest
+        resistor_sets: Named resistor sets from the manifest
+
+    Returns:
+        List of keyword dicts for generate_section()
+    """
+    resistor_sets = resistor_sets or {}
+    sections = []
+    next_r = 1
+    next_c = 1
+
+    for i, spec in enumerate(variant['sections']):
+        connector = spec['connector']
+        # Raises KeyError for unknown connectors
+        connector_info(connector)
+
+        resistors = spec.get('resistors', [])
+        if isinstance(resistors, str):
+            resistors = resistor_sets[resistors]
+        numbered = []
+        for entry in resistors:
+            if len(entry) == 2:
+                entry = (f"R{next_r}", *entry)
+            numbered.append(tuple(entry))
+            next_r += 1
+
+        capacitor = spec.get('capacitor', '100nF')
+        if isinstance(capacitor, str):
+            capacitor = (f"C{next_c}", capacitor)
+        next_c += 1
+
+        sections.append(dict(
+            section_num=i + 1,
+            x_base=SECTION_X0 + i * SECTION_PITCH,
+            y_base=SECTION_Y0,
+            connector_name=connector,
+            resistors=numbered,
+            capacitor=tuple(capacitor),
+            title=spec.get('title', f"Section {i + 1}: {connector}"),
+        ))
+
+    return sections
+
+
+def generate_variant(variant, output_dir, resistor_sets=None):
+    """
+    Generate the schematic and symbol library of one variant
+
+    Never raises: errors are returned in the result so one bad variant
+    does not stop the batch.
+
+    Args:
+        variant: Variant dict from the manifest
+        output_dir: Base output directory
+        resistor_sets: Named resistor sets from the manifest
+
+    Returns:
+        Dict with 'name', 'ok', 'outputs', 'seconds' and 'error'
+    """
+    name = variant.get('name', '?')
+    start = time.perf_counter()
+    result = {'name': name, 'ok': False, 'outputs': [], 'seconds': 0.0, 'error': None}
+
+    try:
+        check_variant_names([variant])
+        sections = build_sections(variant, resistor_sets)
+        connectors = list(dict.fromkeys(s['connector_name'] for s in sections))
+        variant_dir = os.path.join(output_dir, name)
+        os.makedirs(variant_dir, exist_ok=True)
+
+        sch_path = os.path.join(variant_dir, f"{name}.kicad_sch")
+        write_if_changed(sch_path, generate_schematic(
+            sections=sections,
+            connector_names=connectors,
+            title=variant.get('title', f"Adapterama - {name}"),
+            outputs=variant.get('outputs', ', '.join(connectors)),
+            wire=variant.get('wire', False),
+            place=variant.get('auto_place', False),
+        ))
+
+        # create_connector_symbols reports progress on stdout; keep workers quiet
+        with contextlib.redirect_stdout(io.StringIO()):
+            library = create_symbol_library(connectors)
+        sym_path = os.path.join(variant_dir, f"{name}-symbols.kicad_sym")
+        write_if_changed(sym_path, [library])
+
+        result['outputs'] = [sch_path, sym_path]
+        result['ok'] = True
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['traceback'] = traceback.format_exc()
+
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def _init_worker(deterministic, symbol_cache, source_date):
+    set_deterministic_uuids(deterministic)
+    if symbol_cache:
+        configure_symbol_cache(symbol_cache)
+    if source_date is not None:
+        os.environ['SOURCE_DATE_EPOCH'] = str(source_date)
+
+
+def run_batch(manifest, output_dir=None, jobs=None, symbol_cache=None, deterministic=True,
+              source_date=None):
+    """
+    Generate every variant of a manifest in a process pool
+
+    Args:
+        manifest: Manifest dict
+        output_dir: Overrides the manifest's output_dir
+        jobs: Worker processes (default: CPU count)
+        symbol_cache: Directory of the on-disk symbol cache shared by workers
+        deterministic: Derive UUIDs from keys (see set_deterministic_uuids)
+        source_date: Title block date as a Unix time (sets SOURCE_DATE_EPOCH
+            in the workers; default: leave the environment alone)
+
+    Returns:
+        List of per-variant result dicts, in manifest order
+
+    Raises:
+        ValueError: If variant names are missing, duplicated or path-like
+    """
+    output_dir = output_dir or manifest.get('output_dir', 'variants')
+    resistor_sets = manifest.get('resistor_sets', {})
+    variants = manifest['variants']
+    check_variant_names(variants)
+
+    results = [None] * len(variants)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(deterministic, symbol_cache, source_date)) as pool:
+        futures = {
+            pool.submit(generate_variant, variant, output_dir, resistor_sets): i
+            for i, variant in enumerate(variants)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                # Worker died (e.g. killed); isolate it like any other failure
+                results[i] = {
+                    'name': variants[i].get('name', '?'), 'ok': False,
+                    'outputs': [], 'seconds': 0.0,
+                    'error': f"{type(e).__name__}: {e}",
+                }
+    return results
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Batch-generate adapter variants")
+    parser.add_argument('manifest', help='variant manifest (.json, .yaml)')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes (default: CPU count)')
+    parser.add_argument('-o', '--output-dir',
+                        help="output directory (default: manifest's output_dir)")
+    parser.add_argument('--symbol-cache', metavar='DIR',
+                        help='enable the on-disk symbol cache in DIR')
+    parser.add_argument('--deterministic', action=argparse.BooleanOptionalAction,
+                        default=True,
+                        help='derive UUIDs from references and date the title blocks '
+                             'by the manifest, so unchanged variants are not rewritten '
+                             '(default: on)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main entry point"""
+    args = parse_args(argv)
+    manifest = load_manifest(args.manifest)
+    source_date = None
+    if args.deterministic and 'SOURCE_DATE_EPOCH' not in os.environ:
+        source_date = int(os.path.getmtime(args.manifest))
+    start = time.perf_counter()
+    try:
+        results = run_batch(manifest, args.output_dir, args.jobs, args.symbol_cache,
+                            args.deterministic, source_date)
+    except ValueError as e:
+        print(f"✗ {args.manifest}: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    failed = [r for r in results if not r['ok']]
+    for r in results:
+        mark = '✓' if r['ok'] else '✗'
+        detail = f"{r['seconds']:.2f}s" if r['ok'] else r['error']
+        print(f"{mark} {r['name']}: {detail}")
+
+    print(f"\n{len(results) - len(failed)}/{len(results)} variants generated in {elapsed:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Benchmark the generator hot paths
+
+Measures create_pin, create_connector_symbol, create_component,
+create_components, create_text_label and the full schematic pipeline on synthetic inputs of
+several sizes. For each case the report has the time per operation,
+throughput (operations/s and bytes/s) and peak memory from tracemalloc.
+Timing and memory are measured in separate runs, so tracemalloc
+overhead does not skew the timings.
+
+Usage:
+    python3 benchmark.py [-o results.json] [--baseline baseline.json]
+                         [--threshold 0.25] [--quick]
+
+With --baseline, any case whose time per operation grew by more than the
+threshold (a fraction, default 0.25) is reported and the exit status is 1.
+Use --save-baseline to record the current results as the new baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+# Add scripts directory to path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+from component_gen import create_component, create_components, create_text_label
+from generate_schematic import write_schematic
+from symbol_gen import create_connector_symbol, create_pin
+
+
+PIN_SIZES = [10, 100, 1000]
+COMPONENT_SIZES = [10, 1000, 10000, 50000]
+QUICK_PIN_SIZES = [10, 100]
+QUICK_COMPONENT_SIZES = [10, 1000]
+
+PIN_TYPES = ['power_in', 'input', 'output', 'bidirectional', 'open_collector', 'no_connect']
+
+# One section is a connector, seven resistors and a capacitor
+COMPONENTS_PER_SECTION = 9
+
+
+class CountingSink:
+    """Writable text sink that only counts what it is given"""
+
+    def __init__(self):
+        self.chars = 0
+
+    def write(self, text):
+        self.chars += len(text)
+
+
+def synthetic_pins(count):
+    """
+    Build a connector pin list with count pins
+
+    Args:
+        count: Number of pins
+
+    Returns:
+        List of tuples (pin_num, pin_name, pin_type, side)
+    """
+    return [
+        (str(i + 1), f'SIG{i + 1}' if i % 4 else 'GND',
+         PIN_TYPES[i % len(PIN_TYPES)], 'left' if i % 2 == 0 else 'right')
+        for i in range(count)
+    ]
+
+
+def synthetic_sections(components):
+    """
+    Build generate_section() keyword dicts totalling about components parts
+
+    Args:
+        components: Number of component instances wanted
+
+    Returns:
+        List of section keyword dicts
+    """
+    sections = []
+    r = c = 1
+    for i in range(max(1, components // COMPONENTS_PER_SECTION)):
+        resistors = []
+        for desc in ('TMS pullup', 'TDI pullup', 'nTRST pullup', 'nRESET pullup',
+                     'TMS series', 'TCK series', 'TDO series'):
+            resistors.append((f'R{r}', '10k' if 'pullup' in desc else '33', desc))
+            r += 1
+        sections.append(dict(
+            section_num=i + 1,
+            x_base=0.5 + (i % 10) * 1.1,
+            y_base=0.7 + (i // 10) * 1.5,
+            connector_name='ARM_JTAG_20pin_1.27mm',
+            resistors=resistors,
+            capacitor=(f'C{c}', '100nF'),
+            title=f'Section {i + 1}',
+        ))
+        c += 1
+    return sections
+
+
+def _pin_case(size):
+    def run():
+        out = 0
+        for i in range(size):
+            out += len(create_pin(str(i), f'SIG{i}', 'input', 'left', i * 2.54))
+        return out
+    return size, run
+
+
+def _symbol_case(size):
+    pins = synthetic_pins(size)
+
+    def run():
+        return len(create_connector_symbol(f'BENCH_{size}pin', 'bench.md', pins))
+    return 1, run
+
+
+def _component_case(size):
+    def run():
+        out = 0
+        for i in range(size):
+            out += len(create_component(
+                f'R{i}', '10k', 'R', i * 0.01, i * 0.02,
+                'Resistor_SMD:R_0603_1608Metric', {'Description': 'bench'},
+            ))
+        return out
+    return size, run
+
+
+def _components_case(size):
+    columns = (
+        [f'R{i}' for i in range(size)], ['10k'] * size, ['R'] * size,
+        [i * 0.01 for i in range(size)], [i * 0.02 for i in range(size)],
+        ['Resistor_SMD:R_0603_1608Metric'] * size, [{'Description': 'bench'}] * size,
+    )
+
+    def run():
+        return len(create_components(*columns))
+    return size, run
+
+
+def _label_case(size):
+    def run():
+        out = 0
+        for i in range(size):
+            out += len(create_text_label(f'Label {i}', i * 0.01, 0.3))
+        return out
+    return size, run
+
+
+def _pipeline_case(size):
+    sections = synthetic_sections(size)
+
+    def run():
+        sink = CountingSink()
+        write_schematic(sink, sections=sections)
+        return sink.chars
+    return len(sections) * COMPONENTS_PER_SECTION, run
+
+
+def build_cases(quick=False):
+    """
+    List the benchmark cases
+
+    Args:
+        quick: Use the small sizes only
+
+    Returns:
+        List of (name, size, factory) where factory() gives (ops, run)
+    """
+    pin_sizes = QUICK_PIN_SIZES if quick else PIN_SIZES
+    comp_sizes = QUICK_COMPONENT_SIZES if quick else COMPONENT_SIZES
+    cases = []
+    for size in pin_sizes:
+        cases.append((f'create_pin/{size}', size, lambda s=size: _pin_case(s)))
+        cases.append((f'create_connector_symbol/{size}', size, lambda s=size: _symbol_case(s)))
+    for size in comp_sizes:
+        cases.append((f'create_component/{size}', size, lambda s=size: _component_case(s)))
+        cases.append((f'create_components/{size}', size, lambda s=size: _components_case(s)))
+        cases.append((f'create_text_label/{size}', size, lambda s=size: _label_case(s)))
+        cases.append((f'pipeline/{size}', size, lambda s=size: _pipeline_case(s)))
+    return cases
+
+
+def measure(factory, repeat):
+    """
+    Time a case (best of repeat runs) and measure its peak memory
+
+    Args:
+        factory: Callable returning (ops, run)
+        repeat: Number of timed runs
+
+    Returns:
+        Result dict
+    """
+    ops, run = factory()
+
+    best = None
+    chars = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chars = run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = max(best, 1e-9)
+    return {
+        'ops': ops,
+        'seconds': best,
+        'us_per_op': best / ops * 1e6,
+        'ops_per_s': ops / best,
+        'bytes': chars,
+        'bytes_per_s': chars / best,
+        'peak_kib': peak / 1024,
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Find cases that got slower than the baseline
+
+    Args:
+        results: Current results dict
+        baseline: Baseline results dict
+        threshold: Allowed relative slowdown (0.25 = 25%)
+
+    Returns:
+        List of (name, baseline_us, current_us, ratio)
+    """
+    regressions = []
+    for name, current in results['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            continue
+        ratio = current['us_per_op'] / base['us_per_op']
+        if ratio > 1 + threshold:
+            regressions.append((name, base['us_per_op'], current['us_per_op'], ratio))
+    return regressions
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Benchmark the generator hot paths")
+    parser.add_argument('-o', '--output', default='benchmark.json',
+                        help='results file (default: %(default)s)')
+    parser.add_argument('--baseline', help='baseline results to compare against')
+    parser.add_argument('--save-baseline', metavar='PATH',
+                        help='also write the results as a new baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed slowdown per operation (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='timed runs per case, best is kept (default: %(default)s)')
+    parser.add_argument('--quick', action='store_true', help='small sizes only')
+    parser.add_argument('-k', '--filter', default='',
+                        help='only run cases whose name contains this text')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main entry point"""
+    args = parse_args(argv)
+
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': {},
+    }
+
+    print(f"{'case':<36} {'us/op':>10} {'ops/s':>12} {'MB/s':>8} {'peak KiB':>10}")
+    for name, size, factory in build_cases(args.quick):
+        if args.filter not in name:
+            continue
+        r = measure(factory, args.repeat)
+        results['results'][name] = r
+        print(f"{name:<36} {r['us_per_op']:>10.2f} {r['ops_per_s']:>12.0f} "
+              f"{r['bytes_per_s'] / 1e6:>8.2f} {r['peak_kib']:>10.0f}")
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions (>{args.threshold:.0%} slower than baseline):")
+            for name, base, current, ratio in regressions:
+                print(f"  {name}: {base:.2f} -> {current:.2f} us/op ({ratio:.2f}x)")
+            return 1
+        print(f"\nNo regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
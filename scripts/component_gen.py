@@ -2,10 +2,12 @@
 KiCad component instance and text label generation
 """
 
-from kicad_utils import mm_to_mils, generate_uuid
+from coords import conceptual_to_nm, fmt, to_nm
+from kicad_utils import generate_uuid
 
 
-def create_component(ref, value, lib_id, x_mm, y_mm, footprint="", properties=None):
+def create_component(ref, value, lib_id, x_mm, y_mm, footprint="", properties=None,
+                     sheet_path="/"):
     """
     Create a component instance
 
@@ -17,45 +19,159 @@ def create_component(ref, value, lib_id, x_mm, y_mm, footprint="", properties=No
         y_mm: Y position in mm (conceptual units - see kicad_utils.mm_to_mils)
         footprint: Footprint library path (optional)
         properties: Dictionary of additional properties (optional)
+        sheet_path: Hierarchical sheet path of the instance (default "/")
 
     Returns:
         Component instance S-expression
     """
-    uuid_str = generate_uuid()
-    x = mm_to_mils(x_mm)
-    y = mm_to_mils(y_mm)
+    uuid_str = generate_uuid(f"{sheet_path}{ref}")
+    y_nm = conceptual_to_nm(y_mm)
+    x = fmt(conceptual_to_nm(x_mm))
+    y = fmt(y_nm)
     props = properties or {}
 
-    comp = f'\t(symbol (lib_id "{lib_id}") (at {x:.4f} {y:.4f} 0) (unit 1)\n'
+    comp = f'\t(symbol (lib_id "{lib_id}") (at {x} {y} 0) (unit 1)\n'
     comp += f'\t\t(exclude_from_sim no) (in_bom yes) (on_board yes) (dnp no)\n'
     comp += f'\t\t(uuid {uuid_str})\n'
-    comp += f'\t\t(property "Reference" "{ref}" (at {x:.4f} {y - mm_to_mils(3):.4f} 0)\n'
+    comp += f'\t\t(property "Reference" "{ref}" (at {x} {fmt(y_nm - _FIELD_OFFSET)} 0)\n'
     comp += f'\t\t\t(effects (font (size 1.27 1.27)))\n'
     comp += f'\t\t)\n'
-    comp += f'\t\t(property "Value" "{value}" (at {x:.4f} {y + mm_to_mils(3):.4f} 0)\n'
+    comp += f'\t\t(property "Value" "{value}" (at {x} {fmt(y_nm + _FIELD_OFFSET)} 0)\n'
     comp += f'\t\t\t(effects (font (size 1.27 1.27)))\n'
     comp += f'\t\t)\n'
     if footprint:
-        comp += f'\t\t(property "Footprint" "{footprint}" (at {x:.4f} {y:.4f} 0)\n'
+        comp += f'\t\t(property "Footprint" "{footprint}" (at {x} {y} 0)\n'
         comp += f'\t\t\t(effects (font (size 1.27 1.27)) hide)\n'
         comp += f'\t\t)\n'
-    comp += f'\t\t(property "Datasheet" "~" (at {x:.4f} {y:.4f} 0)\n'
+    comp += f'\t\t(property "Datasheet" "~" (at {x} {y} 0)\n'
     comp += f'\t\t\t(effects (font (size 1.27 1.27)) hide)\n'
     comp += f'\t\t)\n'
     for prop_name, prop_value in props.items():
-        comp += f'\t\t(property "{prop_name}" "{prop_value}" (at {x:.4f} {y:.4f} 0)\n'
+        comp += f'\t\t(property "{prop_name}" "{prop_value}" (at {x} {y} 0)\n'
         comp += f'\t\t\t(effects (font (size 1.27 1.27)) hide)\n'
         comp += f'\t\t)\n'
     comp += f'\t\t(instances\n'
     comp += f'\t\t\t(project "adapterama"\n'
-    comp += f'\t\t\t\t(path "/" (reference "{ref}") (unit 1))\n'
+    comp += f'\t\t\t\t(path "{sheet_path}" (reference "{ref}") (unit 1))\n'
     comp += f'\t\t\t)\n'
     comp += f'\t\t)\n'
     comp += f'\t)\n'
     return comp
 
 
-def create_text_label(text, x_mm, y_mm, size=2.54):
+# Offset of the Reference/Value fields from the symbol origin, in nm
+_FIELD_OFFSET = conceptual_to_nm(3)
+
+
+def _escape_braces(text):
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+def _component_template(has_footprint, property_names, sheet_path):
+    """
+    Compile the create_component() layout into one str.format() template
+
+    Fields: {0} lib_id, {1} x, {2} y, {3} uuid, {4} ref, {5} Reference y,
+    {6} value, {7} Value y, {8} footprint, {9}... property values.
+    """
+    hidden = '\t\t\t(effects (font (size 1.27 1.27)) hide)\n\t\t)\n'
+    template = (
+        '\t(symbol (lib_id "{0}") (at {1} {2} 0) (unit 1)\n'
+        '\t\t(exclude_from_sim no) (in_bom yes) (on_board yes) (dnp no)\n'
+        '\t\t(uuid {3})\n'
+        '\t\t(property "Reference" "{4}" (at {1} {5} 0)\n'
+        '\t\t\t(effects (font (size 1.27 1.27)))\n'
+        '\t\t)\n'
+        '\t\t(property "Value" "{6}" (at {1} {7} 0)\n'
+        '\t\t\t(effects (font (size 1.27 1.27)))\n'
+        '\t\t)\n'
+    )
+    if has_footprint:
+        template += '\t\t(property "Footprint" "{8}" (at {1} {2} 0)\n' + hidden
+    template += '\t\t(property "Datasheet" "~" (at {1} {2} 0)\n' + hidden
+    for i, name in enumerate(property_names, 9):
+        template += f'\t\t(property "{_escape_braces(name)}" "{{{i}}}" (at {{1}} {{2}} 0)\n'
+        template += hidden
+    template += (
+        '\t\t(instances\n'
+        '\t\t\t(project "adapterama"\n'
+        f'\t\t\t\t(path "{_escape_braces(sheet_path)}" (reference "{{4}}") (unit 1))\n'
+        '\t\t\t)\n'
+        '\t\t)\n'
+        '\t)\n'
+    )
+    return template
+
+
+def create_components(refs, values, lib_ids, xs, ys, footprints=None, properties=None,
+                      sheet_path="/"):
+    """
+    Create many component instances from columns
+
+    Gives the same text as calling create_component() for each row, but
+    converts and formats all coordinates in one pass and fills a
+    precompiled template per (footprint, property names) layout instead
+    of concatenating strings per field.
+
+    Args:
+        refs: Reference designators
+        values: Component values
+        lib_ids: Symbol library IDs
+        xs: X positions in mm (conceptual units - see kicad_utils.mm_to_mils)
+        ys: Y positions in mm (conceptual units)
+        footprints: Footprint library paths (optional, "" for none)
+        properties: Dicts of additional properties (optional, None for none)
+        sheet_path: Hierarchical sheet path of the instances (default "/")
+
+    Returns:
+        Component instance S-expressions, concatenated
+    """
+    return ''.join(component_texts(refs, values, lib_ids, xs, ys, footprints, properties,
+                                   sheet_path))
+
+
+def component_texts(refs, values, lib_ids, xs, ys, footprints=None, properties=None,
+                    sheet_path="/"):
+    """
+    Like create_components(), but one S-expression per component
+
+    Returns:
+        List of component instance S-expressions, in input order
+    """
+    count = len(refs)
+    if footprints is None:
+        footprints = ('',) * count
+    if properties is None:
+        properties = (None,) * count
+    if not len(values) == len(lib_ids) == len(xs) == len(ys) == len(footprints) \
+            == len(properties) == count:
+        raise ValueError("create_components() columns differ in length")
+
+    y_nm = [conceptual_to_nm(y) for y in ys]
+    x_text = [fmt(conceptual_to_nm(x)) for x in xs]
+    y_text = [fmt(y) for y in y_nm]
+    ref_y_text = [fmt(y - _FIELD_OFFSET) for y in y_nm]
+    value_y_text = [fmt(y + _FIELD_OFFSET) for y in y_nm]
+
+    templates = {}
+    out = []
+    append = out.append
+    for i in range(count):
+        ref = refs[i]
+        footprint = footprints[i]
+        props = properties[i] or {}
+        layout = (bool(footprint), tuple(props))
+        template = templates.get(layout)
+        if template is None:
+            template = templates[layout] = _component_template(*layout, sheet_path)
+        append(template.format(
+            lib_ids[i], x_text[i], y_text[i], generate_uuid(f"{sheet_path}{ref}"), ref,
+            ref_y_text[i], values[i], value_y_text[i], footprint, *props.values(),
+        ))
+    return out
+
+
+def create_text_label(text, x_mm, y_mm, size=2.54, sheet_path="/"):
     """
     Create text label
 
@@ -64,16 +180,162 @@ def create_text_label(text, x_mm, y_mm, size=2.54):
         x_mm: X position in mm (conceptual units)
         y_mm: Y position in mm (conceptual units)
         size: Font size (default 2.54)
+        sheet_path: Hierarchical sheet path of the label (default "/")
 
     Returns:
         Text label S-expression
     """
-    x = mm_to_mils(x_mm)
-    y = mm_to_mils(y_mm)
-    uuid_str = generate_uuid()
+    x = fmt(conceptual_to_nm(x_mm))
+    y = fmt(conceptual_to_nm(y_mm))
+    uuid_str = generate_uuid(f"{sheet_path}text:{text}@{x_mm},{y_mm}")
     label = f'\t(text "{text}" (exclude_from_sim no)\n'
-    label += f'\t\t(at {x:.4f} {y:.4f} 0)\n'
+    label += f'\t\t(at {x} {y} 0)\n'
     label += f'\t\t(effects (font (size {size} {size}) bold) (justify left))\n'
     label += f'\t\t(uuid {uuid_str})\n'
     label += f'\t)\n'
     return label
+
+
+def create_wire(x1, y1, x2, y2, sheet_path="/"):
+    """
+    Create a wire segment
+
+    Args:
+        x1, y1: Start point in schematic mm (not conceptual units)
+        x2, y2: End point in schematic mm
+        sheet_path: Hierarchical sheet path of the wire (default "/")
+
+    Returns:
+        Wire S-expression
+    """
+    x1, y1, x2, y2 = fmt(to_nm(x1)), fmt(to_nm(y1)), fmt(to_nm(x2)), fmt(to_nm(y2))
+    uuid_str = generate_uuid(f"{sheet_path}wire:{x1},{y1}-{x2},{y2}")
+    wire = f'\t(wire (pts (xy {x1} {y1}) (xy {x2} {y2}))\n'
+    wire += f'\t\t(stroke (width 0) (type default))\n'
+    wire += f'\t\t(uuid {uuid_str})\n'
+    wire += f'\t)\n'
+    return wire
+
+
+def create_net_label(name, x, y, angle=0, kind="label", sheet_path="/"):
+    """
+    Create a local or global net label
+
+    Args:
+        name: Net name
+        x, y: Connection point in schematic mm (not conceptual units)
+        angle: Text direction: 0 (right), 90 (up), 180 (left) or 270 (down)
+        kind: "label" (this sheet only) or "global_label" (all sheets)
+        sheet_path: Hierarchical sheet path of the label (default "/")
+
+    Returns:
+        Label S-expression
+    """
+    x, y = fmt(to_nm(x)), fmt(to_nm(y))
+    uuid_str = generate_uuid(f"{sheet_path}{kind}:{name}@{x},{y}")
+    justify = "right" if angle in (180, 270) else "left"
+    label = f'\t({kind} "{name}"'
+    if kind == "global_label":
+        label += ' (shape bidirectional)'
+    label += f' (at {x} {y} {angle}) (fields_autoplaced yes)\n'
+    label += f'\t\t(effects (font (size 1.27 1.27)) (justify {justify}))\n'
+    label += f'\t\t(uuid {uuid_str})\n'
+    label += f'\t)\n'
+    return label
+
+
+# Field offsets of power symbols and sheets, in nm
+_POWER_REF_OFFSET = to_nm(6.35)
+_POWER_VALUE_OFFSET = to_nm(3.81)
+_SHEETNAME_OFFSET = to_nm(0.7116)
+_SHEETFILE_OFFSET = to_nm(0.5846)
+
+
+def create_power_port(ref, net, x, y, sheet_path="/"):
+    """
+    Create a power symbol instance (see symbol_gen.create_power_symbol)
+
+    Args:
+        ref: Power reference (e.g., "#PWR01")
+        net: Power net and symbol name (e.g., "GND")
+        x, y: Connection point in schematic mm (not conceptual units)
+        sheet_path: Hierarchical sheet path of the instance (default "/")
+
+    Returns:
+        Power symbol instance S-expression
+    """
+    uuid_str = generate_uuid(f"{sheet_path}{ref}")
+    y_nm = to_nm(y)
+    x, y = fmt(to_nm(x)), fmt(y_nm)
+    port = f'\t(symbol (lib_id "{net}") (at {x} {y} 0) (unit 1)\n'
+    port += f'\t\t(exclude_from_sim no) (in_bom yes) (on_board yes) (dnp no)\n'
+    port += f'\t\t(uuid {uuid_str})\n'
+    port += f'\t\t(property "Reference" "{ref}" (at {x} {fmt(y_nm + _POWER_REF_OFFSET)} 0)\n'
+    port += f'\t\t\t(effects (font (size 1.27 1.27)) hide)\n'
+    port += f'\t\t)\n'
+    port += f'\t\t(property "Value" "{net}" (at {x} {fmt(y_nm + _POWER_VALUE_OFFSET)} 0)\n'
+    port += f'\t\t\t(effects (font (size 1.27 1.27)))\n'
+    port += f'\t\t)\n'
+    port += f'\t\t(instances\n'
+    port += f'\t\t\t(project "adapterama"\n'
+    port += f'\t\t\t\t(path "{sheet_path}" (reference "{ref}") (unit 1))\n'
+    port += f'\t\t\t)\n'
+    port += f'\t\t)\n'
+    port += f'\t)\n'
+    return port
+
+
+def create_no_connect(x, y, sheet_path="/"):
+    """
+    Create a no-connect flag
+
+    Args:
+        x, y: Pin connection point in schematic mm (not conceptual units)
+        sheet_path: Hierarchical sheet path of the flag (default "/")
+
+    Returns:
+        No-connect S-expression
+    """
+    x, y = fmt(to_nm(x)), fmt(to_nm(y))
+    uuid_str = generate_uuid(f"{sheet_path}nc:{x},{y}")
+    return f'\t(no_connect (at {x} {y}) (uuid {uuid_str}))\n'
+
+
+def create_sheet(name, filename, x, y, width, height, uuid_str, page, parent_path="/"):
+    """
+    Create a hierarchical sheet reference
+
+    Args:
+        name: Sheet name (e.g., "Sections 1-4")
+        filename: Sub-sheet file, relative to the parent schematic
+        x, y: Top left corner in schematic mm (not conceptual units)
+        width, height: Sheet box size in mm
+        uuid_str: UUID of the sheet; the sub-sheet's instance paths end in it
+        page: Page number of the sub-sheet
+        parent_path: Instance path of the parent sheet (e.g., "/<root uuid>")
+
+    Returns:
+        Sheet S-expression
+    """
+    y_nm = to_nm(y)
+    x, y = fmt(to_nm(x)), fmt(y_nm)
+    height_nm = to_nm(height)
+    sheet = f'\t(sheet (at {x} {y}) (size {fmt(to_nm(width))} {fmt(height_nm)})\n'
+    sheet += f'\t\t(exclude_from_sim no) (in_bom yes) (on_board yes) (dnp no)\n'
+    sheet += f'\t\t(fields_autoplaced yes)\n'
+    sheet += f'\t\t(stroke (width 0.1524) (type solid))\n'
+    sheet += f'\t\t(fill (color 0 0 0 0.0000))\n'
+    sheet += f'\t\t(uuid {uuid_str})\n'
+    sheet += f'\t\t(property "Sheetname" "{name}" (at {x} {fmt(y_nm - _SHEETNAME_OFFSET)} 0)\n'
+    sheet += f'\t\t\t(effects (font (size 1.27 1.27)) (justify left bottom))\n'
+    sheet += f'\t\t)\n'
+    sheet += f'\t\t(property "Sheetfile" "{filename}" (at {x} {fmt(y_nm + height_nm + _SHEETFILE_OFFSET)} 0)\n'
+    sheet += f'\t\t\t(effects (font (size 1.27 1.27)) (justify left top))\n'
+    sheet += f'\t\t)\n'
+    sheet += f'\t\t(instances\n'
+    sheet += f'\t\t\t(project "adapterama"\n'
+    sheet += f'\t\t\t\t(path "{parent_path}" (page "{page}"))\n'
+    sheet += f'\t\t\t)\n'
+    sheet += f'\t\t)\n'
+    sheet += f'\t)\n'
+    return sheet
@@ -15,8 +15,25 @@ Electrical types:
 Side:
     - left: Pin appears on left side of symbol
     - right: Pin appears on right side of symbol
+
+INPUT_CONNECTOR_INFO holds the J-Link side (2.54mm IDC) input connectors
+in the same format.
+
+connector_info() adds 'pin_table' to an entry on first lookup, a
+PinTable view of its pins with lookups by number, name and side (see
+pin_table.py). It is built lazily so that a bad pin list only breaks
+the connectors that use it, not every import of this module (and
+validate_connectors.py can still report it).
+
+connector_footprint() names a connector's KiCad footprint from its pin
+count and the pitch in its name; the schematic and the board
+(generate_pcb.py) both use it.
 """
 
+import re
+
+from pin_table import PinTable
+
 # ============================================================================
 # ARM JTAG 20-pin 1.27mm - Standard ARM JTAG connector
 # ============================================================================
@@ -176,6 +193,34 @@ TI_20PIN_LEGACY_PINS = [
     ('20', 'GND', 'power_in', 'right'),
 ]
 
+# ============================================================================
+# ARM JTAG 20-pin 2.54mm - IDC input connector from J-Link
+# ============================================================================
+# Note: Same signal order as the 1.27mm ARM 20-pin (standard 2.54mm pitch)
+
+ARM_20PIN_2_54MM_PINS = [
+    ('1', 'VTref', 'power_in', 'left'),
+    ('2', 'NC/VDD', 'power_in', 'right'),
+    ('3', 'nTRST', 'input', 'left'),
+    ('4', 'GND', 'power_in', 'right'),
+    ('5', 'TDI', 'input', 'left'),
+    ('6', 'GND', 'power_in', 'right'),
+    ('7', 'TMS', 'input', 'left'),
+    ('8', 'GND', 'power_in', 'right'),
+    ('9', 'TCK', 'input', 'left'),
+    ('10', 'GND', 'power_in', 'right'),
+    ('11', 'RTCK', 'output', 'left'),
+    ('12', 'GND', 'power_in', 'right'),
+    ('13', 'TDO', 'output', 'left'),
+    ('14', 'GND', 'power_in', 'right'),
+    ('15', 'nRESET', 'open_collector', 'left'),
+    ('16', 'GND', 'power_in', 'right'),
+    ('17', 'NC', 'no_connect', 'left'),
+    ('18', 'GND', 'power_in', 'right'),
+    ('19', 'NC', 'no_connect', 'left'),
+    ('20', 'GND', 'power_in', 'right'),
+]
+
 # ============================================================================
 # Connector Metadata
 # ============================================================================
@@ -212,3 +257,89 @@ CONNECTOR_INFO = {
         'description': 'Legacy TI 20-pin JTAG (older design)',
     },
 }
+
+INPUT_CONNECTOR_INFO = {
+    'ARM_JTAG_20pin_2.54mm': {
+        'pins': ARM_20PIN_2_54MM_PINS,
+        'datasheet': 'connector-specs/ARM-20pin-2.54mm.md',
+        'description': 'ARM 20-pin JTAG IDC input from J-Link',
+    },
+}
+
+
+def connector_info(name):
+    """
+    Look up an output or input connector by symbol name
+
+    Connectors defined only by a spec file in connector-specs/ are
+    loaded on demand (see spec_loader.py).
+
+    Args:
+        name: CONNECTOR_INFO or INPUT_CONNECTOR_INFO key, or the stem of
+            a connector-specs/*.md file
+
+    Returns:
+        The connector's info dict, with its 'pin_table'
+
+    Raises:
+        KeyError: If name is not a known connector
+        ValueError: If its pin list is invalid (see PinTable)
+    """
+    info = CONNECTOR_INFO.get(name) or INPUT_CONNECTOR_INFO.get(name)
+    if info is None:
+        import spec_loader
+        if name not in spec_loader.CONNECTOR_INFO:
+            raise KeyError(f"unknown connector {name!r}")
+        info = spec_loader.CONNECTOR_INFO[name]
+    if 'pin_table' not in info:
+        info['pin_table'] = PinTable(info['pins'])
+    return info
+
+
+# Pin pitch in a connector name: ..._1.27mm, ..._2.54mm_Legacy
+_PITCH = re.compile(r'_(\d+\.\d+)mm')
+
+
+def connector_pitch(name):
+    """
+    Pin pitch of a connector, from its name
+
+    Raises:
+        ValueError: If the name carries no pitch
+    """
+    match = _PITCH.search(name)
+    if not match:
+        raise ValueError(f"cannot tell the pitch of {name} from its name")
+    return float(match.group(1))
+
+
+def header_footprint_name(pin_count, pitch, idc=False):
+    """
+    Library ID of a two-row through-hole header
+
+    Args:
+        pin_count: Number of pins
+        pitch: Pin pitch in mm
+        idc: Shrouded IDC header instead of a plain pin header
+
+    Returns:
+        Footprint library ID, e.g.
+        "Connector_PinHeader_1.27mm:PinHeader_2x10_P1.27mm_Vertical"
+    """
+    rows = (pin_count + 1) // 2
+    pitch_text = f"{pitch:.2f}mm"
+    if idc:
+        return f"Connector_IDC:IDC-Header_2x{rows:02d}_P{pitch_text}_Vertical"
+    return f"Connector_PinHeader_{pitch_text}:PinHeader_2x{rows:02d}_P{pitch_text}_Vertical"
+
+
+def connector_footprint(name):
+    """
+    Footprint library ID of a connector (input connectors are IDC headers)
+
+    Raises:
+        KeyError: If name is not a known connector
+        ValueError: If the name carries no pitch
+    """
+    return header_footprint_name(len(connector_info(name)['pins']), connector_pitch(name),
+                                 name in INPUT_CONNECTOR_INFO)
@@ -0,0 +1,159 @@
+"""
+Fixed-point coordinates in integer nanometres
+
+KiCad stores all geometry as integer nanometres (its internal units) and
+only turns them into decimal millimetres when writing a file. The
+emitters in symbol_gen.py and component_gen.py do the same: positions
+are converted to integers once, offsets are added as integers, and
+the text comes from fmt(), which formats with integer division.
+Float formatting can turn 2.54 + 1.27 into 3.8099999 instead of 3.81.
+Integer math has no such drift, and a coordinate that repeats (every
+property of a component, every pin row of a section) is formatted once.
+
+    >>> fmt(to_nm(2.54) + to_nm(1.27))
+    '3.8100'
+    >>> fmt(conceptual_to_nm(0.3))
+    '11.8110'
+    >>> fmt(snap(to_nm(7.7), GRID_10MIL), 2)
+    '7.62'
+    >>> fmt_short(to_nm(-10.16))
+    '-10.16'
+    >>> fmt(snap_up(to_nm(2.6)), 2)
+    '3.81'
+
+Code that needs a point to coincide with emitted geometry (wire stubs on
+pins, net labels, placement) works on the same integer grid: symbol
+positions as fmt() prints them, see printed(), plus exact offsets.
+"""
+
+from functools import lru_cache
+
+
+NM_PER_MM = 1_000_000
+
+# Grids in nanometres
+GRID_10MIL = 254_000
+GRID_50MIL = 1_270_000
+
+# Resolution of fmt()'s default 4 decimals
+PRINT_STEP = 100
+
+# The project's conceptual units are scaled by 1/0.0254 on output (see
+# kicad_utils.mm_to_mils): one unit is 1e10 / 254 nm
+_CONCEPTUAL_NUM = 10_000_000_000
+_CONCEPTUAL_DEN = 254
+
+
+def to_nm(mm):
+    """
+    Millimetres to integer nanometres
+
+    Args:
+        mm: Length or position in schematic mm (int or float)
+
+    Returns:
+        Nearest whole number of nanometres
+    """
+    return round(mm * NM_PER_MM)
+
+
+def conceptual_to_nm(units):
+    """
+    Conceptual units (see kicad_utils.mm_to_mils) to integer nanometres
+
+    Same position as to_nm(mm_to_mils(units)), without the float division.
+
+    Args:
+        units: Position in conceptual units
+
+    Returns:
+        Nearest whole number of nanometres
+    """
+    if isinstance(units, int):
+        quotient, remainder = divmod(units * _CONCEPTUAL_NUM, _CONCEPTUAL_DEN)
+        return quotient + (2 * remainder >= _CONCEPTUAL_DEN)
+    return round(units * _CONCEPTUAL_NUM / _CONCEPTUAL_DEN)
+
+
+def to_conceptual(nm):
+    """Integer nanometres to (float) conceptual units, see conceptual_to_nm()"""
+    return nm * _CONCEPTUAL_DEN / _CONCEPTUAL_NUM
+
+
+def to_mm(nm):
+    """Integer nanometres to (float) millimetres"""
+    return nm / NM_PER_MM
+
+
+def snap(nm, grid=GRID_50MIL):
+    """
+    Round to the nearest multiple of a grid, halves away from zero
+
+    Args:
+        nm: Coordinate in nanometres
+        grid: Grid pitch in nanometres (default 50 mil)
+
+    Returns:
+        Snapped coordinate in nanometres
+    """
+    quotient, remainder = divmod(abs(nm) + grid // 2, grid)
+    snapped = quotient * grid
+    return -snapped if nm < 0 else snapped
+
+
+def snap_up(nm, grid=GRID_50MIL):
+    """
+    Round up to the next multiple of a grid
+
+    Args:
+        nm: Coordinate in nanometres
+        grid: Grid pitch in nanometres (default 50 mil)
+
+    Returns:
+        Smallest multiple of grid not below nm
+    """
+    return -(-nm // grid) * grid
+
+
+def printed(nm):
+    """Position as fmt() writes it with 4 decimals, in nanometres"""
+    return snap(nm, PRINT_STEP)
+
+
+@lru_cache(maxsize=65536)
+def fmt(nm, decimals=4):
+    """
+    Format nanometres as decimal millimetres with a fixed number of decimals
+
+    Rounds halves away from zero, with integer math only; gives the same
+    text as f'{mm:.{decimals}f}' except that it never writes "-0.0000".
+
+    Args:
+        nm: Coordinate in nanometres (int)
+        decimals: Digits after the decimal point (0 to 6)
+
+    Returns:
+        Text such as "-12.7000"
+    """
+    step = 10 ** (6 - decimals)
+    units, remainder = divmod(abs(nm), step)
+    if 2 * remainder >= step:
+        units += 1
+    sign = '-' if nm < 0 and units else ''
+    if not decimals:
+        return f'{sign}{units}'
+    whole, fraction = divmod(units, 10 ** decimals)
+    return f'{sign}{whole}.{fraction:0{decimals}d}'
+
+
+def fmt_short(nm):
+    """
+    Format nanometres as millimetres without trailing zeros
+
+    Args:
+        nm: Coordinate in nanometres (int)
+
+    Returns:
+        Shortest exact text, such as "-10.16" or "0"
+    """
+    return fmt(nm, 6).rstrip('0').rstrip('.')
@@ -2,90 +2,210 @@
 """
 Generate specific connector symbols for the Adapterama project.
 This script creates properly named symbols for each connector type.
+
+Connectors whose symbols are structurally identical (same pins, types
+and geometry; only the name and properties differ) are written once:
+later ones become (extends "...") aliases carrying just their
+properties. --no-dedup writes every symbol in full.
+
+--incremental keeps an index next to the library
+(<library dir>/.cache/<library>.index.json) with every symbol's input
+key (symbol_cache.symbol_key of its name, datasheet and pins), structure
+hash, alias parent and byte span. An update only regenerates the
+symbols whose key or parent changed and splices them in at their
+recorded spans; the library is neither regenerated nor rescanned.
+Without a valid index (first run, or the file was edited since) the
+library is scanned once and the index rebuilt.
 """
 
+import argparse
+import bisect
+import hashlib
+import json
+import re
 import sys
 import os
 
 # Add scripts directory to path so we can import our modules
 sys.path.insert(0, os.path.dirname(__file__))
 
-from connector_data import CONNECTOR_INFO
-from symbol_gen import create_connector_symbol
+from connector_data import CONNECTOR_INFO, connector_info
+from symbol_cache import cached_connector_symbol, configure_symbol_cache, symbol_key
+from kicad_utils import write_if_changed
+from profiling import add_profile_arguments, profile_session, stage, timed
 
 
-def generate_all_connector_symbols():
-    """Generate all connector symbols from CONNECTOR_INFO"""
+@timed('library.symbols')
+def generate_all_connector_symbols(names=None):
+    """
+    Generate all connector symbols from CONNECTOR_INFO
+
+    Args:
+        names: Connector names to generate (default: all CONNECTOR_INFO)
+    """
     symbols = []
 
-    for symbol_name, info in CONNECTOR_INFO.items():
+    if names is None:
+        names = CONNECTOR_INFO
+
+    for symbol_name in names:
+        info = connector_info(symbol_name)
         print(f"Generating symbol: {symbol_name}")
-        symbol = create_connector_symbol(
+        symbol = cached_connector_symbol(
             name=symbol_name,
             datasheet=info['datasheet'],
-            pins=info['pins']
+            pins=info['pin_table']
         )
         symbols.append(symbol)
 
     return symbols
 
 
+@timed('library.input_symbol')
 def add_20pin_2_54mm_connector():
     """Add the ARM 20-pin 2.54mm connector (IDC input connector)"""
-    # This is the input connector from J-Link (standard 2.54mm pitch)
-    ARM_20PIN_2_54MM_PINS = [
-        ('1', 'VTref', 'power_in', 'left'),
-        ('2', 'NC/VDD', 'power_in', 'right'),
-        ('3', 'nTRST', 'input', 'left'),
-        ('4', 'GND', 'power_in', 'right'),
-        ('5', 'TDI', 'input', 'left'),
-        ('6', 'GND', 'power_in', 'right'),
-        ('7', 'TMS', 'input', 'left'),
-        ('8', 'GND', 'power_in', 'right'),
-        ('9', 'TCK', 'input', 'left'),
-        ('10', 'GND', 'power_in', 'right'),
-        ('11', 'RTCK', 'output', 'left'),
-        ('12', 'GND', 'power_in', 'right'),
-        ('13', 'TDO', 'output', 'left'),
-        ('14', 'GND', 'power_in', 'right'),
-        ('15', 'nRESET', 'open_collector', 'left'),
-        ('16', 'GND', 'power_in', 'right'),
-        ('17', 'NC', 'no_connect', 'left'),
-        ('18', 'GND', 'power_in', 'right'),
-        ('19', 'NC', 'no_connect', 'left'),
-        ('20', 'GND', 'power_in', 'right'),
-    ]
-
     print("Generating symbol: ARM_JTAG_20pin_2.54mm")
-    return create_connector_symbol(
+    info = connector_info('ARM_JTAG_20pin_2.54mm')
+    return cached_connector_symbol(
         name='ARM_JTAG_20pin_2.54mm',
-        datasheet='connector-specs/ARM-20pin-2.54mm.md',
-        pins=ARM_20PIN_2_54MM_PINS
+        datasheet=info['datasheet'],
+        pins=info['pin_table']
     )
 
 
-def create_symbol_library():
-    """Create the complete symbol library file"""
-
-    # Generate all symbols
-    connector_symbols = generate_all_connector_symbols()
-
-    # Add the 2.54mm input connector
-    input_connector = add_20pin_2_54mm_connector()
-    connector_symbols.append(input_connector)
-
-    # Build the library header
-    library_header = '''(kicad_symbol_lib
+LIBRARY_HEADER = '''(kicad_symbol_lib
 \t(version 20231120)
 \t(generator "python-script")
 \t(generator_version "2.0")
 '''
 
+DEFAULT_OUTPUT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'adapterama-symbols.kicad_sym'
+)
+
+
+# Start of the first unit, which ends a symbol's header (options and properties)
+_UNIT_START = '\n\t\t(symbol "'
+_FIRST_PROPERTY = '\t\t(property '
+
+
+def split_symbol(symbol):
+    """
+    Split a generated symbol into its parts
+
+    Args:
+        symbol: S-expression from symbol_gen.create_connector_symbol()
+
+    Returns:
+        (options, properties, units): the header lines before the first
+        property, the property blocks, and the unit sub-symbols with the
+        symbol's closing parenthesis
+    """
+    units_at = symbol.index(_UNIT_START)
+    properties_at = symbol.index(_FIRST_PROPERTY)
+    return symbol[:properties_at], symbol[properties_at:units_at], symbol[units_at:]
+
+
+def symbol_structure(name, symbol):
+    """
+    Structural hash of a symbol: its pins, types and graphics
+
+    The name (also used in the unit names) and the properties are left
+    out, so two connectors that only differ there hash the same.
+    """
+    options, _, units = split_symbol(symbol)
+    options = options[options.index('\n', options.index('(symbol')):]
+    units = units.replace(f'(symbol "{name}_', '(symbol "_')
+    return hashlib.sha256((options + units).encode('utf-8')).hexdigest()
+
+
+def dedup_parents(names, structures):
+    """
+    Parent of every symbol: the first symbol with the same structure
+
+    Args:
+        names: Symbol names, in library order
+        structures: Dict name -> symbol_structure()
+
+    Returns:
+        Dict name -> parent name (the name itself for kept symbols)
+    """
+    first = {}
+    return {name: first.setdefault(structures[name], name) for name in names}
+
+
+def library_symbol(name, parent, symbol):
+    """The symbol as written to the library: in full, or as an alias of parent"""
+    if parent == name:
+        return symbol
+    _, properties, _ = split_symbol(symbol)
+    return f'\n\t(symbol "{name}"\n\t\t(extends "{parent}")\n{properties}\n\t)'
+
+
+def dedup_symbols(symbols):
+    """
+    Replace structurally duplicated symbols by aliases
+
+    The first symbol of every structure is kept in full; later ones
+    become (extends "<first>") with only their own properties, which
+    KiCad merges over the parent's.
+
+    Args:
+        symbols: Dict mapping symbol name to its S-expression, in order
+
+    Returns:
+        Dict in the same order, duplicates replaced by aliases
+    """
+    structures = {name: symbol_structure(name, symbol) for name, symbol in symbols.items()}
+    parents = dedup_parents(symbols, structures)
+    return {name: library_symbol(name, parents[name], symbol)
+            for name, symbol in symbols.items()}
+
+
+def library_symbols(names=None, dedup=True):
+    """
+    Generate every symbol of the library
+
+    Args:
+        names: CONNECTOR_INFO keys to include (default: all); the 2.54mm
+            input connector is always included
+        dedup: Write structural duplicates as aliases (see dedup_symbols)
+
+    Returns:
+        Dict mapping symbol name to its S-expression, in library order
+    """
+    names = list(CONNECTOR_INFO if names is None else names)
+    symbols = dict(zip(names, generate_all_connector_symbols(names)))
+
+    # Add the 2.54mm input connector
+    symbols['ARM_JTAG_20pin_2.54mm'] = add_20pin_2_54mm_connector()
+
+    if dedup:
+        with stage('library.dedup'):
+            symbols = dedup_symbols(symbols)
+    return symbols
+
+
+@timed('library.assemble')
+def create_symbol_library(names=None, dedup=True):
+    """
+    Create the complete symbol library file
+
+    Args:
+        names: CONNECTOR_INFO keys to include (default: all)
+        dedup: Write structural duplicates as aliases (see dedup_symbols)
+    """
+
+    return library_text(library_symbols(names, dedup).values())
+
+
+def library_text(symbols):
+    """Library file contents from its symbols' S-expressions, in order"""
     # Combine everything
-    full_library = library_header
+    full_library = LIBRARY_HEADER
 
     # Add all connector symbols
-    for symbol in connector_symbols:
+    for symbol in symbols:
         full_library += symbol + '\n'
 
     # Close the library
@@ -94,20 +214,370 @@ def create_symbol_library():
     return full_library
 
 
-def main():
+# Strings (with escapes) or single parentheses - everything a depth scan needs
+_SCAN_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[()]')
+_SYMBOL_NAME = re.compile(r'\(symbol\s+"((?:[^"\\]|\\.)*)"')
+_EXTENDS = re.compile(r'\(extends\s+"((?:[^"\\]|\\.)*)"\)')
+
+
+def scan_library_symbols(text):
+    """
+    Locate the top-level symbols of a .kicad_sym file
+
+    Args:
+        text: Library file contents
+
+    Returns:
+        (symbols, close) where symbols maps each symbol name to its
+        (start, end) span in text, parentheses included, and close is the
+        index of the library's closing parenthesis. Returns None if text
+        is not a kicad_symbol_lib.
+    """
+    if not text.lstrip().startswith('(kicad_symbol_lib'):
+        return None
+
+    symbols = {}
+    depth = 0
+    start = None
+    for match in _SCAN_TOKEN.finditer(text):
+        token = match.group()
+        if token == '(':
+            depth += 1
+            if depth == 2:
+                start = match.start()
+        elif token == ')':
+            if depth == 2:
+                name = _SYMBOL_NAME.match(text, start)
+                if name:
+                    symbols[name.group(1)] = (start, match.end())
+            elif depth == 1:
+                return symbols, match.start()
+            depth -= 1
+    return None
+
+
+# Always in the library, whatever CONNECTOR_INFO names are selected
+INPUT_SYMBOL = 'ARM_JTAG_20pin_2.54mm'
+
+INDEX_VERSION = 1
+
+
+def library_names(names=None):
+    """Names of the library's symbols in order, as library_symbols() writes them"""
+    names = list(CONNECTOR_INFO if names is None else names)
+    if INPUT_SYMBOL not in names:
+        names.append(INPUT_SYMBOL)
+    return names
+
+
+def symbol_input_key(name):
+    """Key of a connector symbol's inputs: name, datasheet and pins (see symbol_key)"""
+    info = connector_info(name)
+    return symbol_key(name, info['datasheet'], info['pin_table'])
+
+
+def _full_symbol(name):
+    info = connector_info(name)
+    return cached_connector_symbol(name, info['datasheet'], info['pin_table'])
+
+
+def index_path(path):
+    """Where update_symbol_library() keeps the index of the library at path"""
+    directory, filename = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, '.cache', f'{filename}.index.json')
+
+
+def _load_index(path, dedup):
+    """The library's index, or None if missing or not describing the file as it is"""
+    try:
+        with open(index_path(path), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    if (not isinstance(index, dict) or index.get('version') != INDEX_VERSION
+            or index.get('dedup') != dedup or index.get('size') != stat.st_size
+            or index.get('mtime_ns') != stat.st_mtime_ns):
+        return None
+    return index
+
+
+def _save_index(path, dedup, close, entries):
+    """
+    Write the index of the library at path (after writing the library)
+
+    Args:
+        path: Library path
+        dedup: Whether the library was written with aliases
+        close: Offset of the library's closing parenthesis
+        entries: Dict name -> [key, structure, parent, start, end]
+    """
+    stat = os.stat(path)
+    index = {'version': INDEX_VERSION, 'dedup': dedup, 'size': stat.st_size,
+             'mtime_ns': stat.st_mtime_ns, 'close': close, 'symbols': entries}
+    target = index_path(path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    _replace_file(target, json.dumps(index, separators=(',', ':')))
+
+
+def _splice(text, edits):
+    """
+    Apply non-overlapping edits to text
+
+    Args:
+        text: Original text
+        edits: List of (start, end, replacement)
+
+    Returns:
+        (new_text, moved, placed): moved(offset) maps an offset outside
+        every edit to the new text, placed[i] is where the replacement of
+        edits[i] starts in it
+    """
+    order = sorted(range(len(edits)), key=lambda i: edits[i][:2])
+    pieces = []
+    starts = []
+    shifts = []
+    placed = [0] * len(edits)
+    position = shift = 0
+    for i in order:
+        start, end, replacement = edits[i]
+        pieces.append(text[position:start])
+        placed[i] = start + shift
+        pieces.append(replacement)
+        shift += len(replacement) - (end - start)
+        starts.append(end)
+        shifts.append(shift)
+        position = end
+    pieces.append(text[position:])
+
+    def moved(offset):
+        i = bisect.bisect_right(starts, offset)
+        return offset + (shifts[i - 1] if i else 0)
+
+    return ''.join(pieces), moved, placed
+
+
+def update_symbol_library(path, dedup=True):
+    """
+    Incrementally bring an existing library file up to date
+
+    Only symbols that were added, removed or changed are spliced into the
+    existing text; the file is not touched at all when nothing differs.
+    With a valid index (see index_path) only the symbols whose input key
+    or alias parent changed are regenerated, and an unchanged library
+    is not even read. Otherwise every symbol is generated and the file
+    scanned, which also rebuilds the index. Falls back to writing the
+    full library if the file is missing or cannot be scanned, or if a
+    symbol spliced in place would extend a symbol after it (KiCad needs
+    parents before their aliases).
+
+    Args:
+        path: Path to the .kicad_sym file
+        dedup: Write structural duplicates as aliases (see dedup_symbols)
+
+    Returns:
+        Dict with 'added', 'removed' and 'changed' lists of symbol names,
+        and 'written' telling whether the file was rewritten
+    """
+    names = library_names()
+    keys = {name: symbol_input_key(name) for name in names}
+    index = _load_index(path, dedup)
+    if index is not None:
+        result = _update_from_index(path, dedup, names, keys, index)
+        if result is not None:
+            return result
+    return _update_by_scan(path, dedup, names, keys)
+
+
+def _update_from_index(path, dedup, names, keys, index):
+    """update_symbol_library() from the index; None if it has to fall back"""
+    entries = index['symbols']
+    full = {name: _full_symbol(name) for name in names
+            if name not in entries or entries[name][0] != keys[name]}
+    structures = {name: symbol_structure(name, full[name]) if name in full
+                  else entries[name][1] for name in names}
+    parents = dedup_parents(names, structures) if dedup else {name: name for name in names}
+    render = [name for name in names if name in full or parents[name] != entries[name][2]]
+
+    added = [name for name in names if name not in entries]
+    removed = [name for name in entries if name not in names]
+    for name in render:
+        parent = parents[name]
+        if name in entries and parent != name and (
+                parent not in entries or entries[parent][3] > entries[name][3]):
+            return None
+    result = {'added': added, 'removed': removed, 'changed': [], 'written': False}
+    if not (added or removed or render):
+        return result
+
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        text = f.read()
+    wanted = {}
+    for name in render:
+        if name not in full:
+            full[name] = _full_symbol(name)
+        wanted[name] = library_symbol(name, parents[name], full[name])
+    changed = [name for name in render if name in entries
+               and text[entries[name][3]:entries[name][4]] != wanted[name].strip()]
+    result['changed'] = changed
+
+    close = index['close']
+    block = ''.join(wanted[name] + '\n' for name in added)
+    edits = [(close, close, block)]
+    edits += [(*entries[name][3:5], wanted[name].strip()) for name in changed]
+    for name in removed:
+        start, end = entries[name][3:5]
+        # Take the whitespace leading up to the symbol with it
+        edits.append((len(text[:start].rstrip()), end, ''))
+
+    text, moved, placed = _splice(text, edits)
+    spans = {name: (placed[i], placed[i] + len(edits[i][2]))
+             for i, name in enumerate(changed, 1)}
+    offset = placed[0]
+    for name in added:
+        lead = len(wanted[name]) - len(wanted[name].lstrip())
+        spans[name] = (offset + lead, offset + len(wanted[name].rstrip()))
+        offset += len(wanted[name]) + 1
+
+    if changed or added or removed:
+        _replace_file(path, text)
+        result['written'] = True
+
+    new_entries = {}
+    for name in names:
+        if name in spans:
+            start, end = spans[name]
+        else:
+            start, end = moved(entries[name][3]), moved(entries[name][4])
+        new_entries[name] = [keys[name], structures[name], parents[name], start, end]
+    new_entries = dict(sorted(new_entries.items(), key=lambda item: item[1][3]))
+    _save_index(path, dedup, placed[0] + len(block), new_entries)
+    return result
+
+
+def _update_by_scan(path, dedup, names, keys):
+    """update_symbol_library() by generating every symbol and scanning the file"""
+    full = dict(zip(names, generate_all_connector_symbols(names)))
+    structures = {name: symbol_structure(name, symbol) for name, symbol in full.items()}
+    parents = dedup_parents(names, structures) if dedup else {name: name for name in names}
+    wanted = {name: library_symbol(name, parents[name], full[name]) for name in names}
+
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            text = f.read()
+    except FileNotFoundError:
+        text = None
+    scan = scan_library_symbols(text) if text is not None else None
+
+    if scan is not None:
+        existing, close = scan
+        added = [name for name in wanted if name not in existing]
+        parents_needed = {match.group(1) for name in existing if name in wanted
+                          for match in [_EXTENDS.search(wanted[name])] if match}
+        if parents_needed.intersection(added):
+            scan = None
+
+    if scan is None:
+        text = library_text(wanted.values())
+        _replace_file(path, text)
+        result = {'added': list(wanted), 'removed': [], 'changed': [], 'written': True}
+    else:
+        removed = [name for name in existing if name not in wanted]
+        changed = [
+            name for name, (start, end) in existing.items()
+            if name in wanted and text[start:end] != wanted[name].strip()
+        ]
+        result = {'added': added, 'removed': removed, 'changed': changed, 'written': False}
+        if added or removed or changed:
+            edits = [(close, close, ''.join(wanted[name] + '\n' for name in added))]
+            for name in removed:
+                start, end = existing[name]
+                # Take the whitespace leading up to the symbol with it
+                edits.append((len(text[:start].rstrip()), end, ''))
+            for name in changed:
+                edits.append((*existing[name], wanted[name].strip()))
+            text, _, _ = _splice(text, edits)
+            _replace_file(path, text)
+            result['written'] = True
+
+    symbols, close = scan_library_symbols(text)
+    entries = {name: [keys[name], structures[name], parents[name], *symbols[name]]
+               for name in sorted(symbols, key=symbols.get) if name in keys}
+    _save_index(path, dedup, close, entries)
+    return result
+
+
+def _replace_file(path, content):
+    """Atomically replace path with content"""
+    tmp_path = f'{path}.tmp'
+    with stage('io.write', len(content)):
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Generate the Adapterama connector symbol library"
+    )
+    parser.add_argument(
+        '--symbol-cache',
+        metavar='DIR',
+        help='enable the on-disk symbol cache in DIR (e.g. .cache/symbols)',
+    )
+    parser.add_argument(
+        '-o', '--output',
+        default=DEFAULT_OUTPUT,
+        help='library file to write (default: adapterama-symbols.kicad_sym)',
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='only regenerate and splice symbols whose inputs changed (index in .cache/)',
+    )
+    parser.add_argument(
+        '--no-dedup',
+        action='store_true',
+        help='write structurally identical symbols in full instead of as aliases',
+    )
+    add_profile_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main entry point"""
+    args = parse_args(argv)
+    if args.symbol_cache:
+        configure_symbol_cache(args.symbol_cache)
+
     print("Creating Adapterama connector symbols...")
     print("=" * 60)
 
-    library_content = create_symbol_library()
+    output_path = os.path.normpath(args.output)
 
-    # Write to file
-    output_path = '/home/user/adaperama/adapterama-symbols.kicad_sym'
-    with open(output_path, 'w') as f:
-        f.write(library_content)
+    with profile_session(args):
+        if args.incremental:
+            result = update_symbol_library(output_path, not args.no_dedup)
+            print("=" * 60)
+            if not result['written']:
+                print(f"Symbol library up to date: {output_path}")
+                return
+            for key in ('added', 'removed', 'changed'):
+                if result[key]:
+                    print(f"  {key}: {', '.join(result[key])}")
+            print(f"Symbol library updated: {output_path}")
+        else:
+            library_content = create_symbol_library(dedup=not args.no_dedup)
 
-    print("=" * 60)
-    print(f"Symbol library created: {output_path}")
+            # Write to file (skipped when the content is already identical)
+            written = write_if_changed(output_path, [library_content])
+
+            print("=" * 60)
+            if written:
+                print(f"Symbol library created: {output_path}")
+            else:
+                print(f"Symbol library unchanged: {output_path}")
     print("\nConnector symbols included:")
     print("  - ARM_JTAG_20pin_2.54mm (input from J-Link)")
     print("  - ARM_JTAG_20pin_1.27mm (compact output)")
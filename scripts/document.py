@@ -0,0 +1,364 @@
+"""
+In-memory schematic document with cached rendering
+
+generate_schematic() streams finished strings, so changing one value
+means rendering the whole schematic again. build_schematic() returns
+the same schematic as a tree of nodes instead, for editing in place
+(both take their design from generate_schematic.flat_design()):
+
+    Schematic
+        header          generate_schematic_header()
+        lib_symbols     LibSymbols: one Element per embedded symbol
+        instances       Instances: one Section per section, holding its
+                        title label and an Instance per component
+        labels          Labels: footer note, wires, net labels, power
+                        symbols and no-connect flags
+        footer          generate_schematic_footer()
+
+Every node caches its rendered S-expression and carries a dirty flag.
+Changing a node marks it and its ancestors dirty; render() re-renders
+only dirty nodes and reuses the cached text of clean subtrees:
+
+    doc = build_schematic()
+    doc.instance('R12').update(value='47')
+    write_if_changed(path, doc.pieces())   # re-renders R12 and its section
+
+Rendering is done by the emitters of symbol_gen.py, symbol_cache.py and
+component_gen.py, so the text is the same as generate_schematic()'s.
+Sections render their uncached components in one component_texts()
+batch. The document does not re-derive anything: moving a part does not
+move its wires; rebuild the labels for that (or the whole document).
+"""
+
+from component_gen import component_texts, create_component, create_text_label
+from connector_data import connector_info
+from generate_schematic import (
+    DEFAULT_OUTPUTS,
+    DEFAULT_TITLE,
+    FOOTER_NOTE,
+    flat_design,
+    generate_schematic_footer,
+    generate_schematic_header,
+    generate_wiring,
+    section_label,
+    section_parts,
+)
+from placement import TITLE_SIZE
+from profiling import stage, timed
+from symbol_cache import cached_connector_symbol
+from symbol_gen import create_capacitor_symbol, create_power_symbol, create_resistor_symbol
+
+
+class Node:
+    """Base of all document nodes: a cached rendering and a dirty flag"""
+
+    __slots__ = ('parent', 'dirty', '_text')
+
+    def __init__(self):
+        self.parent = None
+        self.dirty = True
+        self._text = None
+
+    def invalidate(self):
+        """Mark this node and its ancestors for re-rendering"""
+        # Ancestors of a dirty node are dirty already
+        node = self
+        while node is not None and not node.dirty:
+            node.dirty = True
+            node = node.parent
+
+    def render(self):
+        """S-expression text of the node, from the cache when clean"""
+        if self.dirty or self._text is None:
+            self._text = self._render()
+            self.dirty = False
+        return self._text
+
+    def _render(self):
+        raise NotImplementedError
+
+
+class Text(Node):
+    """Fixed text, e.g. a closing parenthesis or one pre-rendered item"""
+
+    __slots__ = ()
+
+    def __init__(self, text):
+        super().__init__()
+        self._text = text
+        self.dirty = False
+
+    def _render(self):
+        return self._text
+
+
+class Element(Node):
+    """Leaf rendered by an emitter function"""
+
+    __slots__ = ('emit', 'args', 'kwargs')
+
+    def __init__(self, emit, *args, **kwargs):
+        """
+        Args:
+            emit: Function returning the S-expression
+            *args, **kwargs: Its arguments; keyword arguments can be
+                changed later with update()
+        """
+        super().__init__()
+        self.emit = emit
+        self.args = args
+        self.kwargs = kwargs
+
+    def update(self, **kwargs):
+        """Change keyword arguments of the emitter"""
+        self.kwargs.update(kwargs)
+        self.invalidate()
+
+    def _render(self):
+        return self.emit(*self.args, **self.kwargs)
+
+
+class Instance(Node):
+    """Component instance, rendered by component_gen.create_component()"""
+
+    __slots__ = ('ref', 'value', 'lib_id', 'x', 'y', 'footprint', 'properties',
+                 'sheet_path')
+
+    # Fields update() accepts
+    FIELDS = __slots__
+
+    def __init__(self, ref, value, lib_id, x, y, footprint="", properties=None,
+                 sheet_path="/"):
+        """Arguments as for component_gen.create_component()"""
+        super().__init__()
+        self.ref = ref
+        self.value = value
+        self.lib_id = lib_id
+        self.x = x
+        self.y = y
+        self.footprint = footprint
+        self.properties = properties
+        self.sheet_path = sheet_path
+
+    def update(self, **fields):
+        """
+        Change fields of the instance
+
+        Raises:
+            AttributeError: On a field that is not in FIELDS
+        """
+        for name, value in fields.items():
+            if name not in self.FIELDS:
+                raise AttributeError(f"Instance has no field {name!r}")
+            setattr(self, name, value)
+        self.invalidate()
+
+    def _render(self):
+        return create_component(self.ref, self.value, self.lib_id, self.x, self.y,
+                                self.footprint, self.properties, self.sheet_path)
+
+
+class Group(Node):
+    """Node whose text is the concatenation of its children's"""
+
+    __slots__ = ('children',)
+
+    def __init__(self, children=()):
+        super().__init__()
+        self.children = []
+        for child in children:
+            self.append(child)
+
+    def __iter__(self):
+        return iter(self.children)
+
+    def __len__(self):
+        return len(self.children)
+
+    def append(self, node):
+        """Add a node at the end; returns it"""
+        node.parent = self
+        self.children.append(node)
+        self.invalidate()
+        return node
+
+    def remove(self, node):
+        """Remove a child node"""
+        self.children.remove(node)
+        node.parent = None
+        self.invalidate()
+
+    def pieces(self):
+        """
+        Text of the children, one piece each, without joining them
+
+        Yields:
+            Strings which concatenated form the group's text
+        """
+        for child in self.children:
+            yield child.render()
+
+    def _render(self):
+        return ''.join(self.pieces())
+
+
+class LibSymbols(Group):
+    """Embedded symbol definitions (the lib_symbols block)"""
+
+    __slots__ = ()
+
+    def pieces(self):
+        yield from super().pieces()
+        yield "\t)\n\n"
+
+
+class Section(Group):
+    """Title label and component instances of one section"""
+
+    __slots__ = ()
+
+    def _render(self):
+        # Render all components that have no text yet in one batch
+        stale = [node for node in self.children
+                 if isinstance(node, Instance) and node._text is None]
+        if len(stale) > 1 and len({node.sheet_path for node in stale}) == 1:
+            with stage('schematic.components'):
+                texts = component_texts(
+                    [n.ref for n in stale], [n.value for n in stale],
+                    [n.lib_id for n in stale], [n.x for n in stale], [n.y for n in stale],
+                    [n.footprint for n in stale], [n.properties for n in stale],
+                    stale[0].sheet_path,
+                )
+            for node, text in zip(stale, texts):
+                node._text = text
+                node.dirty = False
+        return super()._render()
+
+
+class Instances(Group):
+    """All sections"""
+
+    __slots__ = ()
+
+
+class Labels(Group):
+    """Free text, wires, labels and power symbols"""
+
+    __slots__ = ()
+
+
+class Schematic(Node):
+    """Root of a schematic document"""
+
+    __slots__ = ('header', 'lib_symbols', 'instances', 'labels', 'footer', '_refs')
+
+    def __init__(self, header, footer):
+        """
+        Args:
+            header: Node rendering the file header
+            footer: Node rendering the file footer
+        """
+        super().__init__()
+        self.header = header
+        self.lib_symbols = LibSymbols()
+        self.instances = Instances()
+        self.labels = Labels()
+        self.footer = footer
+        for node in self.parts():
+            node.parent = self
+        self._refs = {}
+
+    def parts(self):
+        """Top-level nodes in file order"""
+        return (self.header, self.lib_symbols, self.instances, self.labels, self.footer)
+
+    def instance(self, ref):
+        """
+        Component instance by reference designator
+
+        Raises:
+            KeyError: If there is none
+        """
+        node = self._refs.get(ref)
+        if node is None or node.ref != ref or node.parent is None:
+            self._refs = {node.ref: node for section in self.instances
+                          for node in section if isinstance(node, Instance)}
+            node = self._refs[ref]
+        return node
+
+    def pieces(self):
+        """
+        Render the document piece by piece
+
+        Groups are not joined (and stay dirty), so after a small edit
+        this only renders the changed nodes and their section.
+
+        Yields:
+            Strings which concatenated form the .kicad_sch file (for
+            kicad_utils.write_if_changed)
+        """
+        for node in self.parts():
+            if isinstance(node, Group):
+                yield from node.pieces()
+            else:
+                yield node.render()
+
+    def _render(self):
+        return ''.join(node.render() for node in self.parts())
+
+
+def section_node(section, sheet_path="/"):
+    """
+    Section group of a generate_section() keyword dict
+
+    Same content and order as generate_schematic.generate_section().
+    """
+    title, title_x, title_y = section_label(**section)
+    node = Section([Element(create_text_label, title, title_x, title_y, TITLE_SIZE,
+                            sheet_path)])
+    for ref, value, lib_id, x, y, footprint, properties in section_parts(**section):
+        node.append(Instance(ref, value, lib_id, x, y, footprint, properties, sheet_path))
+    return node
+
+
+@timed('schematic.document')
+def build_schematic(sections=None, connector_names=None, title=DEFAULT_TITLE,
+                    outputs=DEFAULT_OUTPUTS, wire=False, place=False):
+    """
+    Build the document of the schematic generate_schematic() would write
+
+    Args:
+        sections: List of generate_section() keyword dicts
+            (default: DEFAULT_SECTIONS)
+        connector_names: Connector symbols to embed (default: all)
+        title: Title block title
+        outputs: Short list of output connectors for the title block
+        wire: Add input connectors and draw all section connections
+        place: Place the sections automatically (see placement.py)
+
+    Returns:
+        Schematic document, not rendered yet
+    """
+    sections, connector_names, netlist, power_names = flat_design(
+        sections, connector_names, wire, place)
+
+    doc = Schematic(Element(generate_schematic_header, title, outputs),
+                    Element(generate_schematic_footer))
+
+    for name in connector_names:
+        info = connector_info(name)
+        doc.lib_symbols.append(Element(cached_connector_symbol, name, info['datasheet'],
+                                       info['pin_table']))
+    doc.lib_symbols.append(Element(create_resistor_symbol))
+    doc.lib_symbols.append(Element(create_capacitor_symbol))
+    for name in power_names:
+        doc.lib_symbols.append(Element(create_power_symbol, name))
+
+    for section in sections:
+        doc.instances.append(section_node(section))
+
+    doc.labels.append(Element(create_text_label, *FOOTER_NOTE))
+    if wire:
+        for text in generate_wiring(sections, netlist):
+            doc.labels.append(Text(text))
+    return doc
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Electrical rules check over generated designs
+
+Works from the pin electrical types in connector_data.py and the placed
+parts, before any file is written. Nets come from a Netlist (netlist.py),
+which already groups connections with a union-find; each net is then
+checked once, so the whole pass is linear in the number of pins.
+
+Rules:
+- pin_conflict: two pin types that must not share a net (output driving
+  output, anything on a no_connect pin, ...), looked up in a pin-type
+  matrix precomputed from KiCad's default ERC matrix. Input connector
+  pins (INPUT_CONNECTOR_INFO) are typed from the target side and pass
+  the target's signal through to the probe, so a pin of the same type
+  as an output connector pin on its net is not a second driver
+- unconnected_pin: a pin on no net (an error for power_in pins); pins
+  typed no_connect or named NC are exempt
+- power_not_driven: power_in pins on a net with no power_out pin (power
+  symbol nets such as GND count as driven)
+
+Usage:
+    python3 erc.py [-o report.json]
+
+Checks the default design as generate_schematic.py --wire would draw it
+and exits with status 1 if there are errors. generate_schematic.py --erc
+runs the same check and refuses to write the schematic on errors.
+
+Report format (JSON):
+
+    {"errors": 1, "warnings": 0, "violations": [
+        {"rule": "pin_conflict", "severity": "error", "net": "S1_TDO",
+         "message": "output pin J1.13 and output pin J7.13 on one net",
+         "pins": [{"ref": "J1", "pin": "13", "type": "output"}, ...]}]}
+"""
+
+import argparse
+import json
+import os
+import sys
+from array import array
+
+# Add scripts directory to path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+from connector_data import INPUT_CONNECTOR_INFO, connector_info
+from pin_table import ELECTRICAL_TYPES, TYPE_CODES
+from signal_map import signal_aliases
+from symbol_gen import PASSIVE_PIN_LAYOUT
+
+
+OK, WARNING, ERROR = 0, 1, 2
+SEVERITY_NAMES = ('ok', 'warning', 'error')
+
+# KiCad's default pin conflict matrix, in KiCad's pin type order
+_KICAD_TYPES = (
+    'input', 'output', 'bidirectional', 'tri_state', 'passive', 'free',
+    'unspecified', 'power_in', 'power_out', 'open_collector', 'open_emitter',
+    'no_connect',
+)
+_O, _W, _E = OK, WARNING, ERROR
+_KICAD_MATRIX = (
+    # I   O   Bi  3S  Pas NIC UnS PwI PwO OC  OE  NC
+    (_O, _O, _O, _O, _O, _O, _W, _O, _O, _O, _O, _E),  # input
+    (_O, _E, _O, _W, _O, _O, _W, _O, _E, _E, _E, _E),  # output
+    (_O, _O, _O, _O, _O, _O, _W, _O, _W, _O, _W, _E),  # bidirectional
+    (_O, _W, _O, _O, _O, _O, _W, _W, _E, _W, _W, _E),  # tri_state
+    (_O, _O, _O, _O, _O, _O, _W, _O, _O, _O, _O, _E),  # passive
+    (_O, _O, _O, _O, _O, _O, _O, _O, _O, _O, _O, _E),  # free
+    (_W, _W, _W, _W, _W, _O, _W, _W, _W, _W, _W, _E),  # unspecified
+    (_O, _O, _O, _W, _O, _O, _W, _O, _O, _O, _O, _E),  # power_in
+    (_O, _E, _W, _E, _O, _O, _W, _O, _E, _E, _E, _E),  # power_out
+    (_O, _E, _O, _W, _O, _O, _W, _O, _E, _O, _O, _E),  # open_collector
+    (_O, _E, _W, _W, _O, _O, _W, _O, _E, _O, _O, _E),  # open_emitter
+    (_E, _E, _E, _E, _E, _E, _E, _E, _E, _E, _E, _E),  # no_connect
+)
+
+_TYPE_COUNT = len(ELECTRICAL_TYPES)
+
+
+def _build_matrix():
+    """Flatten the KiCad matrix into PinTable type codes: matrix[a * n + b]"""
+    matrix = array('B', bytes(_TYPE_COUNT * _TYPE_COUNT))
+    kicad_index = {name: i for i, name in enumerate(_KICAD_TYPES)}
+    for a, type_a in enumerate(ELECTRICAL_TYPES):
+        for b, type_b in enumerate(ELECTRICAL_TYPES):
+            matrix[a * _TYPE_COUNT + b] = _KICAD_MATRIX[kicad_index[type_a]][kicad_index[type_b]]
+    return matrix
+
+
+PIN_MATRIX = _build_matrix()
+
+_POWER_IN = TYPE_CODES['power_in']
+_POWER_OUT = TYPE_CODES['power_out']
+_NO_CONNECT = TYPE_CODES['no_connect']
+
+
+def pin_severity(type_a, type_b):
+    """Severity ('ok', 'warning', 'error') of two pin types sharing a net"""
+    return SEVERITY_NAMES[PIN_MATRIX[TYPE_CODES[type_a] * _TYPE_COUNT + TYPE_CODES[type_b]]]
+
+
+def part_pins(parts):
+    """
+    Electrical type code of every pin of placed parts
+
+    Args:
+        parts: create_component() argument tuples
+            (ref, value, lib_id, x, y, footprint, properties)
+
+    Returns:
+        Dict (ref, pin_number) -> (type_code, pin_name)
+    """
+    pins = {}
+    passive = TYPE_CODES['passive']
+    for ref, _, lib_id, *_ in parts:
+        if lib_id in ('R', 'C'):
+            for num in PASSIVE_PIN_LAYOUT:
+                pins[ref, num] = (passive, '~')
+            continue
+        table = connector_info(lib_id)['pin_table']
+        for num, name, code in zip(table.numbers, table.names, table.type_codes):
+            pins[ref, num] = (code, name)
+    return pins
+
+
+def _pin_entry(pin, code):
+    return {'ref': pin[0], 'pin': pin[1], 'type': ELECTRICAL_TYPES[code]}
+
+
+def _violation(rule, severity, net, message, pins):
+    return {'rule': rule, 'severity': SEVERITY_NAMES[severity], 'net': net,
+            'message': message, 'pins': pins}
+
+
+def run_erc(netlist, parts):
+    """
+    Check a netlist against the pin types of the placed parts
+
+    Args:
+        netlist: Netlist of the design
+        parts: Placed parts, see part_pins()
+
+    Returns:
+        Report dict with 'errors', 'warnings' and 'violations'
+    """
+    pins = part_pins(parts)
+    passthrough = {ref for ref, _, lib_id, *_ in parts if lib_id in INPUT_CONNECTOR_INFO}
+    violations = []
+    connected = set()
+
+    for net in netlist.nets():
+        if len(net.pins) < 2 and net.kind != 'power':
+            continue
+
+        # Group the net's pins by type code: at most 12 groups per net
+        by_type = {}
+        for pin in net.pins:
+            entry = pins.get(pin)
+            if entry is None:
+                violations.append(_violation(
+                    'unknown_pin', ERROR, net.name,
+                    f"{pin[0]}.{pin[1]} is not a pin of any placed part", [],
+                ))
+                continue
+            connected.add(pin)
+            by_type.setdefault(entry[0], []).append(pin)
+
+        codes = sorted(by_type)
+        for i, a in enumerate(codes):
+            # A type conflicts with itself only if two such pins are
+            # present, not counting pass-through pins of input connectors
+            for b in codes[i:]:
+                if a == b:
+                    same = [pin for pin in by_type[a] if pin[0] not in passthrough]
+                    if len(same) < 2:
+                        continue
+                severity = PIN_MATRIX[a * _TYPE_COUNT + b]
+                if severity == OK:
+                    continue
+                if a == b:
+                    pin_a, pin_b = same[:2]
+                    involved = [_pin_entry(p, a) for p in same]
+                else:
+                    pin_a, pin_b = by_type[a][0], by_type[b][0]
+                    involved = [_pin_entry(p, c) for c in (a, b) for p in by_type[c]]
+                violations.append(_violation(
+                    'pin_conflict', severity, net.name,
+                    f"{ELECTRICAL_TYPES[a]} pin {pin_a[0]}.{pin_a[1]} and "
+                    f"{ELECTRICAL_TYPES[b]} pin {pin_b[0]}.{pin_b[1]} on one net",
+                    involved,
+                ))
+
+        if _POWER_IN in by_type and _POWER_OUT not in by_type and net.kind != 'power':
+            violations.append(_violation(
+                'power_not_driven', WARNING, net.name,
+                f"power_in pins on {net.name} are not driven by any power_out pin",
+                [_pin_entry(p, _POWER_IN) for p in by_type[_POWER_IN]],
+            ))
+
+    for pin, (code, name) in pins.items():
+        if pin in connected or code == _NO_CONNECT or 'NC' in signal_aliases(name):
+            continue
+        severity = ERROR if code == _POWER_IN else WARNING
+        violations.append(_violation(
+            'unconnected_pin', severity, None,
+            f"{ELECTRICAL_TYPES[code]} pin {pin[0]}.{pin[1]} ({name}) is not connected",
+            [_pin_entry(pin, code)],
+        ))
+
+    return {
+        'errors': sum(v['severity'] == 'error' for v in violations),
+        'warnings': sum(v['severity'] == 'warning' for v in violations),
+        'violations': violations,
+    }
+
+
+def print_report(report, file=sys.stdout):
+    """Print an ERC report as one line per violation"""
+    for v in report['violations']:
+        mark = '✗' if v['severity'] == 'error' else '⚠'
+        net = f" [{v['net']}]" if v['net'] else ''
+        print(f"  {mark} {v['rule']}{net}: {v['message']}", file=file)
+    print(f"ERC: {report['errors']} errors, {report['warnings']} warnings", file=file)
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Electrical rules check of the design")
+    parser.add_argument('-o', '--output', help='write the JSON report here ("-" for stdout)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main entry point"""
+    args = parse_args(argv)
+    from generate_schematic import check_schematic
+
+    report = check_schematic()
+    if args.output == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"Report written to {args.output}")
+    return 1 if report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Generate the Adapterama board (adapterama.kicad_pcb)
+
+Footprints are built parametrically instead of being looked up by name:
+
+- connectors: 2-row headers from the pin count in CONNECTOR_INFO and the
+  pitch in the connector name (..._1.27mm -> 1.27mm pitch). Input
+  connectors (INPUT_CONNECTOR_INFO) get an IDC shrouded header.
+- resistors and capacitors: 0603 SMD (the footprints section_parts()
+  assigns)
+
+Pad geometry is computed once per footprint type and compiled into a
+template with the pads already formatted, so a footprint instance costs
+one template fill whatever its pad count. Parts are placed where the
+schematic places them (section_parts(), optionally auto-placed), each
+footprint centred on its symbol, and the board outline follows the
+courtyards.
+
+--panel COLSxROWS repeats the board as a panel; nets of board k are
+renamed Board_k-<net> so the copies stay electrically separate.
+
+Usage:
+    python3 generate_pcb.py [-o OUTPUT] [--wire] [--auto-place]
+                            [--panel COLSxROWS] [--deterministic]
+
+    --wire assigns the nets of netlist.section_nets() to the pads (the
+    input connectors are added, as for generate_schematic.py --wire).
+
+Output:
+    adapterama.kicad_pcb - KiCad 9 board file
+"""
+
+import argparse
+import os
+import re
+import sys
+from functools import lru_cache
+
+# Add scripts directory to path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+from connector_data import (
+    INPUT_CONNECTOR_INFO,
+    connector_info,
+    connector_pitch,
+    header_footprint_name,
+)
+from generate_schematic import DEFAULT_SECTIONS, auto_place, section_parts
+from kicad_utils import generate_uuid, mm_to_mils, set_deterministic_uuids, write_if_changed
+from netlist import add_input_connectors, section_nets
+from placement import find_overlaps
+
+
+# Clearance of courtyards around pads and bodies (mm)
+COURTYARD_MARGIN = 0.5
+# Board outline distance from the outermost courtyard (mm)
+BOARD_MARGIN = 2.54
+# Top-left corner of the (first) board on the page (mm)
+BOARD_ORIGIN = (25.4, 25.4)
+# Space between boards of a panel (mm)
+PANEL_GAP = 2.0
+
+# Through-hole pad (size, drill) by pitch
+HEADER_PADS = {1.27: (1.0, 0.65), 2.54: (1.7, 1.0)}
+# IDC shroud: extra length beyond the pins at each end, and width
+IDC_END = 5.08
+IDC_WIDTH = 8.89
+
+# 0603 SMD footprint: pad centre offset and pad size (mm)
+PASSIVE_FOOTPRINTS = {
+    "Resistor_SMD:R_0603_1608Metric": (0.825, (0.8, 0.95)),
+    "Capacitor_SMD:C_0603_1608Metric": (0.775, (0.9, 0.95)),
+}
+PASSIVE_BODY = (0.8, 0.4)
+
+PCB_HEADER = '''(kicad_pcb
+\t(version 20241229)
+\t(generator "python-script")
+\t(generator_version "2.0")
+\t(general
+\t\t(thickness 1.6)
+\t\t(legacy_teardrops no)
+\t)
+\t(paper "A3")
+\t(layers
+\t\t(0 "F.Cu" signal)
+\t\t(2 "B.Cu" signal)
+\t\t(9 "F.Adhes" user "F.Adhesive")
+\t\t(11 "B.Adhes" user "B.Adhesive")
+\t\t(13 "F.Paste" user)
+\t\t(15 "B.Paste" user)
+\t\t(5 "F.SilkS" user "F.Silkscreen")
+\t\t(7 "B.SilkS" user "B.Silkscreen")
+\t\t(1 "F.Mask" user)
+\t\t(3 "B.Mask" user)
+\t\t(17 "Dwgs.User" user "User.Drawings")
+\t\t(19 "Cmts.User" user "User.Comments")
+\t\t(25 "Edge.Cuts" user)
+\t\t(27 "Margin" user)
+\t\t(31 "F.CrtYd" user "F.Courtyard")
+\t\t(29 "B.CrtYd" user "B.Courtyard")
+\t\t(35 "F.Fab" user)
+\t\t(33 "B.Fab" user)
+\t)
+\t(setup
+\t\t(pad_to_mask_clearance 0)
+\t\t(allow_soldermask_bridges_in_footprints no)
+\t)
+'''
+
+
+def _num(value):
+    """Format a length like KiCad: up to 4 decimals, no trailing zeros"""
+    text = f'{value:.4f}'.rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
+
+
+def _rect(box, layer, width):
+    x0, y0, x1, y1 = box
+    return (f'\t\t(fp_rect (start {_num(x0)} {_num(y0)}) (end {_num(x1)} {_num(y1)})\n'
+            f'\t\t\t(stroke (width {width}) (type solid)) (fill no) (layer "{layer}")\n'
+            f'\t\t)\n')
+
+
+def _footprint(lib, pads, pad_text, body):
+    """
+    Footprint dict from pad positions
+
+    Args:
+        lib: Footprint library ID
+        pads: List of (number, x, y)
+        pad_text: Function (number, x, y) -> pad S-expression without
+            its net and closing parenthesis
+        body: Body outline (x0, y0, x1, y1)
+
+    Returns:
+        Dict with lib, numbers, centre, courtyard and template (fields
+        {0} x, {1} y, {2} uuid, {3} reference, {4} value, {5}... nets)
+    """
+    xs = [x for _, x, _ in pads]
+    ys = [y for _, _, y in pads]
+    centre = ((min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2)
+    courtyard = (body[0] - COURTYARD_MARGIN, body[1] - COURTYARD_MARGIN,
+                 body[2] + COURTYARD_MARGIN, body[3] + COURTYARD_MARGIN)
+    label_y = _num(courtyard[1] - 1.0)
+    value_y = _num(courtyard[3] + 1.0)
+
+    template = (
+        f'\t(footprint "{lib}"\n'
+        '\t\t(layer "F.Cu")\n'
+        '\t\t(uuid {2})\n'
+        '\t\t(at {0} {1})\n'
+        f'\t\t(property "Reference" "{{3}}" (at {_num(centre[0])} {label_y} 0) (layer "F.SilkS")\n'
+        '\t\t\t(effects (font (size 1 1) (thickness 0.15)))\n'
+        '\t\t)\n'
+        f'\t\t(property "Value" "{{4}}" (at {_num(centre[0])} {value_y} 0) (layer "F.Fab")\n'
+        '\t\t\t(effects (font (size 1 1) (thickness 0.15)))\n'
+        '\t\t)\n'
+        + _rect(body, 'F.Fab', 0.1)
+        + _rect(courtyard, 'F.CrtYd', 0.05)
+        + ''.join(f'{pad_text(num, x, y)}{{{5 + i}}})\n' for i, (num, x, y) in enumerate(pads))
+        + '\t)\n'
+    )
+    return {'lib': lib, 'numbers': tuple(num for num, _, _ in pads), 'centre': centre,
+            'courtyard': courtyard, 'template': template}
+
+
+@lru_cache(maxsize=None)
+def header_footprint(pin_count, pitch, idc=False):
+    """
+    Two-row through-hole header, pin 1 at the origin, odd pins in the
+    first column
+
+    Args:
+        pin_count: Number of pins
+        pitch: Pin pitch in mm (1.27 or 2.54)
+        idc: Shrouded IDC header instead of a plain pin header
+
+    Returns:
+        Footprint dict (see _footprint)
+    """
+    if pitch not in HEADER_PADS:
+        raise ValueError(f"no header pads defined for {pitch}mm pitch")
+    rows = (pin_count + 1) // 2
+    size, drill = HEADER_PADS[pitch]
+    lib = header_footprint_name(pin_count, pitch, idc)
+    if idc:
+        middle = pitch / 2
+        body = (middle - IDC_WIDTH / 2, -IDC_END,
+                middle + IDC_WIDTH / 2, (rows - 1) * pitch + IDC_END)
+    else:
+        body = (-size / 2, -size / 2, pitch + size / 2, (rows - 1) * pitch + size / 2)
+
+    pads = [(str(n), ((n - 1) % 2) * pitch, ((n - 1) // 2) * pitch)
+            for n in range(1, pin_count + 1)]
+    size_text = f'(size {_num(size)} {_num(size)}) (drill {_num(drill)})'
+
+    def pad_text(num, x, y):
+        shape = 'rect' if num == '1' else 'oval'
+        return (f'\t\t(pad "{num}" thru_hole {shape} (at {_num(x)} {_num(y)}) {size_text}'
+                f' (layers "*.Cu" "*.Mask")')
+
+    return _footprint(lib, pads, pad_text, body)
+
+
+@lru_cache(maxsize=None)
+def passive_footprint(lib):
+    """
+    Two-pad SMD footprint centred on the origin
+
+    Raises:
+        ValueError: If lib is not in PASSIVE_FOOTPRINTS
+    """
+    try:
+        offset, (width, height) = PASSIVE_FOOTPRINTS[lib]
+    except KeyError:
+        raise ValueError(f"no parametric footprint for {lib}") from None
+    pads = [('1', -offset, 0.0), ('2', offset, 0.0)]
+    body = (-PASSIVE_BODY[0], -PASSIVE_BODY[1], PASSIVE_BODY[0], PASSIVE_BODY[1])
+    # The courtyard has to cover the pads, not just the body
+    body = (min(body[0], -offset - width / 2), min(body[1], -height / 2),
+            max(body[2], offset + width / 2), max(body[3], height / 2))
+
+    def pad_text(num, x, y):
+        return (f'\t\t(pad "{num}" smd roundrect (at {_num(x)} {_num(y)}) '
+                f'(size {_num(width)} {_num(height)}) (roundrect_rratio 0.25) '
+                f'(layers "F.Cu" "F.Mask" "F.Paste")')
+
+    return _footprint(lib, pads, pad_text, body)
+
+
+def part_footprint(lib_id, footprint):
+    """
+    Footprint dict of a section_parts() part
+
+    Args:
+        lib_id: Symbol name ('R', 'C' or a connector)
+        footprint: Footprint the schematic assigns (used for passives)
+    """
+    if lib_id in ('R', 'C'):
+        return passive_footprint(footprint)
+    pins = connector_info(lib_id)['pins']
+    return header_footprint(len(pins), connector_pitch(lib_id), lib_id in INPUT_CONNECTOR_INFO)
+
+
+def board_parts(sections=None, wire=False, place=False):
+    """
+    Footprints of a design, placed like the schematic symbols
+
+    Args:
+        sections: List of generate_section() keyword dicts
+            (default: DEFAULT_SECTIONS)
+        wire: Add the input connectors
+        place: Use the automatic schematic placement
+
+    Returns:
+        (parts, sections): parts is a list of (ref, value, footprint
+        dict, x, y) with x, y the footprint origin relative to the top
+        left of the board outline; sections as used (with input
+        connectors when wiring)
+    """
+    sections = DEFAULT_SECTIONS if sections is None else sections
+    if wire:
+        sections = add_input_connectors(sections)
+    placed = auto_place(sections) if place else sections
+
+    parts = []
+    for section in placed:
+        for ref, value, lib_id, x, y, footprint, _ in section_parts(**section):
+            fp = part_footprint(lib_id, footprint)
+            cx, cy = fp['centre']
+            parts.append((ref, value, fp, mm_to_mils(x) - cx, mm_to_mils(y) - cy))
+
+    x0 = min((x + fp['courtyard'][0] for _, _, fp, x, _ in parts), default=0) - BOARD_MARGIN
+    y0 = min((y + fp['courtyard'][1] for _, _, fp, _, y in parts), default=0) - BOARD_MARGIN
+    return [(ref, value, fp, x - x0, y - y0) for ref, value, fp, x, y in parts], sections
+
+
+def courtyards(parts):
+    """Courtyard boxes of placed parts, in board coordinates"""
+    return [(x + fp['courtyard'][0], y + fp['courtyard'][1],
+             x + fp['courtyard'][2], y + fp['courtyard'][3]) for _, _, fp, x, y in parts]
+
+
+def board_size(parts):
+    """(width, height) of the board outline around the parts"""
+    boxes = courtyards(parts)
+    return (max((box[2] for box in boxes), default=0) + BOARD_MARGIN,
+            max((box[3] for box in boxes), default=0) + BOARD_MARGIN)
+
+
+def pad_nets(sections):
+    """
+    Net of every connected pad
+
+    Returns:
+        (names, pins): net names in netlist order, and a dict
+        (ref, pin) -> index into names
+    """
+    names = []
+    pins = {}
+    for net in section_nets(sections).nets():
+        for pin in net.pins:
+            pins[pin] = len(names)
+        names.append(net.name)
+    return names, pins
+
+
+def generate_pcb(sections=None, wire=False, place=False, panel=(1, 1)):
+    """
+    Generate the board as a stream of S-expression pieces
+
+    Args:
+        sections: List of generate_section() keyword dicts
+            (default: DEFAULT_SECTIONS)
+        wire: Add input connectors and assign nets to the pads
+        place: Use the automatic schematic placement
+        panel: (columns, rows) of board copies
+
+    Yields:
+        Strings which concatenated form the .kicad_pcb file
+    """
+    parts, sections = board_parts(sections, wire, place)
+    width, height = board_size(parts)
+    columns, rows = panel
+    boards = [(column * (width + PANEL_GAP) + BOARD_ORIGIN[0],
+               row * (height + PANEL_GAP) + BOARD_ORIGIN[1])
+              for row in range(rows) for column in range(columns)]
+
+    names, pins = pad_nets(sections) if wire else ([], {})
+    yield PCB_HEADER
+    yield '\t(net 0 "")\n'
+    net_fields = []
+    for k in range(len(boards)):
+        prefix = f"Board_{k}-" if len(boards) > 1 else ""
+        base = 1 + k * len(names)
+        net_fields.append([f' (net {base + i} "{prefix}{name}")' for i, name in enumerate(names)])
+        yield ''.join(f'\t(net {base + i} "{prefix}{name}")\n' for i, name in enumerate(names))
+
+    no_nets = {}
+    for k, (bx, by) in enumerate(boards):
+        fields = net_fields[k]
+        out = []
+        for ref, value, fp, x, y in parts:
+            numbers = fp['numbers']
+            if pins:
+                nets = [fields[pins[ref, num]] if (ref, num) in pins else ''
+                        for num in numbers]
+            else:
+                nets = no_nets.setdefault(len(numbers), ('',) * len(numbers))
+            out.append(fp['template'].format(
+                _num(bx + x), _num(by + y), generate_uuid(f"/pcb/{k}/{ref}"), ref, value, *nets,
+            ))
+        out.append(
+            f'\t(gr_rect (start {_num(bx)} {_num(by)}) (end {_num(bx + width)} {_num(by + height)})\n'
+            f'\t\t(stroke (width 0.05) (type default)) (fill no) (layer "Edge.Cuts")\n'
+            f'\t\t(uuid {generate_uuid(f"/pcb/{k}/outline")})\n'
+            f'\t)\n'
+        )
+        yield ''.join(out)
+    yield ')\n'
+
+
+def parse_panel(text):
+    """Parse COLSxROWS (e.g. 4x2) for argparse"""
+    match = re.fullmatch(r'(\d+)x(\d+)', text)
+    if not match or int(match.group(1)) < 1 or int(match.group(2)) < 1:
+        raise argparse.ArgumentTypeError(f"expected COLSxROWS like 4x2, not {text!r}")
+    return int(match.group(1)), int(match.group(2))
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Generate the Adapterama KiCad board")
+    parser.add_argument('-o', '--output', default='adapterama.kicad_pcb',
+                        help='output file (default: %(default)s)')
+    parser.add_argument('--wire', action='store_true',
+                        help='add input connectors and assign nets to the pads')
+    parser.add_argument('--auto-place', action='store_true',
+                        help='place parts like generate_schematic.py --auto-place')
+    parser.add_argument('--panel', type=parse_panel, default=(1, 1), metavar='COLSxROWS',
+                        help='repeat the board as a panel (default: 1x1)')
+    parser.add_argument('--deterministic', action='store_true',
+                        help='derive UUIDs from references so unchanged boards are identical')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main entry point"""
+    args = parse_args(argv)
+    set_deterministic_uuids(args.deterministic)
+
+    parts, _ = board_parts(wire=args.wire, place=args.auto_place)
+    boxes = courtyards(parts)
+    for i, j in find_overlaps(boxes):
+        print(f"⚠ Courtyards overlap: {parts[i][0]} and {parts[j][0]}")
+
+    written = write_if_changed(args.output, generate_pcb(
+        wire=args.wire, place=args.auto_place, panel=args.panel,
+    ))
+    width, height = board_size(parts)
+    pads = sum(len(fp['numbers']) for _, _, fp, _, _ in parts)
+    copies = args.panel[0] * args.panel[1]
+    state = "generated" if written else "unchanged"
+    print(f"✓ Board {state}: {args.output}")
+    print(f"✓ {copies} x {width:.1f} x {height:.1f} mm, {len(parts)} footprints, "
+          f"{pads} pads per board")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
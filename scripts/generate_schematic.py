@@ -9,37 +9,107 @@ This script generates a complete KiCad schematic file with:
 - All symbols embedded (no external library dependencies)
 
 Usage:
-    python3 generate_schematic.py
+    python3 generate_schematic.py [-o OUTPUT] [--deterministic]
+
+    Use "-o -" to stream the schematic to stdout, e.g. to pipe it into
+    another tool without a temporary file.
+
+    --wire adds a J-Link input connector to every section and draws the
+    connections (wire stubs, net labels, GND symbols) described by
+    netlist.section_nets(), instead of leaving wiring to the user.
+
+    --erc (with --wire) runs the electrical rules check of erc.py first
+    and exits with status 1, without writing anything, on any error.
+    --erc-report PATH also saves the violations as JSON for CI.
+
+    --auto-place lays sections out from their symbols' bounding boxes
+    (placement.py) instead of at fixed offsets, so any number of sections
+    that fits on the sheet is placed without overlaps.
+
+    --hierarchical N writes every N sections to a sub-sheet file of their
+    own, rendered in parallel (-j JOBS), and a root sheet referencing them.
+
+    --ir FILE also saves the design (symbols, pin tables, instances and
+    their properties) as a columnar binary file that downstream tools can
+    memory-map instead of parsing the schematic (see design_ir.py).
+
+    --watch stays running and rewrites the schematic within milliseconds
+    whenever connector_data.py changes (watch.py also covers the symbol
+    library and batch variants).
+
+    --deterministic derives UUIDs from reference designators and label
+    text instead of drawing random ones. An unchanged design then
+    regenerates byte-identical, and the output file is left untouched.
+    Set SOURCE_DATE_EPOCH to also pin the title block date.
 
 Output:
     adapterama.kicad_sch - Complete KiCad schematic file
 """
 
-from datetime import datetime
-
-from connector_data import CONNECTOR_INFO
-from symbol_gen import (
-    create_connector_symbol,
-    create_resistor_symbol,
-    create_capacitor_symbol,
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+from connector_data import CONNECTOR_INFO, connector_footprint, connector_info
+from symbol_gen import create_resistor_symbol, create_capacitor_symbol, create_power_symbol
+from symbol_cache import cached_connector_symbol, configure_symbol_cache
+from component_gen import create_components, create_text_label
+from erc import print_report, run_erc
+from netlist import add_input_connectors, power_nets, section_nets, wire_netlist
+from placement import DEFAULT_SHEET, TITLE_SIZE, place_sections, text_box
+from profiling import add_profile_arguments, profile_session, timed
+from kicad_utils import (
+    DEFAULT_CHUNK_SIZE,
+    mm_to_mils,
+    open_output,
+    set_deterministic_uuids,
+    write_chunks,
+    write_if_changed,
 )
-from component_gen import create_component, create_text_label
 
 
-def generate_schematic_header():
-    """Generate schematic file header with metadata"""
+def schematic_date():
+    """Title block date: SOURCE_DATE_EPOCH if set (reproducible builds), else today"""
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch:
+        return datetime.fromtimestamp(int(epoch), timezone.utc).strftime('%Y-%m-%d')
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+# Input connector distance below the output connector (conceptual units)
+INPUT_CONNECTOR_OFFSET = 1.6
+
+# UUID of the (root) schematic
+ROOT_UUID = "c5f55ab1-dc13-4818-9acb-5ba26cd36488"
+
+DEFAULT_TITLE = "Adapterama - JTAG Converter Pack"
+DEFAULT_OUTPUTS = "ARM 20-pin, TI CTI-20, Cortex 10-pin"
+
+
+@timed('schematic.header')
+def generate_schematic_header(title=DEFAULT_TITLE, outputs=DEFAULT_OUTPUTS, uuid=ROOT_UUID):
+    """
+    Generate schematic file header with metadata
+
+    Args:
+        title: Title block title
+        outputs: Short list of output connectors for the title block
+        uuid: UUID of the schematic file
+    """
     return f"""(kicad_sch
 \t(version 20250114)
 \t(generator "python-script")
 \t(generator_version "2.0")
-\t(uuid c5f55ab1-dc13-4818-9acb-5ba26cd36488)
+\t(uuid {uuid})
 \t(paper "A3")
 \t(title_block
-\t\t(title "Adapterama - JTAG Converter Pack")
-\t\t(date "{datetime.now().strftime('%Y-%m-%d')}")
+\t\t(title "{title}")
+\t\t(date "{schematic_date()}")
 \t\t(rev "1.0")
 \t\t(comment 1 "Multi-format JTAG/SWD adapter - Female output connectors")
-\t\t(comment 2 "ARM 20-pin, TI CTI-20, Cortex 10-pin outputs")
+\t\t(comment 2 "{outputs} outputs")
 \t\t(comment 3 "Passive adapter - wire per WIRING_GUIDE.md")
 \t)
 
@@ -47,64 +117,73 @@ def generate_schematic_header():
 """
 
 
-def generate_symbols():
-    """Generate all embedded symbols"""
-    symbols = []
+@timed('schematic.symbols')
+def generate_symbols(connector_names=None, power_names=()):
+    """
+    Generate all embedded symbols, one S-expression at a time
+
+    Args:
+        connector_names: CONNECTOR_INFO / INPUT_CONNECTOR_INFO keys to
+            embed (default: all CONNECTOR_INFO)
+        power_names: Power symbols to embed (e.g. ["GND"])
+    """
+    if connector_names is None:
+        connector_names = CONNECTOR_INFO
 
     # Connector symbols from data
-    for name, info in CONNECTOR_INFO.items():
-        symbols.append(
-            create_connector_symbol(name, info['datasheet'], info['pins'])
-        )
+    for name in connector_names:
+        info = connector_info(name)
+        yield cached_connector_symbol(name, info['datasheet'], info['pin_table'])
 
     # Passive component symbols
-    symbols.append(create_resistor_symbol())
-    symbols.append(create_capacitor_symbol())
+    yield create_resistor_symbol()
+    yield create_capacitor_symbol()
 
-    return symbols
+    for name in power_names:
+        yield create_power_symbol(name)
 
 
-def generate_section(section_num, x_base, y_base, connector_name, resistors, capacitor):
+def section_parts(section_num, x_base, y_base, connector_name, resistors, capacitor,
+                  title=None, input_connector=None, input_ref=None, positions=None,
+                  title_at=None):
     """
-    Generate a complete section with connector, resistors, and capacitor
+    Place the parts of a section
 
     Args:
-        section_num: Section number (1, 2, or 3)
+        section_num: Section number (1-based)
         x_base: Base X coordinate
         y_base: Base Y coordinate
         connector_name: Connector symbol name
         resistors: List of (ref, value, description) tuples
         capacitor: Tuple of (ref, value)
+        title: Section label (unused here, see generate_section)
+        input_connector: Input connector symbol name (optional)
+        input_ref: Reference of the input connector (with input_connector)
+        positions: Dict ref -> (x, y) overriding the fixed layout
+            (see placement.place_sections)
+        title_at: Section label position (unused here, see generate_section)
 
     Returns:
-        List of component/text S-expressions
+        List of create_component() argument tuples
+        (ref, value, lib_id, x, y, footprint, properties)
     """
     parts = []
 
-    # Section label
-    section_names = {
-        1: "Section 1: ARM 20-pin",
-        2: "Section 2: TI CTI-20",
-        3: "Section 3: Cortex 10-pin",
-    }
-    parts.append(create_text_label(section_names[section_num], x_base - 0.2, 0.3, 2.5))
-
     # Connector
     j_ref = f"J{section_num}"
-    parts.append(create_component(
+    parts.append((
         j_ref,
         f"{connector_name.split('_')[0]}_Output",
         connector_name,
         x_base,
         y_base,
-        "Connector_PinHeader_1.27mm:PinHeader_2x10_P1.27mm_Vertical"
-        if "10pin" not in connector_name
-        else "Connector_PinHeader_1.27mm:PinHeader_2x05_P1.27mm_Vertical",
+        connector_footprint(connector_name),
+        None,
     ))
 
     # Resistors to the right of connector
     for i, (ref, val, desc) in enumerate(resistors):
-        parts.append(create_component(
+        parts.append((
             ref,
             val,
             "R",
@@ -116,7 +195,7 @@ def generate_section(section_num, x_base, y_base, connector_name, resistors, cap
 
     # Capacitor
     c_ref, c_val = capacitor
-    parts.append(create_component(
+    parts.append((
         c_ref,
         c_val,
         "C",
@@ -126,18 +205,91 @@ def generate_section(section_num, x_base, y_base, connector_name, resistors, cap
         {"Description": "VTref decoupling"},
     ))
 
+    # Input connector below the output connector
+    if input_connector:
+        parts.append((
+            input_ref,
+            "JLink_Input",
+            input_connector,
+            x_base,
+            y_base + INPUT_CONNECTOR_OFFSET,
+            connector_footprint(input_connector),
+            None,
+        ))
+
+    if positions:
+        parts = [(ref, value, lib_id, *positions.get(ref, (x, y)), *rest)
+                 for ref, value, lib_id, x, y, *rest in parts]
     return parts
 
 
-def generate_components():
-    """Generate all component instances"""
-    parts = []
+# Labels of the default sections
+SECTION_TITLES = {
+    1: "Section 1: ARM 20-pin",
+    2: "Section 2: TI CTI-20",
+    3: "Section 3: Cortex 10-pin",
+}
 
-    # NOTE: KiCad coordinate system - values are 1/100th of desired mm placement
-    # See kicad_utils.py for explanation
 
+def section_title(section_num, connector_name, title=None):
+    """Section label: title if given, else derived from section_num"""
+    if title is None:
+        title = SECTION_TITLES.get(section_num, f"Section {section_num}: {connector_name}")
+    return title
+
+
+def section_label(section_num, x_base, connector_name, title=None, title_at=None, **_):
+    """
+    Title label of a section
+
+    Takes a generate_section() keyword dict (other keys are ignored).
+
+    Returns:
+        (text, x, y) with x, y in conceptual units
+    """
+    title_x, title_y = title_at or (x_base - 0.2, 0.3)
+    return section_title(section_num, connector_name, title), title_x, title_y
+
+
+def generate_section(section_num, x_base, y_base, connector_name, resistors, capacitor,
+                     title=None, input_connector=None, input_ref=None, positions=None,
+                     title_at=None, sheet_path="/"):
+    """
+    Generate a complete section with connector, resistors, and capacitor
+
+    Args:
+        section_num: Section number (1-based)
+        x_base: Base X coordinate
+        y_base: Base Y coordinate
+        connector_name: Connector symbol name
+        resistors: List of (ref, value, description) tuples
+        capacitor: Tuple of (ref, value)
+        title: Section label (default: derived from section_num)
+        input_connector: Input connector symbol name (optional)
+        input_ref: Reference of the input connector (with input_connector)
+        positions: Dict ref -> (x, y) overriding the fixed layout
+        title_at: Section label position (default: above x_base)
+        sheet_path: Hierarchical sheet path of the section (default "/")
+
+    Yields:
+        Component/text S-expressions
+    """
+    # Section label
+    text, title_x, title_y = section_label(section_num, x_base, connector_name, title,
+                                           title_at)
+    yield create_text_label(text, title_x, title_y, TITLE_SIZE, sheet_path)
+
+    parts = section_parts(section_num, x_base, y_base, connector_name, resistors, capacitor,
+                          input_connector=input_connector, input_ref=input_ref,
+                          positions=positions)
+    yield create_components(*zip(*parts), sheet_path=sheet_path)
+
+
+# NOTE: KiCad coordinate system - values are 1/100th of desired mm placement
+# See kicad_utils.py for explanation
+DEFAULT_SECTIONS = [
     # Section 1: ARM 20-pin
-    parts.extend(generate_section(
+    dict(
         section_num=1,
         x_base=0.5,
         y_base=0.7,
@@ -152,10 +304,9 @@ def generate_components():
             ("R7", "33", "TDO series"),
         ],
         capacitor=("C1", "100nF"),
-    ))
-
+    ),
     # Section 2: TI CTI-20
-    parts.extend(generate_section(
+    dict(
         section_num=2,
         x_base=1.6,
         y_base=0.7,
@@ -170,10 +321,9 @@ def generate_components():
             ("R14", "33", "TDO series"),
         ],
         capacitor=("C2", "100nF"),
-    ))
-
+    ),
     # Section 3: Cortex 10-pin
-    parts.extend(generate_section(
+    dict(
         section_num=3,
         x_base=2.7,
         y_base=0.7,
@@ -188,63 +338,365 @@ def generate_components():
             ("R21", "33", "SWO series"),
         ],
         capacitor=("C3", "100nF"),
-    ))
+    ),
+]
+
+
+# Footer note: text, x, y, size (conceptual units)
+FOOTER_NOTE = ("Wire per WIRING_GUIDE.md | All female outputs", 0.3, 1.8, 2.0)
+
+
+def auto_place(sections, sheet=DEFAULT_SHEET):
+    """
+    Place sections automatically instead of at their fixed offsets
+
+    Args:
+        sections: List of generate_section() keyword dicts
+        sheet: Paper size (see placement.SHEET_SIZES)
+
+    Returns:
+        Section dicts with positions and title_at (see placement.place_sections)
+    """
+    text, x, y, size = FOOTER_NOTE
+    footer = text_box(text, mm_to_mils(x), mm_to_mils(y), size)
+    titled = [dict(section, title=section_title(section['section_num'],
+                                                section['connector_name'],
+                                                section.get('title')))
+              for section in sections]
+    return place_sections(titled, section_parts, sheet, [footer])
+
+
+@timed('schematic.components')
+def generate_components(sections=None, sheet_path="/", note=True):
+    """
+    Generate all component instances, one S-expression at a time
+
+    Args:
+        sections: List of generate_section() keyword dicts
+            (default: DEFAULT_SECTIONS)
+        sheet_path: Hierarchical sheet path of the components (default "/")
+        note: Add the footer note
+    """
+    if sections is None:
+        sections = DEFAULT_SECTIONS
+    for section in sections:
+        yield from generate_section(**section, sheet_path=sheet_path)
 
     # Footer note
-    parts.append(
-        create_text_label("Wire per WIRING_GUIDE.md | All female outputs", 0.3, 1.8, 2.0)
-    )
+    if note:
+        yield create_text_label(*FOOTER_NOTE, sheet_path)
 
-    return parts
 
+@timed('schematic.wiring')
+def generate_wiring(sections, netlist=None, sheet_path="/", first_power=1):
+    """
+    Generate the wiring of all sections, one S-expression at a time
+
+    Args:
+        sections: Section dicts with input connectors (see add_input_connectors)
+        netlist: Netlist of the sections (default: section_nets(sections))
+        sheet_path: Hierarchical sheet path of the wiring (default "/")
+        first_power: Number of the first power symbol reference (#PWR01)
+    """
+    if netlist is None:
+        netlist = section_nets(sections)
+    parts = [part for section in sections for part in section_parts(**section)]
+    yield from wire_netlist(netlist, parts, sheet_path, first_power)
+
+
+@timed('schematic.footer')
+def generate_schematic_footer(sheet_instances=True):
+    """
+    Generate schematic file footer
 
-def generate_schematic_footer():
-    """Generate schematic file footer"""
-    return """\t(sheet_instances
+    Args:
+        sheet_instances: Include the page list (root sheet only)
+    """
+    footer = ""
+    if sheet_instances:
+        footer += """\t(sheet_instances
 \t\t(path "/" (page "1"))
 \t)
-\t(embedded_fonts no)
+"""
+    return footer + """\t(embedded_fonts no)
 )
 """
 
 
-def main():
-    """Main schematic generation function"""
-    print("Generating Adapterama JTAG Converter Pack schematic...")
-    print("Using modular architecture...")
+def flat_design(sections=None, connector_names=None, wire=False, place=False):
+    """
+    Sections, symbols and nets of a flat schematic
 
-    parts = []
+    Shared by generate_schematic() and document.build_schematic() so
+    the streamed file and the document hold the same design.
+
+    Args:
+        sections: List of generate_section() keyword dicts
+            (default: DEFAULT_SECTIONS)
+        connector_names: Connector symbols to embed (default: all)
+        wire: Add the input connectors (and their symbols) and the nets
+        place: Place the sections automatically (see placement.py)
+
+    Returns:
+        (sections, connector_names, netlist, power_names); netlist is
+        None and power_names empty without wire
+    """
+    netlist = None
+    power_names = ()
+    if sections is None:
+        sections = DEFAULT_SECTIONS
+    if connector_names is None:
+        connector_names = CONNECTOR_INFO
+    if wire:
+        sections = add_input_connectors(sections)
+        connector_names = list(connector_names)
+        for section in sections:
+            if section['input_connector'] not in connector_names:
+                connector_names.append(section['input_connector'])
+        netlist = section_nets(sections)
+        power_names = power_nets(netlist)
+    if place:
+        sections = auto_place(sections)
+    return sections, connector_names, netlist, power_names
+
+
+def generate_schematic(sections=None, connector_names=None, title=DEFAULT_TITLE,
+                       outputs=DEFAULT_OUTPUTS, wire=False, place=False):
+    """
+    Generate the complete schematic as a stream of S-expression pieces
+
+    Args:
+        sections: List of generate_section() keyword dicts
+            (default: DEFAULT_SECTIONS)
+        connector_names: Connector symbols to embed (default: all)
+        title: Title block title
+        outputs: Short list of output connectors for the title block
+        wire: Add input connectors and draw all section connections
+        place: Place the sections automatically (see placement.py)
+
+    Yields:
+        Strings which concatenated form the .kicad_sch file
+    """
+    sections, connector_names, netlist, power_names = flat_design(
+        sections, connector_names, wire, place)
 
     # Header
-    parts.append(generate_schematic_header())
+    yield generate_schematic_header(title, outputs)
 
     # Symbols
-    parts.extend(generate_symbols())
-    parts.append("\t)\n\n")
+    yield from generate_symbols(connector_names, power_names)
+    yield "\t)\n\n"
 
     # Components
-    parts.extend(generate_components())
+    yield from generate_components(sections)
+
+    # Wires, labels and power symbols
+    if wire:
+        yield from generate_wiring(sections, netlist)
 
     # Footer
-    parts.append(generate_schematic_footer())
-
-    # Write file
-    output_file = "adapterama.kicad_sch"
-    with open(output_file, 'w') as f:
-        f.write(''.join(parts))
-
-    print(f"✓ Schematic generated: {output_file}")
-    print(f"✓ Modular design: 5 Python modules")
-    print(f"✓ Symbols: ARM 20-pin, TI CTI-20, Cortex 10-pin")
-    print(f"✓ Components: 3 connectors, 21 resistors, 3 capacitors")
-    print("\nModules:")
-    print("  - kicad_utils.py       (utilities)")
-    print("  - connector_data.py    (pin definitions)")
-    print("  - symbol_gen.py        (symbol generation)")
-    print("  - component_gen.py     (component instances)")
-    print("  - generate_schematic.py (main orchestrator)")
-    print("\nNext: Open in KiCad and wire connections")
+    yield generate_schematic_footer()
+
+
+def write_schematic(sink, chunk_size=DEFAULT_CHUNK_SIZE, **kwargs):
+    """
+    Stream the schematic to a file path, "-" (stdout) or file-like sink
+
+    Args:
+        sink: Output path, "-" or writable text object
+        chunk_size: Approximate number of characters buffered per write
+        **kwargs: Passed on to generate_schematic()
+
+    Returns:
+        Number of characters written
+    """
+    with open_output(sink) as f:
+        return write_chunks(f, generate_schematic(**kwargs), chunk_size)
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Generate the Adapterama KiCad schematic"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        default="adapterama.kicad_sch",
+        help='output file, or "-" to write to stdout (default: %(default)s)',
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="characters buffered per write (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--deterministic",
+        action="store_true",
+        help="derive UUIDs from references/labels so unchanged designs are identical",
+    )
+    parser.add_argument(
+        "--symbol-cache",
+        metavar="DIR",
+        help="enable the on-disk symbol cache in DIR (e.g. .cache/symbols)",
+    )
+    parser.add_argument(
+        "--wire",
+        action="store_true",
+        help="add input connectors and generate wires, net labels and GND symbols",
+    )
+    parser.add_argument(
+        "--erc",
+        action="store_true",
+        help="with --wire, run the electrical rules check and write nothing on errors",
+    )
+    parser.add_argument(
+        "--erc-report",
+        metavar="JSON",
+        help="with --erc, also write the violations as JSON",
+    )
+    parser.add_argument(
+        "--auto-place",
+        action="store_true",
+        help="place sections automatically on the sheet instead of at fixed offsets",
+    )
+    parser.add_argument(
+        "--hierarchical",
+        type=int,
+        metavar="N",
+        help="write N sections per sub-sheet plus a root sheet (see hierarchical.py)",
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="worker processes for --hierarchical (default: CPU count)",
+    )
+    parser.add_argument(
+        "--ir",
+        metavar="FILE",
+        help="also save the design as a columnar binary file (see design_ir.py)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and regenerate when the pin data changes (see watch.py)",
+    )
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.hierarchical is not None:
+        if args.hierarchical < 1:
+            parser.error("--hierarchical needs at least 1 section per sheet")
+        if args.output == "-":
+            parser.error("--hierarchical writes several files and cannot stream to stdout")
+    if args.watch and (args.output == "-" or args.hierarchical or args.erc or args.ir):
+        parser.error("--watch writes one schematic file; it cannot be combined with "
+                     "-o -, --hierarchical, --erc or --ir")
+    if args.ir and args.hierarchical:
+        parser.error("--ir saves the flat design and cannot be combined with --hierarchical")
+    if args.erc and not args.wire:
+        parser.error("--erc needs --wire")
+    if args.erc_report and not args.erc:
+        parser.error("--erc-report needs --erc")
+    return args
+
+
+@timed('schematic.erc')
+def check_schematic(sections=None):
+    """
+    Run the electrical rules check over the wired sections
+
+    Args:
+        sections: List of generate_section() keyword dicts
+            (default: DEFAULT_SECTIONS)
+
+    Returns:
+        ERC report dict (see erc.run_erc)
+    """
+    sections = add_input_connectors(DEFAULT_SECTIONS if sections is None else sections)
+    parts = [part for section in sections for part in section_parts(**section)]
+    return run_erc(section_nets(sections), parts)
+
+
+def main(argv=None):
+    """Main schematic generation function"""
+    args = parse_args(argv)
+    output_file = args.output
+    if args.symbol_cache:
+        configure_symbol_cache(args.symbol_cache)
+    set_deterministic_uuids(args.deterministic)
+
+    # Keep stdout clean for the schematic itself when streaming to it
+    log = sys.stderr if output_file == "-" else sys.stdout
+
+    if args.watch:
+        from watch import Watcher
+
+        Watcher(schematic=output_file, library=None, wire=args.wire,
+                place=args.auto_place).run()
+        return 0
+
+    print("Generating Adapterama JTAG Converter Pack schematic...", file=log)
+    print("Using modular architecture...", file=log)
+
+    with profile_session(args):
+        if args.erc:
+            report = check_schematic()
+            print_report(report, file=log)
+            if args.erc_report:
+                with open(args.erc_report, "w") as f:
+                    json.dump(report, f, indent=2)
+            if report["errors"]:
+                print(f"✗ ERC failed, {output_file} not written", file=log)
+                return 1
+
+        if args.hierarchical:
+            from hierarchical import write_hierarchical
+
+            results = write_hierarchical(
+                output_file, per_sheet=args.hierarchical, jobs=args.jobs, wire=args.wire,
+                deterministic=args.deterministic, symbol_cache=args.symbol_cache,
+                chunk_size=args.chunk_size,
+            )
+            for path, sheet_written in results[1:]:
+                state = "generated" if sheet_written else "unchanged"
+                print(f"✓ Sub-sheet {state}: {path}", file=log)
+            written = results[0][1]
+        elif output_file == "-":
+            write_schematic(output_file, args.chunk_size, wire=args.wire,
+                            place=args.auto_place)
+            written = True
+        else:
+            written = write_if_changed(
+                output_file, generate_schematic(wire=args.wire, place=args.auto_place),
+                args.chunk_size,
+            )
+
+    if written:
+        print(f"✓ Schematic generated: {output_file}", file=log)
+    else:
+        print(f"✓ Schematic unchanged: {output_file}", file=log)
+    if args.ir:
+        from design_ir import design_tables, write_design
+
+        tables = design_tables(wire=args.wire, place=args.auto_place)
+        state = "generated" if write_design(args.ir, tables) else "unchanged"
+        print(f"✓ Design IR {state}: {args.ir}", file=log)
+    print(f"✓ Modular design: 5 Python modules", file=log)
+    print(f"✓ Symbols: ARM 20-pin, TI CTI-20, Cortex 10-pin", file=log)
+    print(f"✓ Components: 3 connectors, 21 resistors, 3 capacitors", file=log)
+    print("\nModules:", file=log)
+    print("  - kicad_utils.py       (utilities)", file=log)
+    print("  - connector_data.py    (pin definitions)", file=log)
+    print("  - symbol_gen.py        (symbol generation)", file=log)
+    print("  - component_gen.py     (component instances)", file=log)
+    print("  - generate_schematic.py (main orchestrator)", file=log)
+    if args.wire:
+        print("\nNext: Open in KiCad and run ERC", file=log)
+    else:
+        print("\nNext: Open in KiCad and wire connections (or use --wire)", file=log)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
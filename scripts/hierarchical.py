@@ -0,0 +1,218 @@
+"""
+Hierarchical multi-sheet schematics
+
+write_hierarchical() splits the sections into groups of N and writes
+every group to its own sub-sheet file next to the root schematic:
+
+    adapterama.kicad_sch          root: one (sheet ...) reference per group
+    adapterama-sheet1.kicad_sch   sections 1..N
+    adapterama-sheet2.kicad_sch   sections N+1..2N
+    ...
+
+Each sub-sheet embeds only the symbols it uses, is placed automatically
+(placement.py) and is rendered by a worker process, so generation time
+and KiCad load time per file follow the sheet size, not the design
+size. Instances in sub-sheet n use the path /<root uuid>/<sheet uuid>
+and power symbols are numbered from #PWR<page>001 so references stay
+unique across sheets.
+
+Used by generate_schematic.py --hierarchical N.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from component_gen import create_sheet, create_text_label
+from generate_schematic import (
+    DEFAULT_OUTPUTS,
+    DEFAULT_SECTIONS,
+    DEFAULT_TITLE,
+    FOOTER_NOTE,
+    ROOT_UUID,
+    auto_place,
+    generate_components,
+    generate_schematic_footer,
+    generate_schematic_header,
+    generate_symbols,
+    generate_wiring,
+)
+from kicad_utils import (
+    DEFAULT_CHUNK_SIZE,
+    generate_uuid,
+    mm_to_mils,
+    set_deterministic_uuids,
+    write_if_changed,
+)
+from netlist import add_input_connectors, power_nets, section_nets
+from placement import pack, snap, text_box
+from stroke_font import text_width
+from symbol_cache import configure_symbol_cache
+
+
+# Sheet boxes on the root sheet (mm)
+SHEET_WIDTH = 50.8
+SHEET_HEIGHT = 12.7
+# Room above and below a sheet box for its name and file name
+SHEET_TEXT_ROOM = 2.54
+
+
+def group_sections(sections, per_sheet):
+    """Split sections into consecutive groups of per_sheet"""
+    if per_sheet < 1:
+        raise ValueError(f"sections per sheet must be at least 1, not {per_sheet}")
+    return [sections[i:i + per_sheet] for i in range(0, len(sections), per_sheet)]
+
+
+def sheet_name(group):
+    """Name of the sub-sheet holding a group of sections"""
+    first, last = group[0]['section_num'], group[-1]['section_num']
+    return f"Section {first}" if first == last else f"Sections {first}-{last}"
+
+
+def generate_sub_sheet(sheet, title=DEFAULT_TITLE, outputs=DEFAULT_OUTPUTS, wire=False):
+    """
+    Generate one sub-sheet as a stream of S-expression pieces
+
+    Args:
+        sheet: Sheet dict from plan_sheets()
+        title: Title block title
+        outputs: Title block output list
+        wire: Draw the section wiring (sections already have input connectors)
+
+    Yields:
+        Strings which concatenated form the sub-sheet .kicad_sch file
+    """
+    sections = sheet['sections']
+    connector_names = list(dict.fromkeys(
+        name for section in sections
+        for name in (section['connector_name'], section.get('input_connector')) if name
+    ))
+    netlist = section_nets(sections) if wire else None
+    power_names = power_nets(netlist) if wire else ()
+    sections = auto_place(sections)
+
+    yield generate_schematic_header(title, outputs, sheet['file_uuid'])
+    yield from generate_symbols(connector_names, power_names)
+    yield "\t)\n\n"
+    yield from generate_components(sections, sheet['path'], note=False)
+    if wire:
+        yield from generate_wiring(sections, netlist, sheet['path'], sheet['page'] * 1000 + 1)
+    yield generate_schematic_footer(sheet_instances=False)
+
+
+def generate_root_sheet(sheets, title=DEFAULT_TITLE, outputs=DEFAULT_OUTPUTS):
+    """
+    Generate the root sheet: sheet references and the footer note
+
+    Args:
+        sheets: Sheet dicts from plan_sheets()
+        title: Title block title
+        outputs: Title block output list
+
+    Yields:
+        Strings which concatenated form the root .kicad_sch file
+    """
+    text, x, y, size = FOOTER_NOTE
+    footer = text_box(text, mm_to_mils(x), mm_to_mils(y), size)
+    sizes = [(sheet['width'], SHEET_HEIGHT + 2 * SHEET_TEXT_ROOM) for sheet in sheets]
+    corners = pack(sizes, obstacles=[footer])
+
+    yield generate_schematic_header(title, outputs)
+    yield "\t)\n\n"
+    for sheet, (x0, y0) in zip(sheets, corners):
+        yield create_sheet(sheet['name'], sheet['file'], x0, y0 + SHEET_TEXT_ROOM,
+                           sheet['width'], SHEET_HEIGHT, sheet['uuid'], sheet['page'],
+                           f"/{ROOT_UUID}")
+    yield create_text_label(*FOOTER_NOTE)
+    yield generate_schematic_footer()
+
+
+def plan_sheets(output, sections, per_sheet):
+    """
+    Decide the sub-sheets of a design
+
+    Args:
+        output: Root schematic path
+        sections: Section dicts (with input connectors when wiring)
+        per_sheet: Sections per sub-sheet
+
+    Returns:
+        List of sheet dicts: name, file (relative to the root), output
+        (path), page, uuid, file_uuid, path (instance path), width and
+        sections
+    """
+    directory = os.path.dirname(output)
+    stem = os.path.splitext(os.path.basename(output))[0]
+    sheets = []
+    for n, group in enumerate(group_sections(sections, per_sheet), 1):
+        name = sheet_name(group)
+        filename = f"{stem}-sheet{n}.kicad_sch"
+        sheet_uuid = generate_uuid(f"/sheet:{filename}")
+        sheets.append({
+            'name': name,
+            'file': filename,
+            'output': os.path.join(directory, filename),
+            'page': n + 1,
+            'uuid': sheet_uuid,
+            'file_uuid': generate_uuid(f"/file:{filename}"),
+            'path': f"/{ROOT_UUID}/{sheet_uuid}",
+            'width': max(SHEET_WIDTH, snap(text_width(name) + SHEET_TEXT_ROOM)),
+            'sections': group,
+        })
+    return sheets
+
+
+def _init_worker(deterministic, symbol_cache):
+    set_deterministic_uuids(deterministic)
+    if symbol_cache:
+        configure_symbol_cache(symbol_cache)
+
+
+def _write_sub_sheet(sheet, title, outputs, wire, chunk_size):
+    written = write_if_changed(sheet['output'],
+                               generate_sub_sheet(sheet, title, outputs, wire), chunk_size)
+    return sheet['output'], written
+
+
+def write_hierarchical(output, sections=None, per_sheet=1, jobs=None, wire=False,
+                       title=DEFAULT_TITLE, outputs=DEFAULT_OUTPUTS, deterministic=False,
+                       symbol_cache=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Write a root schematic and its sub-sheets
+
+    Sub-sheets are rendered in a process pool (in-process for a single
+    sheet or jobs=1). Files whose content did not change are not
+    rewritten.
+
+    Args:
+        output: Root schematic path
+        sections: List of generate_section() keyword dicts
+            (default: DEFAULT_SECTIONS)
+        per_sheet: Sections per sub-sheet
+        jobs: Worker processes (default: CPU count)
+        wire: Add input connectors and draw the section wiring
+        title: Title block title
+        outputs: Title block output list
+        deterministic: Derive UUIDs from keys (see set_deterministic_uuids)
+        symbol_cache: On-disk symbol cache directory for the workers
+
+    Returns:
+        List of (path, written) for the root and every sub-sheet
+    """
+    set_deterministic_uuids(deterministic)
+    sections = DEFAULT_SECTIONS if sections is None else sections
+    if wire:
+        sections = add_input_connectors(sections)
+    sheets = plan_sheets(output, sections, per_sheet)
+    args = (title, outputs, wire, chunk_size)
+
+    if jobs == 1 or len(sheets) == 1:
+        results = [_write_sub_sheet(sheet, *args) for sheet in sheets]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(deterministic, symbol_cache)) as pool:
+            futures = [pool.submit(_write_sub_sheet, sheet, *args) for sheet in sheets]
+            results = [future.result() for future in futures]
+
+    written = write_if_changed(output, generate_root_sheet(sheets, title, outputs), chunk_size)
+    return [(output, written)] + results
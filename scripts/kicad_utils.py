@@ -1,8 +1,22 @@
 """
-KiCad utility functions for coordinate conversion and ID generation
+KiCad utility functions for coordinate conversion, ID generation and output
 """
 
+import os
+import sys
 import uuid
+from contextlib import contextmanager
+
+from profiling import stage
+
+
+# Flush streamed output in chunks of roughly this many characters
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Namespace for deterministic (uuid5) identifiers
+UUID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, 'https://github.com/N0K0/adaperama')
+
+_deterministic_uuids = False
 
 
 def mm_to_mils(mm):
@@ -12,6 +26,7 @@ def mm_to_mils(mm):
     Note: KiCad internally uses mils. 1 mil = 0.0254mm
     In this project, we use coordinates 1/100th of desired mm placement
     due to the conversion factor creating positions 100x larger.
+    The emitters use the integer form, coords.conceptual_to_nm().
 
     Args:
         mm: Value in millimeters (conceptual units in this project)
@@ -22,11 +37,150 @@ def mm_to_mils(mm):
     return mm / 0.0254
 
 
-def generate_uuid():
+def set_deterministic_uuids(enabled=True):
+    """
+    Switch generate_uuid() between random and key-derived identifiers
+
+    Args:
+        enabled: True to derive uuid5 values from the caller's key
+    """
+    global _deterministic_uuids
+    _deterministic_uuids = enabled
+
+
+def generate_uuid(key=None):
     """
     Generate a UUID for KiCad components
 
+    In deterministic mode (see set_deterministic_uuids) the UUID is a
+    uuid5 of UUID_NAMESPACE and key, so regenerating an unchanged design
+    gives identical files.
+
+    Args:
+        key: Stable identity of the object, e.g. sheet path + reference
+
     Returns:
         UUID string
     """
+    if _deterministic_uuids and key is not None:
+        return str(uuid.uuid5(UUID_NAMESPACE, key))
     return str(uuid.uuid4())
+
+
+@contextmanager
+def open_output(path):
+    """
+    Open an output sink for generated S-expressions
+
+    Args:
+        path: File path, "-" for stdout, or an already open file-like object
+
+    Yields:
+        Writable text sink (only closed here if it was opened here)
+    """
+    if path == '-':
+        yield sys.stdout
+        sys.stdout.flush()
+    elif hasattr(path, 'write'):
+        yield path
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            yield f
+
+
+def write_chunks(sink, pieces, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Write an iterable of strings to a sink in bounded chunks
+
+    Small pieces are coalesced so the sink sees few large writes, while at
+    most about chunk_size characters are held in memory at any time.
+
+    Args:
+        sink: Writable text sink
+        pieces: Iterable of strings
+        chunk_size: Flush threshold in characters
+
+    Returns:
+        Number of characters written
+    """
+    buffer = []
+    buffered = 0
+    total = 0
+    for piece in pieces:
+        buffer.append(piece)
+        buffered += len(piece)
+        if buffered >= chunk_size:
+            _flush(sink, buffer, buffered)
+            total += buffered
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        _flush(sink, buffer, buffered)
+        total += buffered
+    return total
+
+
+def _flush(sink, buffer, buffered):
+    with stage('io.join'):
+        text = ''.join(buffer)
+    with stage('io.write', buffered):
+        sink.write(text)
+
+
+def write_if_changed(path, pieces, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Write streamed content to path only if it differs from the file
+
+    The pieces are compared against the existing file as they are
+    generated. Identical content costs no disk writes at all; at the
+    first difference the matched prefix is copied to a temporary file,
+    the rest of the stream is written after it and the temporary file
+    atomically replaces path.
+
+    Args:
+        path: Output file path
+        pieces: Iterable of strings
+        chunk_size: Flush threshold in characters
+
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    pieces = iter(pieces)
+    try:
+        existing = open(path, 'r', encoding='utf-8', newline='')
+    except FileNotFoundError:
+        existing = None
+
+    tmp_path = f'{path}.tmp'
+    if existing is None:
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            write_chunks(f, pieces, chunk_size)
+        os.replace(tmp_path, path)
+        return True
+
+    with existing:
+        matched = 0
+        diverged = None
+        for piece in pieces:
+            with stage('io.compare', len(piece)):
+                same = existing.read(len(piece)) == piece
+            if not same:
+                diverged = piece
+                break
+            matched += len(piece)
+        else:
+            if not existing.read(1):
+                return False
+
+        existing.seek(0)
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            remaining = matched
+            while remaining:
+                block = existing.read(min(remaining, chunk_size))
+                f.write(block)
+                remaining -= len(block)
+            if diverged is not None:
+                f.write(diverged)
+            write_chunks(f, pieces, chunk_size)
+    os.replace(tmp_path, path)
+    return True
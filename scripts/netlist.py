@@ -0,0 +1,405 @@
+"""
+Net descriptions and their wiring S-expressions
+
+A Netlist collects connections declaratively: every connect() call puts
+a set of (ref, pin) endpoints on one net, optionally naming it. Nets
+that share an endpoint are merged with a union-find, so building even
+very large designs stays near-linear in the number of pins.
+
+wire_netlist() turns the resolved nets into schematic items. Every
+connector pin gets a short wire stub ending in a net label (or a power
+symbol for power nets); passive pins carry the label directly on their
+connection point. Connector pins left on no net get a no-connect flag.
+
+section_nets() derives the nets of the adapter sections from the
+connector signal mapping (signal_map.py) and the resistor descriptions,
+following WIRING_GUIDE.md:
+
+    J4-7 (TMS) -> R1 pin 2 (pull-up) -> S1_TMS_PU -> R5 (series) -> S1_TMS -> J1-7
+"""
+
+from connector_data import connector_info
+from coords import conceptual_to_nm, printed, to_mm, to_nm
+from component_gen import create_wire, create_net_label, create_power_port, create_no_connect
+from signal_map import map_connectors, signal_aliases
+from symbol_gen import PASSIVE_PIN_LAYOUT, connector_pin_layout
+
+
+# Input connector fitted to every section when wiring (J-Link side)
+DEFAULT_INPUT_CONNECTOR = 'ARM_JTAG_20pin_2.54mm'
+
+# Length of the wire stub between a connector pin and its label (mm)
+STUB_LENGTH = 2.54
+
+# Outward direction of a pin in schematic coordinates (y down), by pin angle
+_OUTWARD = {0: (-1, 0), 90: (0, 1), 180: (1, 0), 270: (0, -1)}
+# Label text angle pointing away from the pin, by pin angle
+_LABEL_ANGLE = {0: 180, 90: 270, 180: 0, 270: 90}
+
+# Net kinds, strongest first: a net declared both power and label is power
+NET_KINDS = ('power', 'global_label', 'label')
+
+
+class UnionFind:
+    """Disjoint sets of hashable items (union by size, path halving)"""
+
+    __slots__ = ('items', '_index', '_parent', '_size')
+
+    def __init__(self):
+        self.items = []
+        self._index = {}
+        self._parent = []
+        self._size = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, item):
+        """Add item as a singleton set if new; returns its index"""
+        index = self._index.get(item)
+        if index is None:
+            index = self._index[item] = len(self.items)
+            self.items.append(item)
+            self._parent.append(index)
+            self._size.append(1)
+        return index
+
+    def find(self, index):
+        """Representative index of the set containing index"""
+        parent = self._parent
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    def union(self, a, b):
+        """Merge the sets containing indexes a and b; returns the new root"""
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            return a
+        size = self._size
+        if size[a] < size[b]:
+            a, b = b, a
+        self._parent[b] = a
+        size[a] += size[b]
+        return a
+
+    def groups(self):
+        """Dict root index -> list of member items, in insertion order"""
+        groups = {}
+        find = self.find
+        for index, item in enumerate(self.items):
+            groups.setdefault(find(index), []).append(item)
+        return groups
+
+
+class Net:
+    """A resolved net: primary name, kind, endpoints and all declared names"""
+
+    __slots__ = ('name', 'kind', 'pins', 'names')
+
+    def __init__(self, name, kind, pins, names):
+        self.name = name
+        self.kind = kind
+        self.pins = pins
+        self.names = names
+
+    def __repr__(self):
+        return f'Net({self.name!r}, {self.kind}, {len(self.pins)} pins)'
+
+
+class Netlist:
+    """Declarative connections between (ref, pin) endpoints"""
+
+    def __init__(self):
+        self._sets = UnionFind()
+        # Declared (order, name, kind) per endpoint index
+        self._names = {}
+        # First endpoint index of each name: equal names are one net
+        self._anchors = {}
+        self._order = 0
+
+    def connect(self, name, *pins, kind='label'):
+        """
+        Put endpoints on one net
+
+        Endpoints given the same name in separate calls end up on the
+        same net, like equally named labels in KiCad.
+
+        Args:
+            name: Net name, or None to leave naming to other declarations
+            *pins: (ref, pin_number) endpoints
+            kind: 'label', 'global_label' or 'power'
+        """
+        if kind not in NET_KINDS:
+            raise ValueError(f"unknown net kind {kind!r}")
+        sets = self._sets
+        indexes = [sets.add(pin) for pin in pins]
+        if not indexes:
+            return
+        root = indexes[0]
+        for index in indexes[1:]:
+            sets.union(root, index)
+        if name is not None:
+            anchor = self._anchors.setdefault(name, root)
+            if anchor != root:
+                sets.union(anchor, root)
+            self._names.setdefault(root, []).append((self._order, name, kind))
+            self._order += 1
+
+    def pin_count(self):
+        """Number of distinct endpoints"""
+        return len(self._sets)
+
+    def nets(self):
+        """
+        Resolve the connections into nets
+
+        The first declared name of a merged net wins; the others are kept
+        in Net.names. Unnamed nets are called Net-(<ref>-Pad<pin>) after
+        their first endpoint, like KiCad does.
+
+        Returns:
+            List of Net, named nets in declaration order, then unnamed ones
+        """
+        sets = self._sets
+        declared = {}
+        for index, names in self._names.items():
+            declared.setdefault(sets.find(index), []).extend(names)
+
+        named = []
+        unnamed = []
+        for root, pins in sets.groups().items():
+            names = sorted(declared.get(root, ()))
+            if names:
+                kind = min((kind for _, _, kind in names), key=NET_KINDS.index)
+                net_names = list(dict.fromkeys(name for _, name, _ in names))
+                named.append((names[0][0], Net(net_names[0], kind, pins, net_names)))
+            else:
+                ref, pin = pins[0]
+                unnamed.append(Net(f"Net-({ref}-Pad{pin})", 'label', pins, []))
+        named.sort(key=lambda entry: entry[0])
+        return [net for _, net in named] + unnamed
+
+
+def add_input_connectors(sections, input_connector=DEFAULT_INPUT_CONNECTOR):
+    """
+    Give every section an input connector, numbered after the outputs
+
+    Args:
+        sections: List of generate_section() keyword dicts
+        input_connector: Input connector symbol name
+
+    Returns:
+        New list of section dicts with input_connector / input_ref set
+        (sections that already have an input connector are kept as is)
+    """
+    count = len(sections)
+    result = []
+    for section in sections:
+        if not section.get('input_connector'):
+            section = dict(
+                section,
+                input_connector=input_connector,
+                input_ref=f"J{section['section_num'] + count}",
+            )
+        result.append(section)
+    return result
+
+
+def _resistor_roles(resistors):
+    """Map signal aliases to (ref, signal) for 'X pullup' / 'X series' resistors"""
+    roles = {'pullup': {}, 'series': {}}
+    for ref, _, desc in resistors:
+        words = desc.split()
+        if len(words) == 2 and words[1] in roles:
+            for alias in signal_aliases(words[0]):
+                roles[words[1]].setdefault(alias, (ref, words[0]))
+    return roles
+
+
+def section_nets(sections, netlist=None):
+    """
+    Describe the nets of adapter sections
+
+    Each section maps its input connector onto its output connector by
+    signal name. A resistor described as "<signal> pullup" ties the input
+    side of that signal to the section's VTref; one described as
+    "<signal> series" sits between input and output. Net names follow
+    WIRING_GUIDE.md: S<n>_VTref, S<n>_<signal>_PU for a pulled-up input
+    node, S<n>_<signal>_IN for a bare input node in front of a series
+    resistor and S<n>_<signal> for the output side. GND is a power net.
+
+    Args:
+        sections: List of section dicts with input_connector / input_ref
+            (see add_input_connectors)
+        netlist: Netlist to add to (default: a new one)
+
+    Returns:
+        The Netlist
+    """
+    netlist = netlist if netlist is not None else Netlist()
+
+    for section in sections:
+        prefix = f"S{section['section_num']}_"
+        out_ref = f"J{section['section_num']}"
+        in_ref = section['input_ref']
+        in_table = connector_info(section['input_connector'])['pin_table']
+        out_table = connector_info(section['connector_name'])['pin_table']
+        c_ref = section['capacitor'][0]
+        vtref = prefix + 'VTref'
+
+        # Supply pins go on the section's VTref and the common GND
+        netlist.connect(vtref, (c_ref, '1'))
+        netlist.connect('GND', (c_ref, '2'), kind='power')
+        for ref, table in ((in_ref, in_table), (out_ref, out_table)):
+            for num, name, pin_type, _ in table:
+                aliases = signal_aliases(name)
+                if aliases == ('GND',):
+                    netlist.connect('GND', (ref, num), kind='power')
+                elif aliases == ('VTref',):
+                    netlist.connect(vtref, (ref, num))
+
+        roles = _resistor_roles(section['resistors'])
+        mapping = map_connectors(in_table, out_table)
+        pairs = [((a,), (b,), signal) for a, b, signal in mapping['pin_map']]
+        pairs += [(pins_a, pins_b, signal) for signal, pins_a, pins_b in mapping['shared']]
+
+        for pins_a, pins_b, signal in pairs:
+            if signal in ('GND', 'VTref'):
+                continue
+            out_aliases = signal_aliases(out_table.by_number(pins_b[0])[1])
+            aliases = signal_aliases(in_table.by_number(pins_a[0])[1]) + out_aliases
+            pullup = next((roles['pullup'][a] for a in aliases if a in roles['pullup']), None)
+            series = next((roles['series'][a] for a in aliases if a in roles['series']), None)
+            # Name after the resistor's signal (S3_SWDIO), else the output pin
+            base = prefix + ((pullup or series)[1] if pullup or series else out_aliases[0])
+
+            inputs = [(in_ref, pin) for pin in pins_a]
+            outputs = [(out_ref, pin) for pin in pins_b]
+            if pullup:
+                netlist.connect(vtref, (pullup[0], '1'))
+                inputs.append((pullup[0], '2'))
+            if series:
+                input_name = base + ('_PU' if pullup else '_IN')
+                netlist.connect(input_name, *inputs, (series[0], '1'))
+                netlist.connect(base, (series[0], '2'), *outputs)
+            else:
+                netlist.connect(base + '_PU' if pullup else base, *inputs, *outputs)
+
+    return netlist
+
+
+def pin_positions(parts):
+    """
+    Absolute connection points of every pin of placed parts
+
+    Args:
+        parts: create_component() argument tuples
+            (ref, value, lib_id, x, y, footprint, properties), x/y in
+            conceptual units
+
+    Returns:
+        Dict (ref, pin_number) -> (x_nm, y_nm, pin_angle, stub_nm,
+        pin_type), in integer nanometres (see coords.py)
+    """
+    positions = {}
+    layouts = {}
+    stub = to_nm(STUB_LENGTH)
+    for ref, _, lib_id, x, y, *_ in parts:
+        # The symbol sits where create_component() prints it; pin offsets
+        # are exact, so points land exactly on pins
+        x = printed(conceptual_to_nm(x))
+        y = printed(conceptual_to_nm(y))
+        if lib_id in ('R', 'C'):
+            for num, (px, py, angle) in PASSIVE_PIN_LAYOUT.items():
+                positions[ref, num] = (x + to_nm(px), y - to_nm(py), angle, 0, 'passive')
+            continue
+        table = connector_info(lib_id)['pin_table']
+        if lib_id not in layouts:
+            layouts[lib_id] = connector_pin_layout(table)
+        for (num, _, pin_type, _), (px, py, angle) in zip(table, layouts[lib_id]):
+            positions[ref, num] = (x + to_nm(px), y - to_nm(py), angle, stub, pin_type)
+    return positions
+
+
+def _net_ends(netlist, positions):
+    """
+    Pins that get a label or power symbol, with the end of their stub
+
+    Yields:
+        (net, pin, pin_xy, end_xy, angle) in nanometres; end_xy is
+        pin_xy for pins without a stub
+    """
+    for net in netlist.nets():
+        if len(net.pins) < 2 and not net.names:
+            continue
+        for pin in net.pins:
+            position = positions.get(pin)
+            if position is None:
+                raise KeyError(f"net {net.name}: {pin[0]} pin {pin[1]} is not placed")
+            x, y, angle, stub, _ = position
+            end = (x, y)
+            if stub:
+                dx, dy = _OUTWARD[angle]
+                end = (x + dx * stub, y + dy * stub)
+            yield net, pin, (x, y), end, angle
+
+
+def power_ports(netlist, parts, first_power=1):
+    """
+    The power symbol instances wire_netlist() places
+
+    Args:
+        netlist: Netlist to draw
+        parts: Placed parts, see pin_positions()
+        first_power: Number of the first power symbol reference (#PWR01)
+
+    Returns:
+        List of (ref, net name, x_mm, y_mm)
+    """
+    ends = _net_ends(netlist, pin_positions(parts))
+    ports = [(net.name, end) for net, _, _, end, _ in ends if net.kind == 'power']
+    return [(f"#PWR{number:02d}", name, to_mm(x), to_mm(y))
+            for number, (name, (x, y)) in enumerate(ports, first_power)]
+
+
+def wire_netlist(netlist, parts, sheet_path="/", first_power=1):
+    """
+    Generate the wires, labels, power symbols and no-connect flags of a netlist
+
+    Args:
+        netlist: Netlist to draw
+        parts: Placed parts, see pin_positions()
+        sheet_path: Hierarchical sheet path of the items (default "/")
+        first_power: Number of the first power symbol reference (#PWR01)
+
+    Yields:
+        S-expression strings
+    """
+    positions = pin_positions(parts)
+    connected = set()
+    power_index = first_power - 1
+
+    for net, pin, (x, y), (end_x, end_y), angle in _net_ends(netlist, positions):
+        connected.add(pin)
+        x, y, end_x, end_y = to_mm(x), to_mm(y), to_mm(end_x), to_mm(end_y)
+        if (end_x, end_y) != (x, y):
+            yield create_wire(x, y, end_x, end_y, sheet_path)
+        if net.kind == 'power':
+            power_index += 1
+            yield create_power_port(f"#PWR{power_index:02d}", net.name, end_x, end_y,
+                                    sheet_path)
+        else:
+            yield create_net_label(net.name, end_x, end_y, _LABEL_ANGLE[angle], net.kind,
+                                   sheet_path)
+
+    for pin, (x, y, _, stub, pin_type) in positions.items():
+        if stub and pin not in connected and pin_type != 'no_connect':
+            yield create_no_connect(to_mm(x), to_mm(y), sheet_path)
+
+
+def power_nets(netlist):
+    """Names of the power nets of a netlist, in order (power symbols to embed)"""
+    return [net.name for net in netlist.nets() if net.kind == 'power']
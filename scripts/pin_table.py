@@ -0,0 +1,159 @@
+"""
+Compact, indexed connector pin table
+
+PinTable stores a connector's pins column-wise instead of as a list of
+4-tuples: numbers and names are interned strings, electrical types and
+sides are one-byte codes in arrays. Indexes by pin number, by name
+(multi-valued, GND usually appears many times) and by side are built
+once, so lookups and symbol layout never rescan the pin list.
+
+A PinTable still iterates, indexes and measures like the original list of
+(pin_num, pin_name, pin_type, side) tuples, so existing callers keep
+working:
+
+    table = PinTable(ARM_20PIN_PINS)
+    table.by_number('7')        # ('7', 'TMS', 'input', 'left')
+    table.by_name('GND')        # all GND rows
+    table.on_side('right')      # rows on the right side
+"""
+
+import sys
+from array import array
+
+
+ELECTRICAL_TYPES = (
+    'power_in', 'power_out', 'input', 'output', 'bidirectional', 'tri_state',
+    'passive', 'open_collector', 'open_emitter', 'unspecified', 'free', 'no_connect',
+)
+SIDES = ('left', 'right')
+
+TYPE_CODES = {name: code for code, name in enumerate(ELECTRICAL_TYPES)}
+SIDE_CODES = {name: code for code, name in enumerate(SIDES)}
+
+
+class PinTable:
+    """Column-oriented pin list with lookups by number, name and side"""
+
+    __slots__ = ('numbers', 'names', 'type_codes', 'side_codes',
+                 '_by_number', '_by_name', '_by_side')
+
+    def __init__(self, pins):
+        """
+        Args:
+            pins: Iterable of (pin_num, pin_name, pin_type, side) tuples
+
+        Raises:
+            ValueError: On an unknown electrical type or side, or a
+                duplicate pin number
+        """
+        numbers = []
+        names = []
+        type_codes = array('B')
+        side_codes = array('B')
+        by_number = {}
+        by_name = {}
+        by_side = tuple(array('H') for _ in SIDES)
+
+        for index, (num, name, pin_type, side) in enumerate(pins):
+            try:
+                type_code = TYPE_CODES[pin_type]
+            except KeyError:
+                raise ValueError(f"pin {num}: unknown electrical type {pin_type!r}")
+            try:
+                side_code = SIDE_CODES[side]
+            except KeyError:
+                raise ValueError(f"pin {num}: unknown side {side!r}")
+            if num in by_number:
+                raise ValueError(f"duplicate pin number {num!r}")
+
+            num = sys.intern(num)
+            name = sys.intern(name)
+            numbers.append(num)
+            names.append(name)
+            type_codes.append(type_code)
+            side_codes.append(side_code)
+            by_number[num] = index
+            by_name.setdefault(name, []).append(index)
+            by_side[side_code].append(index)
+
+        self.numbers = tuple(numbers)
+        self.names = tuple(names)
+        self.type_codes = type_codes
+        self.side_codes = side_codes
+        self._by_number = by_number
+        self._by_name = {name: tuple(rows) for name, rows in by_name.items()}
+        self._by_side = by_side
+
+    @classmethod
+    def of(cls, pins):
+        """Return pins as a PinTable, converting a tuple list if needed"""
+        return pins if isinstance(pins, cls) else cls(pins)
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return (
+            self.numbers[index],
+            self.names[index],
+            ELECTRICAL_TYPES[self.type_codes[index]],
+            SIDES[self.side_codes[index]],
+        )
+
+    def __iter__(self):
+        types = ELECTRICAL_TYPES
+        sides = SIDES
+        for num, name, type_code, side_code in zip(
+                self.numbers, self.names, self.type_codes, self.side_codes):
+            yield num, name, types[type_code], sides[side_code]
+
+    def __eq__(self, other):
+        if isinstance(other, PinTable):
+            return (self.numbers == other.numbers and self.names == other.names
+                    and self.type_codes == other.type_codes
+                    and self.side_codes == other.side_codes)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'PinTable({len(self)} pins)'
+
+    def pin_type(self, index):
+        """Electrical type of the pin at index"""
+        return ELECTRICAL_TYPES[self.type_codes[index]]
+
+    def side(self, index):
+        """Side ('left'/'right') of the pin at index"""
+        return SIDES[self.side_codes[index]]
+
+    def index_of(self, num):
+        """Row index of pin number num, or None"""
+        return self._by_number.get(num)
+
+    def by_number(self, num):
+        """Row tuple of pin number num, or None"""
+        index = self._by_number.get(num)
+        return None if index is None else self[index]
+
+    def indexes_named(self, name):
+        """Row indexes of all pins called name (empty tuple if none)"""
+        return self._by_name.get(name, ())
+
+    def by_name(self, name):
+        """Row tuples of all pins called name"""
+        return [self[i] for i in self._by_name.get(name, ())]
+
+    def indexes_on(self, side):
+        """Row indexes of the pins on side ('left'/'right')"""
+        return self._by_side[SIDE_CODES[side]]
+
+    def on_side(self, side):
+        """Row tuples of the pins on side ('left'/'right')"""
+        return [self[i] for i in self._by_side[SIDE_CODES[side]]]
+
+    def signal_names(self):
+        """Distinct pin names, in first-seen order"""
+        return list(self._by_name)
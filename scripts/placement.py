@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Automatic, overlap-free placement of sections on the schematic sheet
+
+section_parts() places parts at fixed offsets that only suit the three
+default sections. place_sections() lays sections out from the symbols'
+bounding boxes instead (symbol_gen.symbol_bounds):
+
+- inside a section the connectors stack in one column, and the passives
+  fill as many rows to their right as fit beside the connectors
+- whole sections are then packed onto the sheet in order with a shelf
+  algorithm: left to right along a shelf, a new shelf below once a
+  section no longer fits, earlier shelves first if it is low enough
+
+Boxes already on the sheet (title block, footer note) and every placed
+section go into a SpatialHash, a uniform grid of cells. An overlap query
+only looks at the boxes in the cells it touches, so placing n sections
+stays close to linear.
+
+Boxes leave room for the wire stubs and net labels of --wire beside
+connector pins and above/below passive pins. Instance Reference/Value
+fields keep the offsets of create_component().
+
+All geometry here is in schematic mm (y down) on the 1.27mm grid; the
+placed section dicts carry conceptual units like the rest of
+generate_schematic.py (see kicad_utils.mm_to_mils). Grid snapping and
+packing are done in integer nanometres with coords.py, the same grid
+the emitters and the wiring (netlist.pin_positions) use.
+
+Usage:
+    python3 placement.py [--sections N] [--sheet A3]
+
+Reports the overlaps of the fixed layout and of the automatic one.
+"""
+
+import argparse
+import math
+import os
+import sys
+from functools import lru_cache
+
+# Add scripts directory to path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+from connector_data import connector_info
+from coords import GRID_50MIL, conceptual_to_nm, snap_up, to_conceptual, to_mm, to_nm
+from stroke_font import text_width
+from symbol_gen import symbol_bounds
+
+
+# Paper sizes (width, height) in mm
+SHEET_SIZES = {
+    'A4': (297.0, 210.0),
+    'A3': (420.0, 297.0),
+    'A2': (594.0, 420.0),
+    'A1': (841.0, 594.0),
+}
+DEFAULT_SHEET = 'A3'
+
+# Drawing border and KiCad's title block in the bottom right corner
+SHEET_MARGIN = 12.7
+TITLE_BLOCK = (111.76, 35.56)
+
+GRID = 1.27
+PART_GAP = 2.54
+SECTION_GAP = 7.62
+# Room for a wire stub and net label beside a pin (see netlist.py)
+LABEL_ROOM = 15.24
+# Section titles (see generate_section)
+TITLE_SIZE = 2.5
+
+CELL_SIZE = 50.8
+
+_PASSIVES = ('R', 'C')
+
+
+class PlacementError(ValueError):
+    """Sections do not fit on the sheet"""
+
+
+def overlaps(a, b):
+    """True if boxes (x0, y0, x1, y1) overlap; touching edges do not count"""
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+class SpatialHash:
+    """Boxes bucketed in a uniform grid of square cells, for overlap queries"""
+
+    __slots__ = ('cell', 'boxes', '_cells')
+
+    def __init__(self, cell=CELL_SIZE):
+        """
+        Args:
+            cell: Cell edge in mm; about the size of a typical box
+        """
+        self.cell = cell
+        self.boxes = []
+        self._cells = {}
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def _keys(self, box):
+        cell = self.cell
+        x0, y0, x1, y1 = box
+        for cx in range(math.floor(x0 / cell), math.floor(x1 / cell) + 1):
+            for cy in range(math.floor(y0 / cell), math.floor(y1 / cell) + 1):
+                yield cx, cy
+
+    def insert(self, box):
+        """Add a box (x0, y0, x1, y1); returns its index"""
+        index = len(self.boxes)
+        self.boxes.append(box)
+        cells = self._cells
+        for key in self._keys(box):
+            cells.setdefault(key, []).append(index)
+        return index
+
+    def query(self, box):
+        """Indexes of the stored boxes overlapping box, in insertion order"""
+        boxes = self.boxes
+        cells = self._cells
+        found = set()
+        for key in self._keys(box):
+            for index in cells.get(key, ()):
+                if index not in found and overlaps(box, boxes[index]):
+                    found.add(index)
+        return sorted(found)
+
+
+def find_overlaps(boxes, cell=CELL_SIZE):
+    """
+    Find all overlapping pairs among boxes
+
+    Args:
+        boxes: List of (x0, y0, x1, y1)
+        cell: SpatialHash cell size
+
+    Returns:
+        List of (i, j) index pairs, i < j
+    """
+    index = SpatialHash(cell)
+    pairs = []
+    for j, box in enumerate(boxes):
+        pairs.extend((i, j) for i in index.query(box))
+        index.insert(box)
+    return pairs
+
+
+def snap(value):
+    """Round value (mm) up to the placement grid"""
+    return to_mm(snap_up(to_nm(value), GRID_50MIL))
+
+
+def text_box(text, x, y, size):
+    """Box of a left-justified text label at (x, y) mm, see create_text_label()"""
+    return (x, y - size / 2, x + text_width(text, size), y + size / 2)
+
+
+@lru_cache(maxsize=None)
+def part_box(lib_id):
+    """
+    Box of a part around its origin, with room for wiring
+
+    Args:
+        lib_id: "R", "C" or a connector symbol name
+
+    Returns:
+        (x0, y0, x1, y1) in schematic mm (y down) relative to the origin
+    """
+    if lib_id in _PASSIVES:
+        x0, y0, x1, y1 = symbol_bounds(lib_id)
+        return (x0, -y1 - LABEL_ROOM, x1, -y0 + LABEL_ROOM)
+    x0, y0, x1, y1 = symbol_bounds(lib_id, connector_info(lib_id)['pin_table'])
+    return (x0 - LABEL_ROOM, -y1, x1 + LABEL_ROOM, -y0)
+
+
+def layout_section(parts, title):
+    """
+    Arrange the parts of one section relative to its top left corner
+
+    Args:
+        parts: create_component() argument tuples of the section
+        title: Section title text
+
+    Returns:
+        (positions, width, height): positions maps ref -> (x, y) mm
+        and '' -> the title position
+    """
+    positions = {'': (0.0, TITLE_SIZE / 2)}
+    top = snap(TITLE_SIZE + PART_GAP)
+    connectors = [part for part in parts if part[2] not in _PASSIVES]
+    passives = [part for part in parts if part[2] in _PASSIVES]
+
+    # Connectors: one column, origins aligned
+    right = text_width(title, TITLE_SIZE)
+    bottom = top
+    column_right = 0.0
+    if connectors:
+        boxes = [part_box(part[2]) for part in connectors]
+        x = snap(max(-box[0] for box in boxes))
+        y = top
+        for part, box in zip(connectors, boxes):
+            oy = snap(y - box[1])
+            positions[part[0]] = (x, oy)
+            y = oy + box[3] + PART_GAP
+            column_right = max(column_right, x + box[2])
+        bottom = y - PART_GAP
+        right = max(right, column_right)
+
+    # Passives: rows to the right of the connectors, no taller than them
+    left = column_right + PART_GAP if connectors else 0.0
+    per_row = len(passives)
+    if passives:
+        row_height = max(part_box(part[2])[3] - part_box(part[2])[1] for part in passives)
+        rows = max(1, int((bottom - top + PART_GAP) // (row_height + GRID + PART_GAP)))
+        per_row = math.ceil(len(passives) / rows)
+    x, row_top, row_bottom = left, top, top
+    for i, part in enumerate(passives):
+        box = part_box(part[2])
+        if i and i % per_row == 0:
+            x, row_top = left, row_bottom + PART_GAP
+        ox, oy = snap(x - box[0]), snap(row_top - box[1])
+        positions[part[0]] = (ox, oy)
+        x = ox + box[2] + PART_GAP
+        row_bottom = max(row_bottom, oy + box[3])
+        right = max(right, ox + box[2])
+        bottom = max(bottom, row_bottom)
+
+    return positions, right, bottom
+
+
+def sheet_obstacles(sheet=DEFAULT_SHEET):
+    """Boxes of a sheet that sections must avoid: the title block"""
+    width, height = SHEET_SIZES[sheet]
+    block_w, block_h = TITLE_BLOCK
+    return [(width - SHEET_MARGIN - block_w, height - SHEET_MARGIN - block_h,
+             width - SHEET_MARGIN, height - SHEET_MARGIN)]
+
+
+def pack(sizes, sheet=DEFAULT_SHEET, obstacles=()):
+    """
+    Shelf-pack rectangles onto a sheet, in order
+
+    Each rectangle goes on the first shelf that is tall enough and has
+    room left, skipping past obstacles; otherwise it opens a new shelf
+    below the last one.
+
+    Args:
+        sizes: List of (width, height) in mm
+        sheet: SHEET_SIZES key
+        obstacles: Extra boxes to keep clear of (sheet_obstacles() are added)
+
+    Returns:
+        List of (x, y) top left corners in mm, on the placement grid
+
+    Raises:
+        PlacementError: If a rectangle does not fit
+    """
+    # Packing runs in integer nanometres, so a box exactly one gap away
+    # from another is exactly clear of it (overlaps() is strict)
+    gap = to_nm(SECTION_GAP)
+    width, height = SHEET_SIZES[sheet]
+    left = top = to_nm(SHEET_MARGIN)
+    right, bottom = to_nm(width - SHEET_MARGIN), to_nm(height - SHEET_MARGIN)
+    index = SpatialHash(to_nm(CELL_SIZE))
+    for box in (*sheet_obstacles(sheet), *obstacles):
+        index.insert(tuple(to_nm(value) for value in box))
+
+    def fit(x, y, w, h):
+        # Slide right past whatever is in the way (with a gap around it)
+        while x + w <= right:
+            hits = index.query((x - gap, y - gap, x + w + gap, y + h + gap))
+            if not hits:
+                return x
+            x = snap_up(max(index.boxes[i][2] for i in hits) + gap)
+        return None
+
+    shelves = []  # [y, height]
+    corners = []
+    for n, (w_mm, h_mm) in enumerate(sizes):
+        w, h = to_nm(w_mm), to_nm(h_mm)
+        corner = None
+        for shelf_y, shelf_h in shelves:
+            if h <= shelf_h:
+                x = fit(left, shelf_y, w, h)
+                if x is not None:
+                    corner = (x, shelf_y)
+                    break
+        while corner is None:
+            y = snap_up(shelves[-1][0] + shelves[-1][1] + gap) if shelves else top
+            if y + h > bottom:
+                raise PlacementError(
+                    f"section {n + 1} ({w_mm:.0f} x {h_mm:.0f} mm) does not fit on the "
+                    f"{sheet} sheet after {n} sections"
+                )
+            shelves.append([y, h])
+            x = fit(left, y, w, h)
+            if x is not None:
+                corner = (x, y)
+        index.insert((corner[0], corner[1], corner[0] + w, corner[1] + h))
+        corners.append((to_mm(corner[0]), to_mm(corner[1])))
+    return corners
+
+
+def place_sections(sections, section_parts, sheet=DEFAULT_SHEET, obstacles=()):
+    """
+    Place sections automatically
+
+    Args:
+        sections: generate_section() keyword dicts, with titles
+        section_parts: Function giving a section's part tuples
+            (generate_schematic.section_parts)
+        sheet: SHEET_SIZES key
+        obstacles: Boxes (mm) to keep clear of, e.g. the footer note
+
+    Returns:
+        Copies of the section dicts with 'positions' (ref -> (x, y)) and
+        'title_at', in conceptual units
+
+    Raises:
+        PlacementError: If the sections do not fit on the sheet
+    """
+    layouts = []
+    for section in sections:
+        title = section.get('title') or f"Section {section['section_num']}"
+        layouts.append(layout_section(section_parts(**section), title))
+
+    corners = pack([(w, h) for _, w, h in layouts], sheet, obstacles)
+
+    placed = []
+    for section, (positions, _, _), (x0, y0) in zip(sections, layouts, corners):
+        x0, y0 = to_nm(x0), to_nm(y0)
+        absolute = {
+            ref: (to_conceptual(x0 + to_nm(x)), to_conceptual(y0 + to_nm(y)))
+            for ref, (x, y) in positions.items()
+        }
+        title_at = absolute.pop('')
+        placed.append(dict(section, positions=absolute, title_at=title_at))
+    return placed
+
+
+def layout_boxes(sections, section_parts):
+    """Absolute part boxes (mm) of placed sections, for overlap checks"""
+    boxes = []
+    for section in sections:
+        for ref, _, lib_id, x, y, *_ in section_parts(**section):
+            x0, y0, x1, y1 = part_box(lib_id)
+            x, y = to_mm(conceptual_to_nm(x)), to_mm(conceptual_to_nm(y))
+            boxes.append((x + x0, y + y0, x + x1, y + y1))
+    return boxes
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Place sections on the schematic sheet")
+    parser.add_argument('--sections', type=int, default=None,
+                        help='use this many synthetic sections (default: the default design)')
+    parser.add_argument('--sheet', choices=sorted(SHEET_SIZES), default=DEFAULT_SHEET,
+                        help='paper size (default: %(default)s)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main entry point"""
+    args = parse_args(argv)
+    from generate_schematic import DEFAULT_SECTIONS, add_input_connectors, section_parts
+
+    if args.sections:
+        from benchmark import COMPONENTS_PER_SECTION, synthetic_sections
+        sections = synthetic_sections(args.sections * COMPONENTS_PER_SECTION)
+    else:
+        sections = DEFAULT_SECTIONS
+    sections = add_input_connectors(sections)
+
+    fixed = find_overlaps(layout_boxes(sections, section_parts))
+    print(f"Fixed layout: {len(fixed)} overlapping part pairs")
+    try:
+        placed = place_sections(sections, section_parts, args.sheet)
+    except PlacementError as e:
+        print(f"✗ {e}")
+        return 1
+    auto = find_overlaps(layout_boxes(placed, section_parts))
+    mark = '✓' if not auto else '✗'
+    print(f"{mark} Automatic layout: {len(auto)} overlapping part pairs, "
+          f"{len(placed)} sections on {args.sheet}")
+    return 1 if auto else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
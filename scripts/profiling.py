@@ -0,0 +1,214 @@
+"""
+Per-stage timing instrumentation for the generators
+
+Stages are marked with the timed() decorator or the stage() context
+manager. While no profiler is enabled both are close to free: timed()
+calls straight through, and generator functions are not wrapped at all.
+Once enable() has been called each stage records:
+
+- seconds: wall time spent inside the stage (for generators, inside
+  their next() calls only, so consumers' time is not counted)
+- calls: number of invocations
+- items / bytes: pieces yielded and characters emitted (generators)
+- alloc_blocks: net change in allocated memory blocks
+
+Stage times are inclusive: a stage that calls another includes its time.
+
+Command line scripts use add_profile_arguments() and profile_session():
+
+    python3 generate_schematic.py --profile stages.json --cprofile run.prof
+"""
+
+import cProfile
+import inspect
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+
+class Profiler:
+    """Collects per-stage wall time, call counts, bytes and allocations"""
+
+    def __init__(self, trace_memory=False):
+        """
+        Args:
+            trace_memory: Also track the peak traced memory with tracemalloc
+        """
+        self.stages = {}
+        self.trace_memory = trace_memory
+        self.started = time.perf_counter()
+
+    def _record(self, name):
+        record = self.stages.get(name)
+        if record is None:
+            record = self.stages[name] = {
+                'seconds': 0.0, 'calls': 0, 'items': 0, 'bytes': 0, 'alloc_blocks': 0,
+            }
+        return record
+
+    @contextmanager
+    def stage(self, name, nbytes=0):
+        """Time a block of code as one call of stage name"""
+        record = self._record(name)
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] += time.perf_counter() - start
+            record['alloc_blocks'] += sys.getallocatedblocks() - blocks
+            record['calls'] += 1
+            record['bytes'] += nbytes
+
+    def iterate(self, name, iterable):
+        """Yield from iterable, timing each step and counting emitted characters"""
+        record = self._record(name)
+        record['calls'] += 1
+        iterator = iter(iterable)
+        perf_counter = time.perf_counter
+        allocated = sys.getallocatedblocks
+        while True:
+            blocks = allocated()
+            start = perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                record['seconds'] += perf_counter() - start
+                record['alloc_blocks'] += allocated() - blocks
+                return
+            record['seconds'] += perf_counter() - start
+            record['alloc_blocks'] += allocated() - blocks
+            record['items'] += 1
+            if isinstance(item, str):
+                record['bytes'] += len(item)
+            yield item
+
+    def report(self):
+        """
+        Summarize the collected stages
+
+        Returns:
+            Dict with total wall time, per-stage records and (when
+            tracing memory) the peak traced memory
+        """
+        result = {
+            'total_seconds': time.perf_counter() - self.started,
+            'stages': self.stages,
+        }
+        if self.trace_memory and tracemalloc.is_tracing():
+            result['peak_kib'] = tracemalloc.get_traced_memory()[1] / 1024
+        return result
+
+
+_profiler = None
+
+
+def enable(trace_memory=False):
+    """
+    Start collecting stage statistics
+
+    Args:
+        trace_memory: Also track the peak traced memory with tracemalloc
+
+    Returns:
+        The active Profiler
+    """
+    global _profiler
+    _profiler = Profiler(trace_memory)
+    if trace_memory:
+        tracemalloc.start()
+    return _profiler
+
+
+def disable():
+    """Stop collecting; returns the Profiler that was active, if any"""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is not None and profiler.trace_memory:
+        tracemalloc.stop()
+    return profiler
+
+
+def get_profiler():
+    """Return the active Profiler, or None"""
+    return _profiler
+
+
+def stage(name, nbytes=0):
+    """Context manager timing a block as stage name (no-op when disabled)"""
+    if _profiler is None:
+        return nullcontext()
+    return _profiler.stage(name, nbytes)
+
+
+def timed(name):
+    """
+    Decorator recording every call of a function as stage name
+
+    Generator functions are timed per next() call and their yielded
+    characters are counted; plain functions count the length of a
+    returned string as bytes.
+    """
+    def decorator(func):
+        if inspect.isgeneratorfunction(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if _profiler is None:
+                    return func(*args, **kwargs)
+                return _profiler.iterate(name, func(*args, **kwargs))
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if _profiler is None:
+                    return func(*args, **kwargs)
+                with _profiler.stage(name) as record:
+                    result = func(*args, **kwargs)
+                if isinstance(result, str):
+                    record['bytes'] += len(result)
+                return result
+        return wrapper
+    return decorator
+
+
+def add_profile_arguments(parser):
+    """Add --profile / --profile-memory / --cprofile to an argparse parser"""
+    parser.add_argument(
+        '--profile', metavar='JSON',
+        help='write per-stage wall time, calls, bytes and allocations as JSON',
+    )
+    parser.add_argument(
+        '--profile-memory', action='store_true',
+        help='with --profile, also record peak memory via tracemalloc (slower)',
+    )
+    parser.add_argument(
+        '--cprofile', metavar='PATH',
+        help='dump cProfile statistics (view with python -m pstats PATH)',
+    )
+
+
+@contextmanager
+def profile_session(args):
+    """
+    Run the enclosed block under the profilers requested on the command line
+
+    Args:
+        args: argparse namespace from a parser set up by add_profile_arguments()
+    """
+    profiler = enable(args.profile_memory) if args.profile else None
+    cprof = cProfile.Profile() if args.cprofile else None
+    if cprof is not None:
+        cprof.enable()
+    try:
+        yield profiler
+    finally:
+        if cprof is not None:
+            cprof.disable()
+            cprof.dump_stats(args.cprofile)
+        if profiler is not None:
+            report = profiler.report()
+            disable()
+            with open(args.profile, 'w') as f:
+                json.dump(report, f, indent=2)
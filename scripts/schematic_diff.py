@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+"""
+Structural diff of two schematics or symbol libraries
+
+A text diff of a regenerated adapterama.kicad_sch is mostly random UUIDs
+and the date line. This diff compares trees instead, hashed bottom-up
+(Merkle hashes) with the volatile fields left out: (uuid ...),
+(date ...), (tstamp ...) and the sheet UUIDs of instance paths,
+(path "/<uuid>/<uuid>" ...), of which only the depth is kept. Only
+subtrees whose hashes differ are compared further.
+
+The top level is hashed from the file text: both files are split at
+their top-level items (the generators and KiCad start every one on a
+line of its own, "\n\t("), volatile fields are removed and every item
+is hashed. Items with a matching hash on the other side are dropped
+without being parsed; only the rest goes through sexpr.py and the tree
+diff. Diffing two large designs therefore costs a hashing pass plus time
+proportional to the change.
+
+Changes are reported per object:
+
+    R12 value 33→47
+    R12 moved (40.9449, 24.8031)→(40.9449, 27.5591)
+    R12 rotated 0→90
+    R12 Reference field changed
+    J3 added (Cortex_Debug_10pin_1.27mm, Cortex_Output)
+    TI_CTI_20pin_1.27mm pin 18 renamed EMU0→EMU1
+    TI_CTI_20pin_1.27mm pin 18 type input→bidirectional
+    3 wires added, 1 removed
+
+Instances are matched by reference, library symbols by name, pins by
+number; wires, labels and other unnamed items are compared as multisets.
+Works on .kicad_sch and .kicad_sym files.
+
+Usage:
+    python3 schematic_diff.py OLD NEW
+
+Exits with status 1 if the files differ, like diff.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+from collections import Counter
+
+# Add scripts directory to path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sexpr import Node, ParseError, String, parse
+
+
+# Tags whose content changes on every regeneration
+VOLATILE = frozenset({'uuid', 'date', 'tstamp'})
+# The same fields in file text
+_VOLATILE_TEXT = re.compile(rb'\((?:uuid|tstamp) [0-9a-fA-F-]+\)|\(date "[^"\\]*"\)')
+# Instance paths, (path "/<sheet uuid>/..." ...); only their depth is kept
+VOLATILE_PATH = 'path'
+_PATH_TEXT = re.compile(rb'(?<=\(path ")[/0-9a-fA-F-]+')
+# Start of a top-level item
+_TOP_LEVEL = b'\n\t('
+
+# Property names reported in lower case
+_PROPERTY_LABELS = {'Value': 'value', 'Footprint': 'footprint', 'Datasheet': 'datasheet'}
+
+# Difference of relative field positions still counted as unchanged (mm)
+_LAYOUT_TOLERANCE = 0.00015
+
+# Top-level tags with their own reporting; others are compared as multisets
+_NAMED = frozenset({'lib_symbols', 'symbol'})
+
+
+def subtree_hash(node, cache):
+    """
+    Merkle hash of a Node, ignoring VOLATILE children
+
+    Args:
+        node: sexpr.Node
+        cache: Dict id(node) -> digest, filled for node and its subtrees
+
+    Returns:
+        16-byte digest
+    """
+    digest = cache.get(id(node))
+    if digest is not None:
+        return digest
+    h = hashlib.blake2b(node.tag.encode('utf-8'), digest_size=16)
+    for item in node.items:
+        if isinstance(item, Node):
+            if item.tag not in VOLATILE:
+                h.update(b'(' + subtree_hash(item, cache))
+        else:
+            prefix = b'"' if isinstance(item, String) else b' '
+            if node.tag == VOLATILE_PATH:
+                item = _path_depth(item)
+            h.update(prefix + item.encode('utf-8') + b'\0')
+    digest = cache[id(node)] = h.digest()
+    return digest
+
+
+def _path_depth(path):
+    """Instance path with its sheet UUIDs left out, e.g. "//" """
+    return '/' * path.count('/')
+
+
+def _keyed(nodes, key):
+    """Dict key -> node; repeated keys get #2, #3... appended"""
+    result = {}
+    for node in nodes:
+        name = key(node)
+        unique, count = name, 1
+        while unique in result:
+            count += 1
+            unique = f"{name}#{count}"
+        result[unique] = node
+    return result
+
+
+def _at(node):
+    at = node.find('at')
+    return tuple(at.atoms[:2]) if at is not None else ()
+
+
+def _point(at):
+    return f"({', '.join(at)})" if at else "(?)"
+
+
+def _pins(symbol):
+    """Pins of a library symbol (all units), keyed by number"""
+    pins = []
+    for unit in symbol.find_all('symbol'):
+        pins.extend(unit.find_all('pin'))
+    pins.extend(symbol.find_all('pin'))
+    return _keyed(pins, lambda pin: (pin.find('number') or Node('number', ['?'])).name)
+
+
+def _pin_name(pin):
+    name = pin.find('name')
+    return name.name if name is not None else '?'
+
+
+def _properties(node):
+    return {item.items[0]: item.items[1] for item in node.find_all('property')
+            if len(item.items) > 1}
+
+
+def _diff_properties(label, old, new, skip=()):
+    changes = []
+    old_props, new_props = _properties(old), _properties(new)
+    for key in old_props.keys() | new_props.keys():
+        if key in skip or old_props.get(key) == new_props.get(key):
+            continue
+        name = _PROPERTY_LABELS.get(key, key)
+        if key not in new_props:
+            changes.append(f"{label} {name} removed")
+        elif key not in old_props:
+            changes.append(f"{label} {name} added: {new_props[key]}")
+        else:
+            changes.append(f"{label} {name} {old_props[key]}→{new_props[key]}")
+    return sorted(changes)
+
+
+def diff_lib_symbol(name, old, new, cache):
+    """Changes between two versions of a library symbol"""
+    changes = _diff_properties(name, old, new)
+    old_pins, new_pins = _pins(old), _pins(new)
+    for number in sorted(old_pins.keys() | new_pins.keys(), key=_natural):
+        a, b = old_pins.get(number), new_pins.get(number)
+        if a is None:
+            changes.append(f"{name} pin {number} added ({_pin_name(b)})")
+        elif b is None:
+            changes.append(f"{name} pin {number} removed ({_pin_name(a)})")
+        elif subtree_hash(a, cache) != subtree_hash(b, cache):
+            changes += diff_pin(f"{name} pin {number}", a, b)
+
+    # Units hold the graphics; the fields next to them are named
+    changes += _diff_fields(name, old, new, cache, skip=('pin', 'symbol'))
+    strip = {'property', 'pin'}
+    old_body = [subtree_hash(item, cache)
+                for unit in old.find_all('symbol') for item in _graphics(unit, strip)]
+    new_body = [subtree_hash(item, cache)
+                for unit in new.find_all('symbol') for item in _graphics(unit, strip)]
+    if old_body != new_body:
+        changes.append(f"{name} graphics changed")
+    return changes or [f"{name} fields reordered"]
+
+
+def diff_pin(label, old, new):
+    """Changes between two versions of a pin"""
+    changes = []
+    if _pin_name(old) != _pin_name(new):
+        changes.append(f"{label} renamed {_pin_name(old)}→{_pin_name(new)}")
+    if old.atoms[:1] != new.atoms[:1]:
+        changes.append(f"{label} type {old.atoms[0]}→{new.atoms[0]}")
+    if _at(old) != _at(new):
+        changes.append(f"{label} moved {_point(_at(old))}→{_point(_at(new))}")
+    if changes:
+        return changes
+    return [f"{label} style changed"]
+
+
+def _graphics(symbol, strip):
+    items = []
+    for item in symbol.children:
+        if item.tag == 'symbol':
+            items.extend(_graphics(item, strip))
+        elif item.tag not in strip and item.tag not in VOLATILE:
+            items.append(item)
+    return items
+
+
+def _natural(text):
+    return (0, int(text), '') if text.isdigit() else (1, 0, text)
+
+
+def diff_instance(ref, old, new, cache):
+    """Changes between two versions of a placed symbol"""
+    changes = []
+    old_lib, new_lib = old.find('lib_id'), new.find('lib_id')
+    if old_lib != new_lib:
+        changes.append(f"{ref} symbol {old_lib.name if old_lib else '?'}→"
+                       f"{new_lib.name if new_lib else '?'}")
+    if _at(old) != _at(new):
+        changes.append(f"{ref} moved {_point(_at(old))}→{_point(_at(new))}")
+    old_angle, new_angle = _angle(old), _angle(new)
+    if old_angle != new_angle:
+        changes.append(f"{ref} rotated {old_angle}→{new_angle}")
+    changes += _diff_properties(ref, old, new, skip=('Reference',))
+    changes += _diff_fields(ref, old, new, cache, skip=('lib_id', 'at'))
+    return changes or [f"{ref} fields reordered"]
+
+
+def _angle(node):
+    at = node.find('at')
+    return at.atoms[2] if at is not None and len(at.atoms) > 2 else '0'
+
+
+def _diff_fields(label, old, new, cache, skip=()):
+    """
+    Changes of a symbol's fields, per tag
+
+    Property values are left to _diff_properties(); a property with an
+    unchanged value is reported if its placement relative to the symbol
+    or its style changed. Other children are compared per tag, as
+    "unit 1→2" when both sides have one atom-only node of that tag.
+
+    Args:
+        label: Prefix of the change descriptions
+        old: Old symbol Node
+        new: New symbol Node
+        cache: subtree_hash() cache
+        skip: Tags compared elsewhere
+    """
+    def grouped(node):
+        origin = _at(node)
+        groups = {}
+        for item in node.children:
+            if item.tag in VOLATILE or item.tag in skip:
+                continue
+            if item.tag == 'property':
+                groups[('property', item.name)] = [_field_layout(item, origin, cache)]
+            else:
+                groups.setdefault((item.tag, ''), []).append(item)
+        return groups
+
+    changes = []
+    old_groups, new_groups = grouped(old), grouped(new)
+    for tag, name in sorted(old_groups.keys() | new_groups.keys()):
+        a, b = old_groups.get((tag, name), []), new_groups.get((tag, name), [])
+        if tag == 'property':
+            # Added, removed and changed values are _diff_properties()'s
+            if a and b and a[0][0] == b[0][0] and not _same_layout(a[0], b[0]):
+                changes.append(f"{label} {_PROPERTY_LABELS.get(name, name)} field changed")
+            continue
+        if sorted(subtree_hash(n, cache) for n in a) == sorted(subtree_hash(n, cache) for n in b):
+            continue
+        if len(a) == len(b) == 1 and not a[0].children and not b[0].children:
+            changes.append(f"{label} {tag} {' '.join(a[0].atoms)}→{' '.join(b[0].atoms)}")
+        elif not a:
+            changes.append(f"{label} {tag} added")
+        elif not b:
+            changes.append(f"{label} {tag} removed")
+        else:
+            changes.append(f"{label} {tag} changed")
+
+    if old.atoms != new.atoms:
+        changes.append(f"{label} flags {' '.join(old.atoms)}→{' '.join(new.atoms)}")
+    return changes
+
+
+def _field_layout(prop, origin, cache):
+    """(value, position relative to origin, hashes of the other children) of a property"""
+    at = prop.find('at')
+    position = tuple(at.atoms) if at is not None else ()
+    if origin and len(position) >= 2:
+        try:
+            offset = [float(v) - float(o) for v, o in zip(position, origin)]
+            position = (*offset, *position[2:])
+        except ValueError:
+            pass
+    rest = [subtree_hash(item, cache) for item in prop.children
+            if item.tag != 'at' and item.tag not in VOLATILE]
+    return prop.items[1:2], position, rest
+
+
+def _same_layout(a, b):
+    """
+    Compare two _field_layout()s
+
+    Positions are written with 4 decimals, each rounded on its own, so
+    relative offsets may differ by one digit in the last place.
+    """
+    if a[2] != b[2] or len(a[1]) != len(b[1]):
+        return False
+    for u, v in zip(a[1], b[1]):
+        if isinstance(u, float) and isinstance(v, float):
+            if abs(u - v) > _LAYOUT_TOLERANCE:
+                return False
+        elif u != v:
+            return False
+    return True
+
+
+def _symbols(root):
+    """
+    (library symbols, placed symbols) of a root
+
+    Library symbols are named, (symbol "NAME" ...); placed ones start
+    with their (lib_id ...). Top-level named symbols are library symbols
+    of a .kicad_sym, or lib_symbols entries split off by diff_data().
+    """
+    library = []
+    placed = []
+    lib_symbols = root.find('lib_symbols')
+    if lib_symbols is not None:
+        library.extend(lib_symbols.find_all('symbol'))
+    for node in root.find_all('symbol'):
+        (placed if node.name is None else library).append(node)
+    return library, placed
+
+
+def _describe(node):
+    lib_id = node.find('lib_id')
+    value = node.property('Value')
+    return f"({lib_id.name if lib_id else '?'}, {value})"
+
+
+def _plural(tag, count):
+    return f"{count} {tag}{'s' if count != 1 else ''}"
+
+
+def diff_trees(old, new):
+    """
+    Structural differences between two parsed schematics or libraries
+
+    Args:
+        old: Root sexpr.Node of the old file
+        new: Root sexpr.Node of the new file
+
+    Returns:
+        List of change descriptions, empty if the files are equivalent
+    """
+    cache = {}
+    if subtree_hash(old, cache) == subtree_hash(new, cache):
+        return []
+    changes = []
+
+    # Library symbols, by name
+    old_libs, old_placed = _symbols(old)
+    new_libs, new_placed = _symbols(new)
+    old_by_name = _keyed(old_libs, lambda node: node.name)
+    new_by_name = _keyed(new_libs, lambda node: node.name)
+    for name in sorted(old_by_name.keys() | new_by_name.keys()):
+        a, b = old_by_name.get(name), new_by_name.get(name)
+        if a is None:
+            changes.append(f"symbol {name} added")
+        elif b is None:
+            changes.append(f"symbol {name} removed")
+        elif subtree_hash(a, cache) != subtree_hash(b, cache):
+            changes += diff_lib_symbol(name, a, b, cache)
+
+    # Placed symbols, by reference
+    if old_placed or new_placed:
+        def reference(node):
+            return node.property('Reference') or '?'
+
+        old_refs = _keyed(old_placed, reference)
+        new_refs = _keyed(new_placed, reference)
+        for ref in sorted(old_refs.keys() | new_refs.keys(), key=_ref_order):
+            a, b = old_refs.get(ref), new_refs.get(ref)
+            if a is None:
+                changes.append(f"{ref} added {_describe(b)}")
+            elif b is None:
+                changes.append(f"{ref} removed {_describe(a)}")
+            elif subtree_hash(a, cache) != subtree_hash(b, cache):
+                changes += diff_instance(ref, a, b, cache)
+
+    # Everything else: header fields and unnamed items (wires, labels...)
+    old_counts = Counter()
+    new_counts = Counter()
+    tags = {}
+    for counts, root in ((old_counts, old), (new_counts, new)):
+        for item in root.children:
+            if item.tag in _NAMED or item.tag in VOLATILE:
+                continue
+            digest = subtree_hash(item, cache)
+            counts[digest] += 1
+            tags[digest] = item
+    added = new_counts - old_counts
+    removed = old_counts - new_counts
+    summary = {}
+    for digests, index in ((added, 0), (removed, 1)):
+        for digest, count in digests.items():
+            tag = tags[digest].tag
+            summary.setdefault(tag, [0, 0])[index] += count
+    for tag, (plus, minus) in sorted(summary.items()):
+        if tag == 'title_block' or plus == minus == 1:
+            changes.append(f"{tag} changed")
+        else:
+            parts = [f"{_plural(tag, plus)} added"] if plus else []
+            if minus:
+                parts.append(f"{minus} removed" if parts else f"{_plural(tag, minus)} removed")
+            changes.append(', '.join(parts))
+    return changes
+
+
+def _ref_order(ref):
+    """Sort key: J2 before J10, power symbols last"""
+    prefix = ref.rstrip('0123456789#')
+    digits = ref[len(prefix):].split('#')[0]
+    return (ref.startswith('#'), prefix, int(digits) if digits.isdigit() else 0, ref)
+
+
+def _unmatched(chunks, digests, other_digests):
+    """Chunks whose digest is not (or less often) in other_digests"""
+    remaining = Counter(other_digests)
+    result = []
+    for chunk, digest in zip(chunks, digests):
+        if remaining[digest]:
+            remaining[digest] -= 1
+        else:
+            result.append(chunk)
+    return result
+
+
+def _normalize(data):
+    """File text with the volatile fields removed and paths reduced to their depth"""
+    data = _VOLATILE_TEXT.sub(b'', data)
+    return _PATH_TEXT.sub(lambda match: b'/' * match.group().count(b'/'), data)
+
+
+def diff_data(old, new):
+    """
+    Structural differences between two files' contents
+
+    Top-level items that are identical apart from volatile fields are
+    dropped by hash; the rest is parsed and compared with diff_trees().
+
+    Args:
+        old: Old file contents (bytes)
+        new: New file contents (bytes)
+
+    Returns:
+        List of change descriptions, empty if the files are equivalent
+    """
+    old_chunks = _normalize(old).split(_TOP_LEVEL)
+    new_chunks = _normalize(new).split(_TOP_LEVEL)
+    if old_chunks[0].strip() != new_chunks[0].strip():
+        return diff_trees(parse(old), parse(new))
+
+    old_digests = [hashlib.blake2b(chunk, digest_size=16).digest() for chunk in old_chunks[1:]]
+    new_digests = [hashlib.blake2b(chunk, digest_size=16).digest() for chunk in new_chunks[1:]]
+    old_changed = _unmatched(old_chunks[1:], old_digests, new_digests)
+    new_changed = _unmatched(new_chunks[1:], new_digests, old_digests)
+    if not old_changed and not new_changed:
+        return []
+
+    tag = old_chunks[0].strip().lstrip(b'(').decode('utf-8')
+    try:
+        old_root = Node(tag, [parse(b'(' + chunk) for chunk in old_changed])
+        new_root = Node(tag, [parse(b'(' + chunk) for chunk in new_changed])
+    except ParseError:
+        # Not split at item boundaries (hand-edited layout): compare whole trees
+        return diff_trees(parse(old), parse(new))
+    return diff_trees(old_root, new_root)
+
+
+def diff_files(old_path, new_path):
+    """diff_data() of two files"""
+    with open(old_path, 'rb') as f:
+        old = f.read()
+    with open(new_path, 'rb') as f:
+        new = f.read()
+    return diff_data(old, new)
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Show the structural changes between two schematics or symbol libraries"
+    )
+    parser.add_argument('old', help='old .kicad_sch or .kicad_sym')
+    parser.add_argument('new', help='new .kicad_sch or .kicad_sym')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main entry point"""
+    args = parse_args(argv)
+    try:
+        changes = diff_files(args.old, args.new)
+    except (OSError, ParseError) as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 2
+    if not changes:
+        print("✓ No structural changes")
+        return 0
+    for change in changes:
+        print(change)
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
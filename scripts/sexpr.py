@@ -0,0 +1,392 @@
+"""
+S-expression reader for KiCad files (.kicad_sch, .kicad_sym)
+
+The emitters in symbol_gen.py and component_gen.py write S-expressions
+with f-strings; this module reads them back. Parsing works on the raw
+bytes (memory-mapped for files) in one pass: a section scan finds the
+top-level lists, skipping long runs with bytes.count(), and each list is
+then tokenized with bulk bytes operations into a compact tree:
+
+- Node: one parenthesised list, (tag item item ...), with __slots__
+- bare atoms (numbers, keywords) are interned str
+- quoted strings are String, a str subclass, so round-tripping keeps quotes
+
+Lazy mode only materializes the requested top-level sections and skips
+over everything else with a cheap parenthesis scan:
+
+    root = parse_file('adapterama.kicad_sch', sections={'lib_symbols', 'symbol'})
+    for sym in root.find_all('symbol'):
+        print(sym.find('property').items)
+
+dumps() serializes a tree back in KiCad's tab-indented layout, so
+parse(dumps(parse(text))) == parse(text).
+"""
+
+import mmap
+import re
+import sys
+from itertools import accumulate
+
+
+class String(str):
+    """A quoted string atom (bare atoms are plain str)"""
+
+    __slots__ = ()
+
+
+class Node:
+    """One parenthesised list: a tag followed by atoms and child nodes"""
+
+    __slots__ = ('tag', 'items', 'span')
+
+    def __init__(self, tag, items=None, span=None):
+        """
+        Args:
+            tag: Leading atom, e.g. "symbol" or "property"
+            items: List of atoms (str/String) and child Nodes
+            span: (start, end) byte offsets in the source, set on
+                top-level sections parsed in lazy mode
+        """
+        self.tag = tag
+        self.items = items if items is not None else []
+        self.span = span
+
+    def __repr__(self):
+        return f'Node({self.tag!r}, {len(self.items)} items)'
+
+    def __eq__(self, other):
+        if not isinstance(other, Node):
+            return NotImplemented
+        return self.tag == other.tag and self.items == other.items
+
+    __hash__ = None
+
+    @property
+    def children(self):
+        """Child Nodes, skipping atoms"""
+        return [item for item in self.items if isinstance(item, Node)]
+
+    @property
+    def atoms(self):
+        """Atoms (str/String), skipping child Nodes"""
+        return [item for item in self.items if not isinstance(item, Node)]
+
+    @property
+    def name(self):
+        """First atom, e.g. the name of (symbol "NAME" ...), or None"""
+        for item in self.items:
+            if not isinstance(item, Node):
+                return item
+            break
+        return None
+
+    def find(self, tag):
+        """Return the first child Node with the given tag, or None"""
+        for item in self.items:
+            if isinstance(item, Node) and item.tag == tag:
+                return item
+        return None
+
+    def find_all(self, tag):
+        """Return all child Nodes with the given tag"""
+        return [item for item in self.items
+                if isinstance(item, Node) and item.tag == tag]
+
+    def property(self, key):
+        """Return the value of (property "key" "value" ...), or None"""
+        for item in self.items:
+            if (isinstance(item, Node) and item.tag == 'property'
+                    and item.items and item.items[0] == key):
+                return item.items[1] if len(item.items) > 1 else None
+        return None
+
+
+class ParseError(ValueError):
+    """Malformed S-expression input"""
+
+
+_SCAN = re.compile(rb'[()]|[^\s()]+')
+_ESCAPE = re.compile(r'\\(.)', re.S)
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r'}
+_OPEN = b'('
+_CLOSE = b')'
+_NOT_PARENS = bytes(b for b in range(256) if b not in b'()')
+_DEPTH_DELTA = [0] * 256
+_DEPTH_DELTA[ord('(')] = 1
+_DEPTH_DELTA[ord(')')] = -1
+
+
+def _unescape(match):
+    char = match.group(1)
+    return _ESCAPES.get(char, char)
+
+
+def _min_depth(segment, depth):
+    """Lowest nesting depth reached inside segment, computed without a Python loop"""
+    parens = segment.translate(None, _NOT_PARENS)
+    return min(accumulate(map(_DEPTH_DELTA.__getitem__, parens), initial=depth))
+
+
+def _string_end(data, pos):
+    """Return the offset of the quote closing the string that starts at pos"""
+    while True:
+        end = data.find(b'"', pos)
+        if end < 0:
+            raise ParseError(f'unterminated string at offset {pos - 1}')
+        backslashes = 0
+        while data[end - 1 - backslashes] == 0x5c:
+            backslashes += 1
+        if not backslashes & 1:
+            return end
+        pos = end + 1
+
+
+def _scan_sections(data):
+    """
+    Find the top-level sections of the first list in data
+
+    Runs of text between strings that cannot contain a section boundary
+    are skipped using count() and a C-level running depth instead of
+    being tokenized.
+
+    Returns:
+        (tag, entries) where entries holds (start, end) spans of child
+        lists and String/str atoms of the root list, in order
+    """
+    end = len(data)
+    pos = 0
+    depth = 0
+    tag = None
+    entries = []
+    start = None
+
+    while pos < end:
+        quote = data.find(b'"', pos)
+        stop = end if quote < 0 else quote
+
+        # Slicing also makes this work on mmap, which has no count()
+        segment = data[pos:stop]
+        closes = segment.count(_CLOSE)
+        if depth - closes >= 2 or (closes and _min_depth(segment, depth) >= 2):
+            depth += segment.count(_OPEN) - closes
+        else:
+            for match in _SCAN.finditer(segment):
+                token = match.group()
+                if token == _OPEN:
+                    depth += 1
+                    if depth == 2:
+                        start = pos + match.start()
+                elif token == _CLOSE:
+                    depth -= 1
+                    if depth == 1:
+                        entries.append((start, pos + match.end()))
+                    elif depth == 0:
+                        return tag, entries
+                    elif depth < 0:
+                        raise ParseError(f'unexpected ")" at offset {pos + match.start()}')
+                elif depth == 1:
+                    atom = sys.intern(token.decode('utf-8'))
+                    if tag is None and not entries:
+                        tag = atom
+                    else:
+                        entries.append(atom)
+                elif depth == 0:
+                    raise ParseError(f'atom outside list at offset {pos + match.start()}')
+
+        if quote < 0:
+            break
+        close = _string_end(data, quote + 1)
+        if depth == 1:
+            entries.append(_make_string(bytes(data[quote + 1:close])))
+        elif depth == 0:
+            raise ParseError(f'string outside list at offset {quote}')
+        pos = close + 1
+
+    raise ParseError('unexpected end of input')
+
+
+def _make_string(raw):
+    text = raw.decode('utf-8')
+    if '\\' in text:
+        text = _ESCAPE.sub(_unescape, text)
+    return String(text)
+
+
+def _build(chunk, atoms, strings):
+    """
+    Build the Node for one complete list
+
+    The chunk is split on quotes, so strings never reach the tokenizer.
+    Outside strings, bytes.split() does the tokenizing in C; "(" is only
+    padded on its left so it stays glued to the tag that follows it.
+
+    Args:
+        chunk: bytes of exactly one list, "(" to ")"
+        atoms: Intern table for atoms and "(tag" tokens, shared across calls
+        strings: Intern table for quoted strings, shared across calls
+
+    Returns:
+        Node
+    """
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    atom_for = atoms.get
+    node = None
+    pending = None
+    inside = False
+
+    for part in chunk.split(b'"'):
+        if inside:
+            if pending is not None:
+                part = pending + b'"' + part
+                pending = None
+            backslashes = len(part) - len(part.rstrip(b'\\'))
+            if backslashes & 1:
+                # Escaped quote: the string continues in the next part
+                pending = part
+                continue
+            value = strings.get(part)
+            if value is None:
+                value = strings[part] = _make_string(part)
+            node.items.append(value)
+            inside = False
+            continue
+
+        for token in part.replace(b')', b' ) ').replace(b'(', b' (').split():
+            first = token[0]
+            if first == 40:  # "(" possibly followed by the tag
+                tag = atom_for(token)
+                if tag is None:
+                    tag = atoms[token] = (
+                        sys.intern(token[1:].decode('utf-8')) if len(token) > 1 else None
+                    )
+                child = Node(tag)
+                if node is not None:
+                    node.items.append(child)
+                    push(node)
+                node = child
+            elif first == 41:  # ")"
+                if not stack:
+                    return node
+                node = pop()
+            else:
+                value = atom_for(token)
+                if value is None:
+                    value = atoms[token] = sys.intern(token.decode('utf-8'))
+                node.items.append(value)
+        inside = True
+
+    raise ParseError('unexpected end of input')
+
+
+def parse(data, sections=None):
+    """
+    Parse the first top-level S-expression in data
+
+    Args:
+        data: bytes, bytearray, mmap or str
+        sections: Optional set of top-level tags to materialize; other
+            top-level sections are skipped (lazy mode)
+
+    Returns:
+        Root Node; in lazy mode its direct children carry their byte span
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+
+    if sections is None:
+        start = data.find(b'(')
+        if start < 0:
+            raise ParseError('no S-expression found')
+        return _build(data[start:], {}, {})
+
+    tag, entries = _scan_sections(data)
+    atoms = {}
+    strings = {}
+    root = Node(tag)
+    items = root.items
+
+    for entry in entries:
+        if type(entry) is not tuple:
+            items.append(entry)
+            continue
+        start, end = entry
+        if sections is not None:
+            head = _SCAN.match(data, start + 1)
+            if head is None or head.group().decode('utf-8') not in sections:
+                continue
+        child = _build(data[start:end], atoms, strings)
+        child.span = entry
+        items.append(child)
+
+    return root
+
+
+def parse_file(path, sections=None):
+    """
+    Parse a KiCad file through a read-only memory map
+
+    Args:
+        path: File path
+        sections: Optional set of top-level tags to materialize (lazy mode)
+
+    Returns:
+        Root Node
+    """
+    with open(path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ParseError(f'{path}: empty file')
+        with data:
+            return parse(data, sections)
+
+
+def _format_atom(item):
+    if isinstance(item, String):
+        escaped = item.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        return f'"{escaped}"'
+    return item
+
+
+def _dump(node, depth, out):
+    indent = '\t' * depth
+    head = [node.tag] if node.tag is not None else []
+    children = []
+    for item in node.items:
+        if isinstance(item, Node):
+            children.append(item)
+        elif children:
+            # Atom after a child list: keep order by emitting as its own line
+            children.append(item)
+        else:
+            head.append(_format_atom(item))
+
+    if not children:
+        out.append(f'{indent}({" ".join(head)})')
+        return
+
+    out.append(f'{indent}({" ".join(head)}')
+    for child in children:
+        if isinstance(child, Node):
+            _dump(child, depth + 1, out)
+        else:
+            out.append(f'{indent}\t{_format_atom(child)}')
+    out.append(f'{indent})')
+
+
+def dumps(node, depth=0):
+    """
+    Serialize a Node tree in KiCad's tab-indented layout
+
+    Args:
+        node: Root Node
+        depth: Starting indentation level
+
+    Returns:
+        S-expression text, newline terminated
+    """
+    out = []
+    _dump(node, depth, out)
+    return '\n'.join(out) + '\n'
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Map signals between two connectors by name
+
+Pin names are split into aliases ('SWDIO/TMS' -> SWDIO, TMS) and each
+alias is normalized (nSRST, SRST and RESET are all nRESET, GNDDetect is
+GND, ...). One connector's aliases are indexed in a dict, so mapping A
+to B is a single pass over A's distinct signal names. The result lists:
+
+- pin_map: one-to-one pin pairs, e.g. ARM 20-pin 7 (TMS) -> Cortex 2 (SWDIO/TMS)
+- shared: signals on several pins of either side (GND, dual VTref)
+- unmatched_a / unmatched_b: signal pins with no counterpart
+- conflicts: ambiguous matches and incompatible electrical types
+
+No-connect pins (NC, KEY) are never mapped.
+
+Usage:
+    python3 signal_map.py ARM_JTAG_20pin_1.27mm Cortex_Debug_10pin_1.27mm
+    python3 signal_map.py --matrix [-j JOBS] [-o matrix.json]
+
+--matrix maps every ordered pair of CONNECTOR_INFO connectors, in a
+process pool for large libraries.
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+# Add scripts directory to path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+from connector_data import CONNECTOR_INFO, connector_info
+from pin_table import PinTable
+
+
+# Alternative spellings of the same signal (keys upper case)
+SIGNAL_ALIASES = {
+    'NRESET': 'nRESET', 'RESET': 'nRESET', 'NSRST': 'nRESET', 'SRST': 'nRESET',
+    'NTRST': 'nTRST', 'TRST': 'nTRST',
+    'VTREF': 'VTref', 'VREF': 'VTref', 'VSUPPLY': 'VTref',
+    'GNDDETECT': 'GND', 'VSS': 'GND',
+    'SWDCLK': 'SWCLK',
+}
+
+# Electrical types that connect to anything
+_FLEXIBLE_TYPES = frozenset(('bidirectional', 'passive', 'unspecified'))
+
+# Below this many connectors the matrix is computed in-process
+PARALLEL_THRESHOLD = 32
+
+
+@lru_cache(maxsize=None)
+def signal_aliases(name):
+    """
+    Normalized aliases of a pin name
+
+    Args:
+        name: Pin name, possibly dual ('SWDIO/TMS')
+
+    Returns:
+        Tuple of canonical signal names, in order of appearance
+    """
+    aliases = []
+    for part in name.split('/'):
+        part = part.strip()
+        if part:
+            aliases.append(SIGNAL_ALIASES.get(part.upper(), part.upper()))
+    return tuple(dict.fromkeys(aliases))
+
+
+def types_compatible(type_a, type_b):
+    """True if two pins carrying the same signal may be wired together"""
+    return type_a == type_b or type_a in _FLEXIBLE_TYPES or type_b in _FLEXIBLE_TYPES
+
+
+class SignalIndex:
+    """Signals of one connector, indexed by normalized alias"""
+
+    __slots__ = ('table', 'signals', 'by_alias')
+
+    def __init__(self, pins):
+        """
+        Args:
+            pins: PinTable or list of (pin_num, pin_name, pin_type, side)
+        """
+        table = PinTable.of(pins)
+        self.table = table
+        # aliases -> pin names. Names with identical aliases (GND, GNDDetect)
+        # form one signal; no-connect pins are left out
+        self.signals = {}
+        for name in table.signal_names():
+            if table.pin_type(table.indexes_named(name)[0]) != 'no_connect':
+                self.signals.setdefault(signal_aliases(name), []).append(name)
+        self.by_alias = {}
+        for aliases in self.signals:
+            for alias in aliases:
+                self.by_alias.setdefault(alias, []).append(aliases)
+
+    def label(self, aliases):
+        """Pin names of a signal, joined for messages"""
+        return '/'.join(self.signals[aliases])
+
+    def pins(self, aliases):
+        """Pin numbers carrying a signal, in table order"""
+        table = self.table
+        rows = sorted(i for name in self.signals[aliases] for i in table.indexes_named(name))
+        return tuple(table.numbers[i] for i in rows)
+
+    def named_pins(self, aliases):
+        """(pin number, pin name) pairs of a signal, in table order"""
+        table = self.table
+        rows = sorted(i for name in self.signals[aliases] for i in table.indexes_named(name))
+        return [(table.numbers[i], table.names[i]) for i in rows]
+
+    def pin_type(self, aliases):
+        """Electrical type of the first pin of a signal"""
+        table = self.table
+        return table.pin_type(table.indexes_named(self.signals[aliases][0])[0])
+
+
+def _index(connector):
+    if isinstance(connector, SignalIndex):
+        return connector
+    if isinstance(connector, str):
+        return SignalIndex(connector_info(connector)['pin_table'])
+    return SignalIndex(connector)
+
+
+def map_connectors(a, b):
+    """
+    Map the signals of connector a onto connector b
+
+    Args:
+        a: CONNECTOR_INFO name, SignalIndex, PinTable or pin list
+        b: Same, for the other connector
+
+    Returns:
+        Dict with 'pin_map' [(pin_a, pin_b, signal)], 'shared'
+        [(signal, pins_a, pins_b)], 'unmatched_a' / 'unmatched_b'
+        [(pin, name)] and 'conflicts' [dict with signal, pins_a, pins_b,
+        reason]
+    """
+    a = _index(a)
+    b = _index(b)
+
+    candidates = {}
+    claims = {}
+    for signal in a.signals:
+        found = list(dict.fromkeys(
+            other for alias in signal for other in b.by_alias.get(alias, ())
+        ))
+        candidates[signal] = found
+        for other in found:
+            claims.setdefault(other, []).append(signal)
+
+    result = {'pin_map': [], 'shared': [], 'unmatched_a': [], 'unmatched_b': [], 'conflicts': []}
+
+    for signal, found in candidates.items():
+        if not found:
+            result['unmatched_a'].extend(a.named_pins(signal))
+            continue
+        if len(found) > 1:
+            result['conflicts'].append({
+                'signal': a.label(signal), 'pins_a': a.pins(signal),
+                'pins_b': tuple(pin for other in found for pin in b.pins(other)),
+                'reason': f"{a.label(signal)} matches several pins: "
+                          f"{', '.join(map(b.label, found))}",
+            })
+            continue
+
+        other = found[0]
+        claimants = claims[other]
+        if len(claimants) > 1:
+            # Report each over-claimed signal of b once, from its first claimant
+            if claimants[0] == signal:
+                result['conflicts'].append({
+                    'signal': b.label(other),
+                    'pins_a': tuple(pin for s in claimants for pin in a.pins(s)),
+                    'pins_b': b.pins(other),
+                    'reason': f"{b.label(other)} is matched by several pins: "
+                              f"{', '.join(map(a.label, claimants))}",
+                })
+            continue
+
+        name = next(alias for alias in signal if alias in other)
+        type_a, type_b = a.pin_type(signal), b.pin_type(other)
+        pins_a, pins_b = a.pins(signal), b.pins(other)
+        if not types_compatible(type_a, type_b):
+            result['conflicts'].append({
+                'signal': name, 'pins_a': pins_a, 'pins_b': pins_b,
+                'reason': f"{a.label(signal)} is {type_a} but {b.label(other)} is {type_b}",
+            })
+        elif len(pins_a) == 1 and len(pins_b) == 1:
+            result['pin_map'].append((pins_a[0], pins_b[0], name))
+        else:
+            result['shared'].append((name, pins_a, pins_b))
+
+    for signal in b.signals:
+        if signal not in claims:
+            result['unmatched_b'].extend(b.named_pins(signal))
+
+    return result
+
+
+def summarize(mapping):
+    """
+    Reduce a map_connectors() result to counts and a coverage score
+
+    Args:
+        mapping: map_connectors() result
+
+    Returns:
+        Dict with 'matched', 'unmatched_a', 'unmatched_b', 'conflicts'
+        and 'coverage' (matched share of a's signals, 0..1)
+    """
+    matched = len(mapping['pin_map']) + len(mapping['shared'])
+    unmatched = len({name for _, name in mapping['unmatched_a']})
+    total = matched + unmatched + len(mapping['conflicts'])
+    return {
+        'matched': matched,
+        'unmatched_a': len(mapping['unmatched_a']),
+        'unmatched_b': len(mapping['unmatched_b']),
+        'conflicts': len(mapping['conflicts']),
+        'coverage': matched / total if total else 0.0,
+    }
+
+
+_worker_indexes = None
+
+
+def _init_worker(connectors):
+    global _worker_indexes
+    _worker_indexes = {name: SignalIndex(pins) for name, pins in connectors.items()}
+
+
+def _matrix_row(name, names):
+    indexes = _worker_indexes
+    row = indexes[name]
+    return name, {other: summarize(map_connectors(row, indexes[other])) for other in names}
+
+
+def compatibility_matrix(connectors=None, jobs=None):
+    """
+    Map every ordered pair of connectors
+
+    Each connector is indexed once per process; rows of the matrix are
+    computed in a process pool when there are many connectors.
+
+    Args:
+        connectors: Dict name -> pin list (default: all CONNECTOR_INFO pins)
+        jobs: Worker processes (default: CPU count, or 1 for small libraries)
+
+    Returns:
+        Dict name_a -> name_b -> summarize() result
+    """
+    if connectors is None:
+        connectors = {name: info['pins'] for name, info in CONNECTOR_INFO.items()}
+    connectors = {name: list(pins) for name, pins in connectors.items()}
+    names = list(connectors)
+    if jobs is None and len(names) < PARALLEL_THRESHOLD:
+        jobs = 1
+
+    if jobs == 1:
+        _init_worker(connectors)
+        rows = dict(_matrix_row(name, names) for name in names)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(connectors,)) as pool:
+            rows = dict(pool.map(_matrix_row, names, [names] * len(names),
+                                 chunksize=max(1, len(names) // (4 * (jobs or os.cpu_count() or 1)))))
+    return {name: rows[name] for name in names}
+
+
+def print_mapping(name_a, name_b, mapping):
+    """Print a map_connectors() result as a wiring list"""
+    print(f"{name_a} -> {name_b}")
+    for pin_a, pin_b, signal in mapping['pin_map']:
+        print(f"  {signal:<10} pin {pin_a:>3} -> pin {pin_b}")
+    for signal, pins_a, pins_b in mapping['shared']:
+        print(f"  {signal:<10} pins {', '.join(pins_a)} -> pins {', '.join(pins_b)}")
+    for side, key in (('input', 'unmatched_a'), ('output', 'unmatched_b')):
+        if mapping[key]:
+            pins = ', '.join(f"{pin} ({name})" for pin, name in mapping[key])
+            print(f"  ⚠ unmatched {side} pins: {pins}")
+    for conflict in mapping['conflicts']:
+        print(f"  ✗ {conflict['reason']}")
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Map signals between connectors")
+    parser.add_argument('connectors', nargs='*', metavar='CONNECTOR',
+                        help='input and output connector (CONNECTOR_INFO names)')
+    parser.add_argument('--matrix', action='store_true',
+                        help='map every pair of known connectors')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes for --matrix (default: CPU count)')
+    parser.add_argument('-o', '--output', help='also write the result as JSON')
+    args = parser.parse_args(argv)
+    if not args.matrix and len(args.connectors) != 2:
+        parser.error('give two connectors, or --matrix')
+    for name in args.connectors:
+        try:
+            connector_info(name)
+        except KeyError:
+            parser.error(f"unknown connector {name!r} (known: {', '.join(CONNECTOR_INFO)})")
+        except ValueError as e:
+            parser.error(f"{name}: {e}")
+    return args
+
+
+def main(argv=None):
+    """Main entry point"""
+    args = parse_args(argv)
+
+    if args.matrix:
+        result = compatibility_matrix(jobs=args.jobs)
+        names = list(result)
+        width = max(map(len, names))
+        print(f"Signal coverage (row -> column), {len(names)} connectors")
+        for i, name in enumerate(names):
+            cells = ' '.join(f"{result[name][other]['coverage']:>5.0%}" for other in names)
+            print(f"  [{i}] {name:<{width}} {cells}")
+    else:
+        name_a, name_b = args.connectors
+        result = map_connectors(name_a, name_b)
+        print_mapping(name_a, name_b, result)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"\nWritten to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,292 @@
+"""
+Lazy loading of connector definitions from connector-specs/*.md
+
+Every spec file has a "### Signal Table" with two pins per row:
+
+    | Pin | Signal | Pin | Signal | Description |
+    | 1   | VTref  | 2   | GND    | ...         |
+
+parse_spec() turns such a table into the (pin_num, pin_name, pin_type,
+side) tuples used by connector_data.py: odd pins go left, even pins
+right, and the electrical type is inferred from the signal name.
+
+CONNECTOR_INFO here is a lazy mapping with the same entries as
+connector_data.CONNECTOR_INFO (pins, datasheet, description,
+pin_table). Listing it only lists the spec directory; a spec is parsed
+the first time its entry is looked up. Parsed specs are kept in a
+compiled cache (<cache_dir>/<stem>-<path hash>.bin, marshal format)
+that is reused while the spec's mtime and size are unchanged, or when
+its contents still hash the same after a touch.
+
+    import spec_loader
+    info = spec_loader.CONNECTOR_INFO['Cortex_Debug_10pin_1.27mm']
+
+Specs referenced by a datasheet in connector_data.py use that connector
+name as key; other spec files are keyed by their file stem.
+"""
+
+import hashlib
+import marshal
+import os
+import re
+from collections.abc import Mapping
+
+from pin_table import PinTable
+from signal_map import signal_aliases
+
+
+CACHE_VERSION = 1
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DEFAULT_SPEC_DIR = os.path.join(REPO_DIR, 'connector-specs')
+DEFAULT_CACHE_DIR = os.path.join(REPO_DIR, '.cache', 'specs')
+
+# Electrical type of a normalized signal name (see signal_map.signal_aliases)
+SIGNAL_TYPES = {
+    'VTref': 'power_in', 'VDD': 'power_in', 'GND': 'power_in',
+    'NC': 'no_connect', 'KEY': 'no_connect',
+    'TDO': 'output', 'SWO': 'output', 'RTCK': 'output',
+    'SWDIO': 'bidirectional',
+    'nRESET': 'open_collector',
+}
+# Prefixes of signal families (EMU0..EMU4)
+SIGNAL_TYPE_PREFIXES = (('EMU', 'bidirectional'),)
+DEFAULT_SIGNAL_TYPE = 'input'
+
+_TABLE_HEADING = re.compile(r'^#+\s*Signal Table\s*$', re.MULTILINE)
+_PARENTHESIZED = re.compile(r'\s*\([^)]*\)')
+
+
+class SpecError(ValueError):
+    """A connector spec file has no usable signal table"""
+
+
+def signal_type(name):
+    """
+    Infer the electrical type of a pin from its name
+
+    Dual names take the type of their first alias that is not NC, so
+    'NC/VDD' is power_in and 'TDI/NC' is input.
+
+    Args:
+        name: Pin name, possibly dual ('SWDIO/TMS')
+
+    Returns:
+        Electrical type string
+    """
+    aliases = signal_aliases(name)
+    connected = [alias for alias in aliases if alias != 'NC'] or list(aliases)
+    for alias in connected:
+        pin_type = SIGNAL_TYPES.get(alias)
+        if pin_type:
+            return pin_type
+        for prefix, prefix_type in SIGNAL_TYPE_PREFIXES:
+            if alias.startswith(prefix):
+                return prefix_type
+    return DEFAULT_SIGNAL_TYPE
+
+
+def parse_spec(text, source='<spec>'):
+    """
+    Parse the signal table of a connector spec
+
+    Args:
+        text: Markdown contents of the spec
+        source: File name for error messages
+
+    Returns:
+        (description, pins): the spec's title and a list of
+        (pin_num, pin_name, pin_type, side) tuples ordered by pin number
+
+    Raises:
+        SpecError: If there is no signal table or a row is malformed
+    """
+    heading = _TABLE_HEADING.search(text)
+    if heading is None:
+        raise SpecError(f"{source}: no '### Signal Table' section")
+
+    title = next((line[2:].strip() for line in text.splitlines() if line.startswith('# ')), '')
+
+    pins = []
+    in_table = False
+    for line in text[heading.end():].splitlines():
+        line = line.strip()
+        if not line.startswith('|'):
+            if in_table:
+                break
+            continue
+        in_table = True
+        cells = [cell.strip() for cell in line.strip('|').split('|')]
+        if len(cells) < 4 or not cells[0].isdigit():
+            # Header and separator rows
+            continue
+        for num, name in ((cells[0], cells[1]), (cells[2], cells[3])):
+            if not num:
+                continue
+            if not num.isdigit() or not name:
+                raise SpecError(f"{source}: bad signal table row {line!r}")
+            # 'KEY (NC)' -> 'KEY'
+            name = _PARENTHESIZED.sub('', name)
+            side = 'left' if int(num) % 2 else 'right'
+            pins.append((num, name, signal_type(name), side))
+
+    if not pins:
+        raise SpecError(f"{source}: empty signal table")
+    pins.sort(key=lambda pin: int(pin[0]))
+    return title, pins
+
+
+class SpecCache:
+    """Compiled cache of parsed spec files, validated by mtime/size and content hash"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        """
+        Args:
+            cache_dir: Cache directory (None keeps nothing on disk)
+        """
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, spec_path):
+        key = hashlib.sha1(os.path.abspath(spec_path).encode('utf-8')).hexdigest()[:12]
+        stem = os.path.splitext(os.path.basename(spec_path))[0]
+        return os.path.join(self.cache_dir, f'{stem}-{key}.bin')
+
+    def _read(self, path):
+        try:
+            with open(path, 'rb') as f:
+                entry = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if not isinstance(entry, tuple) or len(entry) != 6 or entry[0] != CACHE_VERSION:
+            return None
+        return entry
+
+    def _write(self, path, entry):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                marshal.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            # A read-only checkout still works, just without the cache
+            pass
+
+    def load(self, spec_path):
+        """
+        Parse a spec file, or fetch its cached parse
+
+        Args:
+            spec_path: Path to the .md spec
+
+        Returns:
+            (description, pins) as from parse_spec()
+        """
+        st = os.stat(spec_path)
+        cache_path = self._path(spec_path) if self.cache_dir else None
+        entry = self._read(cache_path) if cache_path else None
+        if entry and entry[1] == st.st_mtime_ns and entry[2] == st.st_size:
+            self.hits += 1
+            return entry[4], [tuple(pin) for pin in entry[5]]
+
+        with open(spec_path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if entry and entry[3] == digest:
+            # Touched but unchanged: refresh the stamp, keep the parse
+            self.hits += 1
+            description, pins = entry[4], entry[5]
+        else:
+            self.misses += 1
+            description, pins = parse_spec(data.decode('utf-8'), spec_path)
+            pins = tuple(pins)
+        if cache_path:
+            self._write(cache_path, (CACHE_VERSION, st.st_mtime_ns, st.st_size, digest,
+                                     description, tuple(pins)))
+        return description, [tuple(pin) for pin in pins]
+
+
+def _datasheet_names():
+    """Map spec file stems to connector names used by connector_data.py"""
+    from connector_data import CONNECTOR_INFO as OUTPUTS, INPUT_CONNECTOR_INFO as INPUTS
+    names = {}
+    for name, info in (*OUTPUTS.items(), *INPUTS.items()):
+        stem = os.path.splitext(os.path.basename(info['datasheet']))[0]
+        names.setdefault(stem, name)
+    return names
+
+
+class SpecConnectors(Mapping):
+    """Read-only mapping of connector name -> info dict, parsed on first access"""
+
+    def __init__(self, spec_dir=DEFAULT_SPEC_DIR, cache=None, names=None):
+        """
+        Args:
+            spec_dir: Directory of *.md connector specs
+            cache: SpecCache to use (default: one in DEFAULT_CACHE_DIR)
+            names: Dict spec file stem -> connector name (default: from
+                the datasheet paths in connector_data.py)
+        """
+        self.spec_dir = spec_dir
+        self.cache = cache if cache is not None else SpecCache()
+        self._names = names
+        self._files = None
+        self._loaded = {}
+
+    def _index(self):
+        if self._files is None:
+            names = self._names if self._names is not None else _datasheet_names()
+            files = {}
+            with os.scandir(self.spec_dir) as it:
+                for entry in sorted(it, key=lambda e: e.name):
+                    if entry.name.endswith('.md') and entry.is_file():
+                        stem = entry.name[:-3]
+                        files[names.get(stem, stem)] = entry.path
+            self._files = files
+        return self._files
+
+    def __getitem__(self, name):
+        info = self._loaded.get(name)
+        if info is not None:
+            return info
+        path = self._index()[name]
+        description, pins = self.cache.load(path)
+        info = {
+            'pins': pins,
+            'datasheet': os.path.relpath(path, os.path.dirname(self.spec_dir)),
+            'description': description,
+            'pin_table': PinTable(pins),
+        }
+        self._loaded[name] = info
+        return info
+
+    def __contains__(self, name):
+        return name in self._index()
+
+    def __iter__(self):
+        return iter(self._index())
+
+    def __len__(self):
+        return len(self._index())
+
+    def path(self, name):
+        """Spec file path of a connector"""
+        return self._index()[name]
+
+    def loaded(self):
+        """Names of the connectors parsed so far"""
+        return list(self._loaded)
+
+    def reset(self):
+        """Forget the directory listing and parsed entries (after spec edits)"""
+        self._files = None
+        self._loaded = {}
+
+
+def __getattr__(name):
+    # CONNECTOR_INFO is created on first use, so importing stays cheap
+    if name == 'CONNECTOR_INFO':
+        value = globals()['CONNECTOR_INFO'] = SpecConnectors()
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
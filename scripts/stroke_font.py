@@ -0,0 +1,88 @@
+"""
+Glyph metrics for KiCad's stroke font
+
+KiCad draws schematic text with its "newstroke" font, which is derived
+from the Hershey simplex font. Advance widths below are the Hershey
+simplex widths in font units, where the glyph height (the KiCad font
+size) is 21 units. They are stored once at import as a compact byte
+array indexed by code point; characters outside ASCII fall back to an
+average capital width.
+"""
+
+from array import array
+from functools import lru_cache
+
+
+# Glyph height in font units; width_mm = units * font_size / UNITS_PER_SIZE
+UNITS_PER_SIZE = 21
+
+# Width used for code points without an entry (about an average capital)
+DEFAULT_ADVANCE = 21
+
+_ADVANCES = {
+    ' ': 16, '!': 10, '"': 16, '#': 21, '$': 20, '%': 24, '&': 26, "'": 10,
+    '(': 14, ')': 14, '*': 16, '+': 26, ',': 10, '-': 26, '.': 10, '/': 22,
+    '0': 20, '1': 20, '2': 20, '3': 20, '4': 20, '5': 20, '6': 20, '7': 20,
+    '8': 20, '9': 20, ':': 10, ';': 10, '<': 24, '=': 26, '>': 24, '?': 18,
+    '@': 27, 'A': 18, 'B': 21, 'C': 21, 'D': 21, 'E': 19, 'F': 18, 'G': 21,
+    'H': 22, 'I': 8, 'J': 16, 'K': 21, 'L': 17, 'M': 24, 'N': 22, 'O': 22,
+    'P': 21, 'Q': 22, 'R': 21, 'S': 20, 'T': 16, 'U': 22, 'V': 18, 'W': 24,
+    'X': 20, 'Y': 18, 'Z': 20, '[': 14, '\\': 14, ']': 14, '^': 16, '_': 16,
+    '`': 10, 'a': 19, 'b': 19, 'c': 18, 'd': 19, 'e': 18, 'f': 12, 'g': 19,
+    'h': 19, 'i': 8, 'j': 10, 'k': 17, 'l': 8, 'm': 30, 'n': 19, 'o': 19,
+    'p': 19, 'q': 19, 'r': 13, 's': 17, 't': 12, 'u': 19, 'v': 16, 'w': 22,
+    'x': 17, 'y': 16, 'z': 17, '{': 14, '|': 8, '}': 14, '~': 24,
+}
+
+# Advance width per ASCII code point, one byte each
+ADVANCE_TABLE = array('B', (
+    _ADVANCES.get(chr(code), DEFAULT_ADVANCE) for code in range(128)
+))
+
+
+@lru_cache(maxsize=4096)
+def text_units(text):
+    """
+    Width of text in font units (memoized: pin names like GND repeat a lot)
+
+    Args:
+        text: The text string
+
+    Returns:
+        Sum of glyph advance widths
+    """
+    if text.isascii():
+        return sum(map(ADVANCE_TABLE.__getitem__, text.encode('ascii')))
+    return sum(
+        ADVANCE_TABLE[code] if code < 128 else DEFAULT_ADVANCE
+        for code in map(ord, text)
+    )
+
+
+def text_width(text, font_size=1.27):
+    """
+    Width of text in mm
+
+    Args:
+        text: The text string
+        font_size: Font size in mm (default 1.27)
+
+    Returns:
+        Width in mm
+    """
+    return text_units(text) * font_size / UNITS_PER_SIZE
+
+
+def text_widths(texts, font_size=1.27):
+    """
+    Measure many strings in one call
+
+    Args:
+        texts: Iterable of strings
+        font_size: Font size in mm (default 1.27)
+
+    Returns:
+        List of widths in mm, in input order
+    """
+    scale = font_size / UNITS_PER_SIZE
+    return [units * scale for units in map(text_units, texts)]
@@ -0,0 +1,207 @@
+"""
+Content-addressed cache for generated connector symbols
+
+create_connector_symbol() output depends only on (name, datasheet, pins),
+so symbols are memoized under a stable SHA-256 of those inputs plus a
+digest of the generator sources (editing symbol_gen.py, stroke_font.py or
+pin_table.py invalidates every entry). There are two tiers:
+
+- an in-process LRU of rendered S-expressions
+- an optional on-disk store (<cache_dir>/<hash>.sexpr) bounded in total
+  size; least recently used files are evicted first
+
+Typical use:
+
+    from symbol_cache import cached_connector_symbol, configure_symbol_cache
+
+    configure_symbol_cache('.cache/symbols')   # optional, enables disk tier
+    text = cached_connector_symbol(name, datasheet, pins)
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+import coords
+import pin_table
+import stroke_font
+import symbol_gen
+
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = '.cache/symbols'
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_DISK_BYTES = 32 * 1024 * 1024
+
+
+def _generator_digest():
+    """Hash the symbol generator sources so generator edits invalidate the cache"""
+    digest = hashlib.sha256()
+    for module in (symbol_gen, coords, stroke_font, pin_table):
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+_GENERATOR_DIGEST = _generator_digest()
+
+
+def symbol_key(name, datasheet, pins):
+    """
+    Compute the stable cache key for a connector symbol
+
+    Args:
+        name: Symbol name
+        datasheet: Path to datasheet file
+        pins: PinTable or iterable of (pin_num, pin_name, pin_type, side)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = json.dumps(
+        [CACHE_VERSION, _GENERATOR_DIGEST, name, datasheet, [list(p) for p in pins]],
+        separators=(',', ':'),
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SymbolCache:
+    """Two-tier (memory LRU + optional disk) cache of connector symbols"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, cache_dir=None,
+                 max_disk_bytes=DEFAULT_MAX_DISK_BYTES):
+        """
+        Args:
+            max_entries: Number of symbols kept in memory
+            cache_dir: Directory for the disk tier (None disables it)
+            max_disk_bytes: Total size budget of the disk tier
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+
+    def get(self, name, datasheet, pins):
+        """
+        Return the symbol S-expression, generating it only on a cache miss
+
+        Args:
+            name: Symbol name
+            datasheet: Path to datasheet file
+            pins: Iterable of (pin_num, pin_name, pin_type, side)
+
+        Returns:
+            Complete symbol S-expression
+        """
+        key = symbol_key(name, datasheet, pins)
+
+        symbol = self._memory.get(key)
+        if symbol is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return symbol
+
+        symbol = self._read_disk(key)
+        if symbol is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            symbol = symbol_gen.create_connector_symbol(name, datasheet, pins)
+            self._write_disk(key, symbol)
+
+        self._memory[key] = symbol
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+        return symbol
+
+    def clear(self):
+        """Drop the in-memory tier (the disk tier is left alone)"""
+        self._memory.clear()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.sexpr')
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                symbol = f.read()
+        except OSError:
+            return None
+        # Refresh the mtime so eviction sees this entry as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return symbol
+
+    def _write_disk(self, key, symbol):
+        if not self.cache_dir:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(symbol)
+        os.replace(tmp_path, path)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """Remove least recently used files until the disk tier fits its budget"""
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith('.sexpr'):
+                    continue
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        if total <= self.max_disk_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_disk_bytes:
+                break
+
+
+_default_cache = SymbolCache()
+
+
+def configure_symbol_cache(cache_dir=None, max_entries=DEFAULT_MAX_ENTRIES,
+                           max_disk_bytes=DEFAULT_MAX_DISK_BYTES):
+    """
+    Replace the process-wide symbol cache
+
+    Args:
+        cache_dir: Directory for the disk tier (None keeps memory only)
+        max_entries: Number of symbols kept in memory
+        max_disk_bytes: Total size budget of the disk tier
+
+    Returns:
+        The new SymbolCache
+    """
+    global _default_cache
+    _default_cache = SymbolCache(max_entries, cache_dir, max_disk_bytes)
+    return _default_cache
+
+
+def get_symbol_cache():
+    """Return the process-wide SymbolCache"""
+    return _default_cache
+
+
+def cached_connector_symbol(name, datasheet, pins):
+    """Drop-in cached replacement for symbol_gen.create_connector_symbol()"""
+    return _default_cache.get(name, datasheet, pins)
@@ -2,17 +2,40 @@
 KiCad symbol generation for connectors and passive components
 
 This module includes automatic overlap avoidance:
-- Calculates optimal symbol width based on pin name lengths
-- Adjusts left and right rectangle bounds independently
+- Calculates optimal symbol width based on pin name widths, measured
+  with per-glyph stroke font metrics (see stroke_font.py)
+- Adjusts left and right rectangle bounds independently, and moves the
+  pins of each side out with them so they start at the body edge
 - Positions Value and Datasheet properties to prevent overlap
-- Uses 10mil (0.254mm) grid alignment for cleaner symbols
+- Keeps the body edges on the 50mil (1.27mm) grid like the pins
+
+Pin positions and the body outline are computed in integer nanometres
+(see coords.py), so pins land exactly on the 50mil grid.
 
 The overlap detection ensures that long pin names like "SWDIO/TMS",
 "SWCLK/TCK", and "GNDDetect" don't extend beyond the symbol rectangle.
 """
 
+from coords import GRID_50MIL, fmt, fmt_short, snap_up, to_mm, to_nm
+from pin_table import PinTable
+from stroke_font import text_width, text_widths
+
+
+# Connector pin geometry: pins 200mil apart, connection points at least
+# 400mil off centre (further out for bodies widened by long pin names)
+PIN_SPACING = 5.08
+PIN_X = 10.16
+PIN_LENGTH = 2.54
+_PIN_SPACING_NM = to_nm(PIN_SPACING)
 
-def create_pin(num, name, pin_type, side, y_pos):
+# Connection points of the R and C symbols: pin number -> (x, y, angle)
+PASSIVE_PIN_LAYOUT = {
+    '1': (0, 3.81, 270),
+    '2': (0, -3.81, 90),
+}
+
+
+def create_pin(num, name, pin_type, side, y_pos, x_pos=None):
     """
     Generate a single pin S-expression
 
@@ -22,11 +45,16 @@ def create_pin(num, name, pin_type, side, y_pos):
         pin_type: Electrical type (power_in, input, output, bidirectional, etc.)
         side: 'left' or 'right'
         y_pos: Y position in mm
+        x_pos: X position of the connection point in mm
+            (default: -PIN_X or PIN_X by side)
 
     Returns:
         S-expression string for the pin
     """
-    x_pos = -10.16 if side == 'left' else 10.16
+    if x_pos is None:
+        x_pos = -PIN_X if side == 'left' else PIN_X
+    x_pos = fmt_short(to_nm(x_pos))
+    y_pos = fmt_short(to_nm(y_pos))
     angle = 0 if side == 'left' else 180
 
     return f'''\t\t\t(pin {pin_type} line (at {x_pos} {y_pos} {angle}) (length 2.54)
@@ -37,89 +65,206 @@ def create_pin(num, name, pin_type, side, y_pos):
 
 def calculate_text_width(text, font_size=1.27):
     """
-    Estimate the width of text in KiCad units (mm)
+    Calculate the width of text in KiCad units (mm)
 
     Args:
         text: The text string
         font_size: Font size in mm (default 1.27)
 
     Returns:
-        Estimated width in mm
+        Width in mm, from KiCad stroke font glyph widths
     """
-    # KiCad uses proportional fonts, approximate width per character
-    # Average character width is roughly 0.6 * font_size
-    char_width = 0.6 * font_size
-    return len(text) * char_width
+    return text_width(text, font_size)
 
 
-def create_connector_symbol(name, datasheet, pins):
+def calculate_pin_name_widths(pins, font_size=1.27):
     """
-    Generate a complete connector symbol from pin definitions with automatic
-    overlap avoidance for pin names and properties.
+    Measure the widest pin name on each side of a connector in one call
 
     Args:
-        name: Symbol name (e.g., "ARM_JTAG_20pin_1.27mm")
-        datasheet: Path to datasheet file
-        pins: List of tuples (pin_num, pin_name, pin_type, side)
+        pins: PinTable or list of tuples (pin_num, pin_name, pin_type, side)
+        font_size: Font size in mm (default 1.27)
 
     Returns:
-        Complete symbol S-expression
+        Tuple (max_left_width, max_right_width) in mm
     """
-    # Calculate vertical spacing and bounds
-    pin_count = len(pins)
-    y_spacing = 5.08  # Standard 200mil spacing
+    table = PinTable.of(pins)
+    widths = text_widths(table.names, font_size)
+    max_left = max((widths[i] for i in table.indexes_on('left')), default=0)
+    max_right = max((widths[i] for i in table.indexes_on('right')), default=0)
+    return max_left, max_right
 
-    # Find maximum pin name length for each side
-    max_left_name_len = 0
-    max_right_name_len = 0
 
-    for num, pin_name, pin_type, side in pins:
-        name_width = calculate_text_width(pin_name)
-        if side == 'left':
-            max_left_name_len = max(max_left_name_len, name_width)
-        else:
-            max_right_name_len = max(max_right_name_len, name_width)
+def connector_body_widths(pins):
+    """
+    Extent of a connector body left and right of its centre
 
-    # Calculate rectangle width with padding
-    # Base width from pin connection point (2.54mm) + pin name offset (1.016mm) + text + margin (1mm)
-    left_width = max(7.62, 2.54 + 1.016 + max_left_name_len + 1.0)
-    right_width = max(7.62, 2.54 + 1.016 + max_right_name_len + 1.0)
+    Wide enough for the pin names, at least PIN_X - PIN_LENGTH, and
+    rounded up to the 50mil grid: the pins start at the body edge, so
+    their connection points stay on the grid.
 
-    # Round to nearest 0.254mm (10mil) grid
-    left_width = round(left_width / 0.254) * 0.254
-    right_width = round(right_width / 0.254) * 0.254
+    Args:
+        pins: PinTable or list of tuples (pin_num, pin_name, pin_type, side)
+
+    Returns:
+        (left_width, right_width) in mm
+    """
+    max_left_name_len, max_right_name_len = calculate_pin_name_widths(pins)
+
+    # Base width (2.54mm) + pin name offset (1.016mm) + text + margin (1mm)
+    left_width = max(PIN_X - PIN_LENGTH, 2.54 + 1.016 + max_left_name_len + 1.0)
+    right_width = max(PIN_X - PIN_LENGTH, 2.54 + 1.016 + max_right_name_len + 1.0)
+    return (to_mm(snap_up(to_nm(left_width), GRID_50MIL)),
+            to_mm(snap_up(to_nm(right_width), GRID_50MIL)))
 
-    # Calculate positions for each pin (alternating left/right)
-    pin_defs = []
-    y_start = ((pin_count // 2) - 1) * y_spacing / 2
 
-    for i, (num, pin_name, pin_type, side) in enumerate(pins):
+def connector_pin_layout(pins):
+    """
+    Compute where create_connector_symbol() places each pin
+
+    Pins fill rows two at a time, top to bottom, in table order; each
+    side's pins start at that side's body edge (connector_body_widths).
+
+    Args:
+        pins: PinTable or list of tuples (pin_num, pin_name, pin_type, side)
+
+    Returns:
+        List of (x, y, angle) connection points in symbol coordinates
+        (mm, y up), in table order
+    """
+    pins = PinTable.of(pins)
+    left_width, right_width = connector_body_widths(pins)
+    left_x = to_mm(-to_nm(left_width) - to_nm(PIN_LENGTH))
+    right_x = to_mm(to_nm(right_width) + to_nm(PIN_LENGTH))
+    y_start = ((len(pins) // 2) - 1) * _PIN_SPACING_NM // 2
+    layout = []
+    for i in range(len(pins)):
         # Alternating pattern: odd pins on left, even on right
-        row = i // 2
-        y_pos = y_start - (row * y_spacing)
-        pin_defs.append(create_pin(num, pin_name, pin_type, side, y_pos))
+        y_pos = to_mm(y_start - (i // 2) * _PIN_SPACING_NM)
+        if pins.side(i) == 'left':
+            layout.append((left_x, y_pos, 0))
+        else:
+            layout.append((right_x, y_pos, 180))
+    return layout
+
+
+def connector_symbol_geometry(name, pins):
+    """
+    Compute the body and property layout of a connector symbol
+
+    Args:
+        name: Symbol name (the Value text)
+        pins: PinTable or list of tuples (pin_num, pin_name, pin_type, side)
+
+    Returns:
+        Dict with left_width, right_width, rect_top, rect_bottom, ref_y,
+        value_x, value_y, value_width, datasheet_x and datasheet_y
+        (symbol coordinates in mm, y up)
+    """
+    pins = PinTable.of(pins)
+
+    # Calculate vertical spacing and bounds
+    pin_count = len(pins)
+
+    # Rectangle edges, where the pins of each side start
+    left_width, right_width = connector_body_widths(pins)
 
     # Calculate rectangle bounds
-    rect_top = y_start + 2.54
-    rect_bottom = -(y_start + 2.54)
+    y_start = ((pin_count // 2) - 1) * _PIN_SPACING_NM // 2
+    top = y_start + to_nm(2.54)
+    rect_top = to_mm(top)
+    rect_bottom = to_mm(-top)
 
     # Calculate property positions to avoid overlap
     # Reference goes above the symbol
-    ref_y = rect_top + 1.27
+    ref_y = to_mm(top + to_nm(1.27))
 
     # Value goes below - check if symbol name is long
     value_width = calculate_text_width(name)
-    value_y = rect_bottom - 1.27
+    value_y = to_mm(-top - to_nm(1.27))
     value_x = 0
 
     # If symbol name is very long, offset it or move it down further
     if value_width > (left_width + right_width - 2.0):
-        value_y = rect_bottom - 2.54  # Move further down
+        value_y = to_mm(-top - to_nm(2.54))  # Move further down
 
     # Datasheet property position - offset to avoid overlap when visible
     # Place it above and slightly offset from Reference
     datasheet_x = 0.254
-    datasheet_y = rect_top + 2.794
+    datasheet_y = to_mm(top + to_nm(2.794))
+
+    return {
+        'left_width': left_width, 'right_width': right_width,
+        'rect_top': rect_top, 'rect_bottom': rect_bottom,
+        'ref_y': ref_y, 'value_x': value_x, 'value_y': value_y,
+        'value_width': value_width,
+        'datasheet_x': datasheet_x, 'datasheet_y': datasheet_y,
+    }
+
+
+# Half the height of 1.27mm property text
+_TEXT_HALF_HEIGHT = 0.635
+
+
+def symbol_bounds(name, pins=None):
+    """
+    Bounding box of a symbol: body, pin ends and visible properties
+
+    Args:
+        name: "R", "C" or a connector symbol name
+        pins: PinTable or pin list (connectors only)
+
+    Returns:
+        (x_min, y_min, x_max, y_max) in symbol coordinates (mm, y up)
+    """
+    if name == 'R':
+        # Pins end at +-3.81; the rotated Reference sits right of the body
+        return (-1.016, -3.81, 2.032 + _TEXT_HALF_HEIGHT, 3.81)
+    if name == 'C':
+        # Reference and Value are left-justified right of the plates
+        return (-2.032, -3.81, 0.635 + calculate_text_width('100nF'), 3.81)
+
+    geometry = connector_symbol_geometry(name, pins)
+    half_value = geometry['value_width'] / 2
+    return (
+        min(-geometry['left_width'] - PIN_LENGTH, geometry['value_x'] - half_value),
+        geometry['value_y'] - _TEXT_HALF_HEIGHT,
+        max(geometry['right_width'] + PIN_LENGTH, geometry['value_x'] + half_value),
+        geometry['ref_y'] + _TEXT_HALF_HEIGHT,
+    )
+
+
+def create_connector_symbol(name, datasheet, pins):
+    """
+    Generate a complete connector symbol from pin definitions with automatic
+    overlap avoidance for pin names and properties.
+
+    Args:
+        name: Symbol name (e.g., "ARM_JTAG_20pin_1.27mm")
+        datasheet: Path to datasheet file
+        pins: PinTable or list of tuples (pin_num, pin_name, pin_type, side)
+
+    Returns:
+        Complete symbol S-expression
+    """
+    pins = PinTable.of(pins)
+    geometry = connector_symbol_geometry(name, pins)
+    nm = {key: to_nm(value) for key, value in geometry.items()}
+    left_width = fmt(nm['left_width'], 2)
+    right_width = fmt(nm['right_width'], 2)
+    rect_top = fmt(nm['rect_top'], 2)
+    rect_bottom = fmt(nm['rect_bottom'], 2)
+    ref_y = fmt(nm['ref_y'], 2)
+    value_x = fmt(nm['value_x'], 3)
+    value_y = fmt(nm['value_y'], 2)
+    datasheet_x = fmt(nm['datasheet_x'], 3)
+    datasheet_y = fmt(nm['datasheet_y'], 3)
+
+    # Calculate positions for each pin (alternating left/right)
+    pin_defs = []
+    for (num, pin_name, pin_type, side), (x_pos, y_pos, _) in zip(pins,
+                                                                  connector_pin_layout(pins)):
+        pin_defs.append(create_pin(num, pin_name, pin_type, side, y_pos, x_pos))
 
     # Build symbol S-expression
     symbol = f'''
@@ -127,11 +272,11 @@ def create_connector_symbol(name, datasheet, pins):
 \t\t(pin_names (offset 1.016))
 \t\t(exclude_from_sim no) (in_bom yes) (on_board yes)
 \t\t(property "Reference" "J"
-\t\t\t(at 0 {ref_y:.2f} 0)
+\t\t\t(at 0 {ref_y} 0)
 \t\t\t(effects (font (size 1.27 1.27)))
 \t\t)
 \t\t(property "Value" "{name}"
-\t\t\t(at {value_x:.3f} {value_y:.2f} 0)
+\t\t\t(at {value_x} {value_y} 0)
 \t\t\t(effects (font (size 1.27 1.27)))
 \t\t)
 \t\t(property "Footprint" ""
@@ -139,11 +284,11 @@ def create_connector_symbol(name, datasheet, pins):
 \t\t\t(effects (font (size 1.27 1.27)) hide)
 \t\t)
 \t\t(property "Datasheet" "{datasheet}"
-\t\t\t(at {datasheet_x:.3f} {datasheet_y:.3f} 0)
+\t\t\t(at {datasheet_x} {datasheet_y} 0)
 \t\t\t(effects (font (size 1.27 1.27)) hide)
 \t\t)
 \t\t(symbol "{name}_1_1"
-\t\t\t(rectangle (start -{left_width:.2f} {rect_top:.2f}) (end {right_width:.2f} {rect_bottom:.2f})
+\t\t\t(rectangle (start -{left_width} {rect_top}) (end {right_width} {rect_bottom})
 \t\t\t\t(stroke (width 0.254) (type default))
 \t\t\t\t(fill (type background))
 \t\t\t)
@@ -221,3 +366,39 @@ def create_capacitor_symbol():
 \t\t\t)
 \t\t)
 \t)'''
+
+
+def create_power_symbol(name="GND"):
+    """
+    Create a ground power symbol
+
+    Power symbols have a single hidden power_in pin at the origin; every
+    instance with the same value joins the same global net.
+
+    Args:
+        name: Net name of the symbol (default "GND")
+
+    Returns:
+        Complete power symbol S-expression
+    """
+    return f'''
+\t(symbol "{name}"
+\t\t(power)
+\t\t(pin_names (offset 0)) (pin_numbers hide)
+\t\t(exclude_from_sim no) (in_bom yes) (on_board yes)
+\t\t(property "Reference" "#PWR" (at 0 -6.35 0) (effects (font (size 1.27 1.27)) hide))
+\t\t(property "Value" "{name}" (at 0 -3.81 0) (effects (font (size 1.27 1.27))))
+\t\t(property "Footprint" "" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
+\t\t(property "Datasheet" "" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
+\t\t(symbol "{name}_0_1"
+\t\t\t(polyline (pts (xy 0 0) (xy 0 -1.27) (xy 1.27 -1.27) (xy 0 -2.54) (xy -1.27 -1.27) (xy 0 -1.27))
+\t\t\t\t(stroke (width 0) (type default)) (fill (type none))
+\t\t\t)
+\t\t)
+\t\t(symbol "{name}_1_1"
+\t\t\t(pin power_in line (at 0 0 270) (length 0) hide
+\t\t\t\t(name "{name}" (effects (font (size 1.27 1.27))))
+\t\t\t\t(number "1" (effects (font (size 1.27 1.27))))
+\t\t\t)
+\t\t)
+\t)'''
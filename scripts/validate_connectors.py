@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Validate connector_data.py against the connector-specs/*.md pin tables
+
+For every connector the pin list in connector_data.py is compared with
+the signal table of its datasheet spec (parsed by spec_loader.py):
+
+- pin numbers present on only one side
+- names: identical, equal after alias normalization (nRESET vs
+  nRESET/nSRST), overlapping (NC vs NC/DBGRQ) or different
+- electrical types (the spec's are inferred from names, so a type
+  mismatch is a warning) and sides
+
+Both tables are also checked on their own: duplicate pin numbers, gaps
+in the numbering, and odd/even pins not each on one side. All checks
+are set/dict based and linear in the number of pins.
+
+Connectors are validated in a process pool for large libraries.
+
+Usage:
+    python3 validate_connectors.py [NAME ...] [-j JOBS] [-o report.json]
+
+Exits with status 1 if any connector has errors.
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Add scripts directory to path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+from connector_data import CONNECTOR_INFO, INPUT_CONNECTOR_INFO
+from signal_map import signal_aliases
+from spec_loader import DEFAULT_CACHE_DIR, REPO_DIR, SpecCache, SpecError
+
+
+# Below this many connectors validation runs in-process
+PARALLEL_THRESHOLD = 32
+
+SEVERITY_ORDER = ('ok', 'info', 'warning', 'error')
+
+
+def _issue(check, severity, message, pin=None, data=None, spec=None):
+    return {'check': check, 'severity': severity, 'pin': pin, 'data': data,
+            'spec': spec, 'message': message}
+
+
+def _well_formed(pin):
+    return isinstance(pin, (tuple, list)) and len(pin) == 4 \
+        and all(isinstance(field, str) for field in pin)
+
+
+def check_table(pins, source):
+    """
+    Check one pin table on its own
+
+    Works on the raw pin list, not a PinTable (which refuses to build
+    from a table with duplicates), so every problem can be reported.
+
+    Args:
+        pins: List of (pin_num, pin_name, pin_type, side)
+        source: 'data' or 'spec', used in messages
+
+    Returns:
+        List of issue dicts
+    """
+    issues = []
+    seen = set()
+    numbers = set()
+    sides = {0: set(), 1: set()}
+    for pin in pins:
+        if not _well_formed(pin):
+            issues.append(_issue('format', 'error', f"{source}: malformed pin entry {pin!r}"))
+            continue
+        num, name, _, side = pin
+        if num in seen:
+            issues.append(_issue('duplicate', 'error', f"{source}: pin {num} defined twice",
+                                 pin=num))
+            continue
+        seen.add(num)
+        if not num.isdigit():
+            issues.append(_issue('numbering', 'warning',
+                                 f"{source}: pin number {num!r} is not numeric", pin=num))
+            continue
+        numbers.add(int(num))
+        sides[int(num) % 2].add(side)
+
+    if numbers:
+        missing = set(range(1, max(numbers) + 1)) - numbers
+        for num in sorted(missing):
+            issues.append(_issue('gap', 'error', f"{source}: pin {num} is missing",
+                                 pin=str(num)))
+
+    odd, even = sides[1], sides[0]
+    if len(odd) > 1 or len(even) > 1 or (odd and odd == even):
+        issues.append(_issue(
+            'sides', 'error',
+            f"{source}: odd pins on {'/'.join(sorted(odd)) or '-'}, "
+            f"even pins on {'/'.join(sorted(even)) or '-'}; expected one side each",
+        ))
+    return issues
+
+
+def compare_tables(data_pins, spec_pins):
+    """
+    Compare connector_data pins with spec pins, pin by pin
+
+    Args:
+        data_pins: List of (pin_num, pin_name, pin_type, side) from connector_data
+        spec_pins: Same, parsed from the spec
+
+    Returns:
+        List of issue dicts
+    """
+    issues = []
+    spec_by_number = {pin[0]: pin for pin in spec_pins}
+    data_numbers = set()
+
+    # Malformed entries are reported by check_table()
+    for num, name, pin_type, side in filter(_well_formed, data_pins):
+        data_numbers.add(num)
+        spec = spec_by_number.get(num)
+        if spec is None:
+            issues.append(_issue('missing_in_spec', 'error',
+                                 f"pin {num} ({name}) is not in the spec", pin=num, data=name))
+            continue
+        _, spec_name, spec_type, spec_side = spec
+
+        if name != spec_name:
+            data_aliases = signal_aliases(name)
+            spec_aliases = signal_aliases(spec_name)
+            if data_aliases == spec_aliases:
+                issues.append(_issue('name', 'info', f"pin {num}: {name} is spelled "
+                                     f"{spec_name} in the spec", pin=num, data=name,
+                                     spec=spec_name))
+            elif set(data_aliases) & set(spec_aliases):
+                issues.append(_issue('name', 'warning', f"pin {num}: {name} only partly "
+                                     f"matches {spec_name}", pin=num, data=name,
+                                     spec=spec_name))
+            else:
+                issues.append(_issue('name', 'error', f"pin {num}: {name} but the spec "
+                                     f"says {spec_name}", pin=num, data=name,
+                                     spec=spec_name))
+        if pin_type != spec_type:
+            issues.append(_issue('type', 'warning', f"pin {num} ({name}): {pin_type}, the "
+                                 f"spec name suggests {spec_type}", pin=num, data=pin_type,
+                                 spec=spec_type))
+        if side != spec_side:
+            issues.append(_issue('side', 'error', f"pin {num} ({name}): {side} side, "
+                                 f"{spec_side} in the spec", pin=num, data=side,
+                                 spec=spec_side))
+
+    for num, spec_name, _, _ in spec_pins:
+        if num not in data_numbers:
+            issues.append(_issue('missing_in_data', 'error',
+                                 f"spec pin {num} ({spec_name}) is not in connector_data",
+                                 pin=num, spec=spec_name))
+    return issues
+
+
+def validate_connector(name, pins, spec_path, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Validate one connector against its spec
+
+    Args:
+        name: Connector name
+        pins: connector_data pin list
+        spec_path: Path to the spec .md file
+        cache_dir: spec_loader cache directory (None disables it)
+
+    Returns:
+        Result dict with 'connector', 'spec', 'status' and 'issues'
+    """
+    issues = check_table(pins, 'data')
+    try:
+        _, spec_pins = SpecCache(cache_dir).load(spec_path)
+    except (OSError, SpecError) as e:
+        issues.append(_issue('spec', 'error', f"cannot read spec: {e}"))
+    else:
+        issues += check_table(spec_pins, 'spec')
+        issues += compare_tables(pins, spec_pins)
+
+    status = max((issue['severity'] for issue in issues), key=SEVERITY_ORDER.index,
+                 default='ok')
+    return {'connector': name, 'spec': os.path.relpath(spec_path, REPO_DIR),
+            'status': status, 'issues': issues}
+
+
+def _validate_args(args):
+    return validate_connector(*args)
+
+
+def validate_all(connectors=None, jobs=None, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Validate many connectors, in a process pool when there are many
+
+    Args:
+        connectors: Dict name -> info with 'pins' and 'datasheet'
+            (default: CONNECTOR_INFO and INPUT_CONNECTOR_INFO)
+        jobs: Worker processes (default: CPU count, or 1 for small libraries)
+        cache_dir: spec_loader cache directory (None disables it)
+
+    Returns:
+        Report dict with per-status counts and 'connectors' results in
+        input order
+    """
+    if connectors is None:
+        connectors = {**CONNECTOR_INFO, **INPUT_CONNECTOR_INFO}
+    work = [
+        (name, list(info['pins']), os.path.join(REPO_DIR, info['datasheet']), cache_dir)
+        for name, info in connectors.items()
+    ]
+    if jobs is None and len(work) < PARALLEL_THRESHOLD:
+        jobs = 1
+
+    if jobs == 1:
+        results = [_validate_args(args) for args in work]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunksize = max(1, len(work) // (4 * (jobs or os.cpu_count() or 1)))
+            results = list(pool.map(_validate_args, work, chunksize=chunksize))
+
+    counts = {status: 0 for status in SEVERITY_ORDER}
+    for result in results:
+        counts[result['status']] += 1
+    return {'counts': counts, 'connectors': results}
+
+
+def print_report(report, verbose=False):
+    """Print a validate_all() report, one block per connector with issues"""
+    marks = {'ok': '✓', 'info': '✓', 'warning': '⚠', 'error': '✗'}
+    for result in report['connectors']:
+        print(f"{marks[result['status']]} {result['connector']} ({result['spec']})")
+        for issue in result['issues']:
+            if issue['severity'] != 'info' or verbose:
+                print(f"    {marks[issue['severity']]} {issue['message']}")
+    counts = report['counts']
+    print(f"\n{len(report['connectors'])} connectors: {counts['ok'] + counts['info']} ok, "
+          f"{counts['warning']} with warnings, {counts['error']} with errors")
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Validate connector_data.py against connector-specs/*.md"
+    )
+    parser.add_argument('names', nargs='*', metavar='NAME',
+                        help='connectors to validate (default: all)')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes (default: CPU count)')
+    parser.add_argument('-o', '--output', help='also write the report as JSON')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='also list alias-only name differences')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='always re-parse the spec files')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main entry point"""
+    args = parse_args(argv)
+    known = {**CONNECTOR_INFO, **INPUT_CONNECTOR_INFO}
+    unknown = [name for name in args.names if name not in known]
+    if unknown:
+        print(f"Unknown connectors: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    connectors = {name: known[name] for name in args.names} if args.names else None
+
+    report = validate_all(connectors, args.jobs, None if args.no_cache else DEFAULT_CACHE_DIR)
+    print_report(report, args.verbose)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    return 1 if report['counts']['error'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Regenerate outputs whenever the pin data changes
+
+Watches scripts/connector_data.py, connector-specs/*.md and optionally
+a variant manifest (see batch_generate.py) by polling their mtimes and
+sizes. The process stays up between changes, so modules stay imported
+and the generated symbol strings (symbol_cache.py) and parsed specs
+(spec_loader.py) stay in memory. A change usually regenerates in
+milliseconds.
+
+On a change only the affected outputs are rebuilt:
+
+- connector_data.py: reloaded in place. The schematic and the symbol
+  library are rebuilt, plus the variants that use a connector whose pins
+  or datasheet changed.
+- connector-specs/*.md: the variants using a changed spec-only connector
+- the manifest: the variants whose entry changed (all of them if the
+  resistor sets or output directory changed)
+
+Files are replaced atomically and only when their content differs
+(kicad_utils.write_if_changed); the library is updated by splicing just
+the changed symbols (create_connector_symbols.update_symbol_library).
+A failing rebuild, e.g. while connector_data.py is half edited, is
+reported and the last good data is kept.
+
+Usage:
+    python3 watch.py [--schematic PATH] [--library PATH]
+                     [--manifest FILE] [--wire] [--auto-place]
+                     [--deterministic] [--interval SECONDS]
+
+generate_schematic.py --watch watches for the schematic alone.
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import sys
+import time
+
+# Add scripts directory to path so we can import our modules
+sys.path.insert(0, os.path.dirname(__file__))
+
+import connector_data
+import placement
+import spec_loader
+from batch_generate import check_variant_names, generate_variant, load_manifest
+from create_connector_symbols import (
+    DEFAULT_OUTPUT as DEFAULT_LIBRARY,
+    create_symbol_library,
+    update_symbol_library,
+)
+from generate_schematic import generate_schematic
+from kicad_utils import set_deterministic_uuids, write_if_changed
+from netlist import DEFAULT_INPUT_CONNECTOR
+
+
+DATA_PATH = os.path.abspath(connector_data.__file__)
+DEFAULT_SCHEMATIC = 'adapterama.kicad_sch'
+DEFAULT_INTERVAL = 0.2
+
+# connector_data dicts that other modules import by name
+_SHARED_TABLES = ('CONNECTOR_INFO', 'INPUT_CONNECTOR_INFO')
+
+
+def file_stamps(paths, spec_dir=spec_loader.DEFAULT_SPEC_DIR):
+    """
+    (mtime, size) of the watched files
+
+    Args:
+        paths: Individual files (missing ones are left out)
+        spec_dir: Directory whose *.md files are watched too
+
+    Returns:
+        Dict absolute path -> (mtime_ns, size)
+    """
+    stamps = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        stamps[os.path.abspath(path)] = (st.st_mtime_ns, st.st_size)
+    try:
+        with os.scandir(spec_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.md') and entry.is_file():
+                    st = entry.stat()
+                    stamps[os.path.abspath(entry.path)] = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        pass
+    return stamps
+
+
+def changed_paths(old, new):
+    """Paths added, removed or modified between two file_stamps() results"""
+    return {path for path in old.keys() | new.keys() if old.get(path) != new.get(path)}
+
+
+def _connector_state():
+    tables = (connector_data.CONNECTOR_INFO, connector_data.INPUT_CONNECTOR_INFO)
+    return {name: (info['datasheet'], tuple(info['pins']))
+            for table in tables for name, info in table.items()}
+
+
+def reload_connector_data():
+    """
+    Re-execute connector_data.py in place
+
+    Its dicts keep their identity, so modules that imported them by name
+    see the new entries.
+
+    Returns:
+        Names of the connectors whose pins or datasheet changed
+
+    Raises:
+        Exception: Whatever executing the module raised; the previous
+            tables are kept
+    """
+    before = _connector_state()
+    tables = {name: getattr(connector_data, name) for name in _SHARED_TABLES}
+    try:
+        importlib.reload(connector_data)
+        fresh = {name: getattr(connector_data, name) for name in _SHARED_TABLES}
+    finally:
+        for name, table in tables.items():
+            setattr(connector_data, name, table)
+    for name, table in tables.items():
+        table.clear()
+        table.update(fresh[name])
+    placement.part_box.cache_clear()
+
+    after = _connector_state()
+    return {name for name in before.keys() | after.keys() if before.get(name) != after.get(name)}
+
+
+def spec_names(paths):
+    """Connector names of changed spec files that are not defined in connector_data"""
+    specs = spec_loader.CONNECTOR_INFO
+    by_path = {os.path.abspath(specs.path(name)): name for name in specs}
+    names = set()
+    for path in paths:
+        name = by_path.get(path)
+        if name is None:
+            # Removed file: its stem is its name unless connector_data maps it
+            name = os.path.splitext(os.path.basename(path))[0]
+        names.add(name)
+    return {name for name in names
+            if name not in connector_data.CONNECTOR_INFO
+            and name not in connector_data.INPUT_CONNECTOR_INFO}
+
+
+class Watcher:
+    """Outputs kept up to date with the pin data"""
+
+    def __init__(self, schematic=DEFAULT_SCHEMATIC, library=DEFAULT_LIBRARY, manifest=None,
+                 output_dir=None, wire=False, place=False,
+                 spec_dir=spec_loader.DEFAULT_SPEC_DIR):
+        """
+        Args:
+            schematic: Schematic to write (None: none)
+            library: Symbol library to write (None: none)
+            manifest: Variant manifest to build and watch (optional)
+            output_dir: Overrides the manifest's output_dir
+            wire: Draw the schematic's wiring
+            place: Place the schematic's sections automatically
+            spec_dir: Connector spec directory to watch
+        """
+        self.schematic = schematic
+        self.library = library
+        self.manifest = manifest and os.path.abspath(manifest)
+        self.output_dir = output_dir
+        self.wire = wire
+        self.place = place
+        self.spec_dir = spec_dir
+        self.stamps = {}
+        # Manifest as last built: settings and variant name -> JSON text
+        self._settings = None
+        self._variants = {}
+
+    def _paths(self):
+        return [DATA_PATH] + ([self.manifest] if self.manifest else [])
+
+    def _timed(self, label, build):
+        start = time.perf_counter()
+        try:
+            written = build()
+        except Exception as e:
+            print(f"✗ {label}: {type(e).__name__}: {e}")
+            return
+        ms = (time.perf_counter() - start) * 1000
+        state = 'updated' if written else 'unchanged'
+        print(f"✓ {label} {state} ({ms:.1f} ms)")
+
+    def build_schematic(self):
+        """Write the schematic if its content changed; returns True if written"""
+        return write_if_changed(self.schematic,
+                                generate_schematic(wire=self.wire, place=self.place))
+
+    def build_library(self):
+        """Update the symbol library in place; returns True if written"""
+        # The generators report every symbol on stdout
+        with contextlib.redirect_stdout(io.StringIO()):
+            if os.path.exists(self.library):
+                return update_symbol_library(self.library)['written']
+            return write_if_changed(self.library, [create_symbol_library()])
+
+    def _load_manifest(self):
+        manifest = load_manifest(self.manifest)
+        settings = json.dumps([manifest.get('resistor_sets'), manifest.get('output_dir')],
+                              sort_keys=True)
+        check_variant_names(manifest['variants'])
+        variants = {variant['name']: variant for variant in manifest['variants']}
+        return manifest, settings, variants
+
+    def _variant_connectors(self, variant):
+        names = {section['connector'] for section in variant['sections']}
+        if variant.get('wire'):
+            names.add(DEFAULT_INPUT_CONNECTOR)
+        return names
+
+    def build_variants(self, connectors=None, manifest_changed=False):
+        """
+        Rebuild the variants affected by a change
+
+        Args:
+            connectors: Names of changed connectors (None: rebuild all)
+            manifest_changed: Re-read the manifest and rebuild the
+                variants whose entry changed
+        """
+        manifest, settings, variants = self._load_manifest()
+        output_dir = self.output_dir or manifest.get('output_dir', 'variants')
+        rebuild_all = connectors is None or settings != self._settings
+        for name, variant in variants.items():
+            text = json.dumps(variant, sort_keys=True)
+            if not (rebuild_all
+                    or (manifest_changed and self._variants.get(name) != text)
+                    or self._variant_connectors(variant) & connectors):
+                continue
+            result = generate_variant(variant, output_dir, manifest.get('resistor_sets'))
+            if result['ok']:
+                print(f"✓ variant {name} rebuilt ({result['seconds'] * 1000:.1f} ms)")
+            else:
+                print(f"✗ variant {name}: {result['error']}")
+        self._settings = settings
+        self._variants = {name: json.dumps(variant, sort_keys=True)
+                          for name, variant in variants.items()}
+
+    def build_all(self):
+        """Build every output once"""
+        self.stamps = file_stamps(self._paths(), self.spec_dir)
+        if self.schematic:
+            self._timed(self.schematic, self.build_schematic)
+        if self.library:
+            self._timed(self.library, self.build_library)
+        if self.manifest:
+            try:
+                self.build_variants()
+            except Exception as e:
+                print(f"✗ {self.manifest}: {type(e).__name__}: {e}")
+
+    def poll(self):
+        """
+        Check the inputs once and rebuild what they affect
+
+        A connector_data.py that fails to load is reported and skipped
+        (until it changes again); spec and manifest changes seen in the
+        same poll are still handled.
+
+        Returns:
+            True if anything changed
+        """
+        stamps = file_stamps(self._paths(), self.spec_dir)
+        changed = changed_paths(self.stamps, stamps)
+        if not changed:
+            return False
+        self.stamps = stamps
+
+        connectors = set()
+        if DATA_PATH in changed:
+            try:
+                connectors = reload_connector_data()
+            except Exception as e:
+                print(f"✗ {DATA_PATH}: {type(e).__name__}: {e}")
+            if connectors:
+                print(f"  connectors changed: {', '.join(sorted(connectors))}")
+                if self.schematic:
+                    self._timed(self.schematic, self.build_schematic)
+                if self.library:
+                    self._timed(self.library, self.build_library)
+
+        specs = {path for path in changed if path.endswith('.md')}
+        if specs:
+            spec_loader.CONNECTOR_INFO.reset()
+            connectors |= spec_names(specs)
+
+        manifest_changed = self.manifest in changed
+        if self.manifest and (connectors or manifest_changed):
+            try:
+                self.build_variants(connectors, manifest_changed)
+            except Exception as e:
+                print(f"✗ {self.manifest}: {type(e).__name__}: {e}")
+        return True
+
+    def run(self, interval=DEFAULT_INTERVAL, cycles=None):
+        """
+        Build everything, then poll until interrupted
+
+        Args:
+            interval: Seconds between polls
+            cycles: Stop after this many polls (default: never)
+        """
+        self.build_all()
+        print(f"Watching {DATA_PATH}, {os.path.normpath(self.spec_dir)}"
+              + (f", {self.manifest}" if self.manifest else "") + " (Ctrl-C to stop)")
+        count = 0
+        try:
+            while cycles is None or count < cycles:
+                time.sleep(interval)
+                self.poll()
+                count += 1
+        except KeyboardInterrupt:
+            pass
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Regenerate the schematic, library and variants when pin data changes"
+    )
+    parser.add_argument('--schematic', default=DEFAULT_SCHEMATIC,
+                        help='schematic to keep updated (default: %(default)s)')
+    parser.add_argument('--library', default=DEFAULT_LIBRARY,
+                        help='symbol library to keep updated (default: adapterama-symbols.kicad_sym)')
+    parser.add_argument('--no-schematic', action='store_true', help='do not write the schematic')
+    parser.add_argument('--no-library', action='store_true', help='do not write the library')
+    parser.add_argument('--manifest', help='variant manifest to build and watch')
+    parser.add_argument('-O', '--output-dir', help="variant output directory "
+                        "(default: manifest's output_dir)")
+    parser.add_argument('--wire', action='store_true', help='draw the schematic wiring')
+    parser.add_argument('--auto-place', action='store_true',
+                        help='place the schematic sections automatically')
+    parser.add_argument('--deterministic', action='store_true',
+                        help='derive UUIDs from references so unchanged outputs stay untouched')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help='seconds between polls (default: %(default)s)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main entry point"""
+    args = parse_args(argv)
+    set_deterministic_uuids(args.deterministic)
+    watcher = Watcher(
+        schematic=None if args.no_schematic else args.schematic,
+        library=None if args.no_library else os.path.normpath(args.library),
+        manifest=args.manifest,
+        output_dir=args.output_dir,
+        wire=args.wire,
+        place=args.auto_place,
+    )
+    watcher.run(args.interval)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())